@@ -786,7 +786,7 @@ async def get_pump(pump_id: str):
     if engine:
         pump_sim = engine.get_pump(pump_id)
         if pump_sim:
-            asset['live_data'] = pump_sim.get_state()
+            asset['live_data'] = engine.get_pump_state(pump_id)
             asset['is_running'] = pump_sim.is_running
             asset['is_faulted'] = pump_sim.is_faulted
 
@@ -820,7 +820,7 @@ async def start_pump(pump_id: str):
     if pump_sim.is_running:
         return {"message": f"Pump {pump_id} is already running", "pump_id": pump_id, "success": True}
 
-    await pump_sim.start()
+    await engine.start_pump(pump_id)
     _logger.info(f"Pump {pump_id} started via API")
 
     return {
@@ -855,7 +855,7 @@ async def stop_pump(pump_id: str):
     if not pump_sim.is_running:
         return {"message": f"Pump {pump_id} is already stopped", "pump_id": pump_id, "success": True}
 
-    await pump_sim.stop()
+    await engine.stop_pump(pump_id)
     _logger.info(f"Pump {pump_id} stopped via API")
 
     return {
@@ -900,7 +900,7 @@ async def set_pump_speed(pump_id: str, request: PumpSpeedRequest):
             detail=f"RPM must be between {min_rpm} and {max_rpm} for this pump"
         )
 
-    success = pump_sim.set_speed(request.rpm)
+    success = await engine.set_pump_speed(pump_id, request.rpm)
     if success:
         _logger.info(f"Pump {pump_id} speed set to {request.rpm} RPM via API")
         return {
@@ -936,7 +936,7 @@ async def reset_pump_fault(pump_id: str):
     if not pump_sim.is_faulted:
         return {"message": f"Pump {pump_id} is not faulted", "pump_id": pump_id, "success": True}
 
-    pump_sim.is_faulted = False
+    await engine.reset_pump_fault(pump_id)
     _logger.info(f"Pump {pump_id} fault reset via API")
 
     return {
@@ -957,17 +957,17 @@ async def start_all_pumps():
             detail="Simulation engine not available. Ensure server is running with --with-api flag."
         )
 
-    started = []
+    # One command starts every pump at the next tick boundary
+    started = await engine.start_all_pumps()
     skipped = []
 
     for pump_id, pump_sim in engine.pumps.items():
+        if pump_id in started:
+            continue
         if pump_sim.is_faulted:
             skipped.append({"id": pump_id, "reason": "faulted"})
-        elif pump_sim.is_running:
-            skipped.append({"id": pump_id, "reason": "already_running"})
         else:
-            await pump_sim.start()
-            started.append(pump_id)
+            skipped.append({"id": pump_id, "reason": "already_running"})
 
     _logger.info(f"Started {len(started)} pumps via API")
 
@@ -989,15 +989,10 @@ async def stop_all_pumps():
             detail="Simulation engine not available. Ensure server is running with --with-api flag."
         )
 
-    stopped = []
-    skipped = []
-
-    for pump_id, pump_sim in engine.pumps.items():
-        if not pump_sim.is_running:
-            skipped.append({"id": pump_id, "reason": "already_stopped"})
-        else:
-            await pump_sim.stop()
-            stopped.append(pump_id)
+    # One command stops every pump at the next tick boundary
+    stopped = await engine.stop_all_pumps()
+    skipped = [{"id": pump_id, "reason": "already_stopped"}
+               for pump_id in engine.pumps if pump_id not in stopped]
 
     _logger.info(f"Stopped {len(stopped)} pumps via API")
 
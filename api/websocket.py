@@ -74,9 +74,10 @@ class ConnectionManager:
             "data": self.pump_data[pump_id]
         })
 
-    async def update_all_pumps(self, all_data: Dict[str, Dict[str, Any]]):
+    async def update_all_pumps(self, all_data: Dict[str, Dict[str, Any]],
+                               timestamp: Optional[str] = None):
         """Update all pump data at once and broadcast."""
-        timestamp = datetime.utcnow().isoformat()
+        timestamp = timestamp or datetime.utcnow().isoformat()
         for pump_id, data in all_data.items():
             self.pump_data[pump_id] = {
                 **data,
@@ -6,7 +6,7 @@ Loads type definitions from types.yaml and asset instances from assets.json.
 import json
 import yaml
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 
 
@@ -25,6 +25,22 @@ class EURange:
     high: float
 
 
+@dataclass
+class Deadband:
+    """Report-by-exception deadband (OPC UA Part 8 semantics)."""
+    deadband_type: str  # Absolute, Percent (of EURange span)
+    value: float
+
+    def resolve(self, eu_range: Optional[Tuple[float, float]] = None) -> Optional[float]:
+        """Absolute band width, or None if a Percent band has no EURange to refer to."""
+        if self.deadband_type == 'Percent':
+            if eu_range is None:
+                return None
+            low, high = eu_range
+            return abs(high - low) * self.value / 100.0
+        return self.value
+
+
 @dataclass
 class ComponentDef:
     """Component definition within a type."""
@@ -39,12 +55,27 @@ class ComponentDef:
     instrument_range: Optional[EURange] = None
     true_state: Optional[str] = None
     false_state: Optional[str] = None
+    deadband: Optional[Deadband] = None
+    sampling_interval: Optional[float] = None  # ms
     value: Any = None
     components: Dict[str, 'ComponentDef'] = field(default_factory=dict)
     input_arguments: List[Dict] = field(default_factory=list)
     output_arguments: List[Dict] = field(default_factory=list)
 
 
+@dataclass
+class ReportingDef:
+    """Sampling and report-by-exception settings of a type's variables."""
+    deadbands: Dict[str, Deadband] = field(default_factory=dict)
+    sampling_intervals: Dict[str, float] = field(default_factory=dict)  # ms
+    max_interval: Optional[float] = None  # seconds, for deadband-suppressed values
+
+    @property
+    def fastest_interval(self) -> Optional[float]:
+        """Shortest sampling interval of any variable (None = every tick)."""
+        return min(self.sampling_intervals.values()) if self.sampling_intervals else None
+
+
 @dataclass
 class TypeDef:
     """OPC-UA ObjectType definition."""
@@ -56,6 +87,7 @@ class TypeDef:
     properties: Dict[str, ComponentDef] = field(default_factory=dict)
     components: Dict[str, ComponentDef] = field(default_factory=dict)
     methods: Dict[str, ComponentDef] = field(default_factory=dict)
+    max_report_interval: Optional[float] = None  # seconds, for deadband-suppressed values
 
 
 @dataclass
@@ -72,6 +104,8 @@ class AssetDef:
     properties: Dict[str, Any] = field(default_factory=dict)
     design_specs: Dict[str, Any] = field(default_factory=dict)
     alarms: List[str] = field(default_factory=list)
+    system_curve: Dict[str, float] = field(default_factory=dict)  # station folders: StaticHead, DesignFlow, DesignHead
+    wet_well: Dict[str, float] = field(default_factory=dict)  # wet well chambers: Area, Inflow
 
 
 @dataclass
@@ -113,6 +147,10 @@ class ConfigLoader:
                 self._assets_config = json.load(f)
         return self._assets_config
 
+    def use_assets(self, config: Dict) -> None:
+        """Use an in-memory assets configuration (e.g. a generated fleet) instead of assets.json."""
+        self._assets_config = config
+
     def get_engineering_units(self) -> Dict[str, EngineeringUnit]:
         """Get engineering unit definitions."""
         config = self.load_types()
@@ -165,6 +203,13 @@ class ConfigLoader:
                 high=data['instrumentRange'].get('high', 100.0)
             )
 
+        deadband = None
+        if 'deadband' in data:
+            deadband = Deadband(
+                deadband_type=data['deadband'].get('type', 'Absolute'),
+                value=float(data['deadband'].get('value', 0.0))
+            )
+
         # Parse nested components
         nested_components = {}
         if 'components' in data:
@@ -183,6 +228,8 @@ class ConfigLoader:
             instrument_range=instrument_range,
             true_state=data.get('trueState'),
             false_state=data.get('falseState'),
+            deadband=deadband,
+            sampling_interval=data.get('samplingInterval'),
             value=data.get('value'),
             components=nested_components,
             input_arguments=data.get('inputArguments', []),
@@ -218,11 +265,37 @@ class ConfigLoader:
                 description=data.get('description', ''),
                 properties=properties,
                 components=components,
-                methods=methods
+                methods=methods,
+                max_report_interval=data.get('reporting', {}).get('maxInterval')
             )
 
         return types
 
+    def get_reporting(self, type_name: str) -> ReportingDef:
+        """Get the sampling intervals, deadbands and forced refresh interval of a type, including inherited ones."""
+        type_defs = self.get_type_definitions()
+        reporting = ReportingDef()
+
+        # Walk inheritance chain (child overrides parent)
+        current_type = type_defs.get(type_name)
+        while current_type:
+            for name, comp in current_type.components.items():
+                # Client-writable variables are rewritten every sample so a client's write
+                # never lingers in the address space (nothing else reads them back)
+                if (comp.deadband is not None and comp.access_level != 'ReadWrite'
+                        and name not in reporting.deadbands):
+                    reporting.deadbands[name] = comp.deadband
+                if comp.sampling_interval is not None and name not in reporting.sampling_intervals:
+                    reporting.sampling_intervals[name] = float(comp.sampling_interval)
+            if reporting.max_interval is None:
+                reporting.max_interval = current_type.max_report_interval
+            if current_type.base and current_type.base != 'BaseObjectType':
+                current_type = type_defs.get(current_type.base)
+            else:
+                break
+
+        return reporting
+
     def get_asset_definitions(self) -> List[AssetDef]:
         """Get parsed asset instance definitions."""
         config = self.load_assets()
@@ -246,7 +319,9 @@ class ConfigLoader:
                 simulate=item.get('simulate', False),
                 properties=item.get('properties', {}),
                 design_specs=item.get('designSpecs', {}),
-                alarms=item.get('alarms', [])
+                alarms=item.get('alarms', []),
+                system_curve=item.get('systemCurve', {}),
+                wet_well=item.get('wetWell', {})
             ))
 
         return assets
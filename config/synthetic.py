@@ -0,0 +1,221 @@
+"""Synthetic fleet generator.
+
+Expands one pump template into a plant of stations x pumps x chambers in
+the assets.json format, so AssetBuilder and the simulation engine can be
+stress-tested with address spaces far larger than the real facility:
+
+    templates = db.get_templates()
+    config = ConfigLoader()
+    config.use_assets(generate_fleet(templates[0], stations=500, pumps_per_station=20))
+
+Each station gets its own pump model, with design specs scaled from the
+template. Flow and head are drawn independently, and power, current,
+impeller diameter and NPSH follow from them, so a larger pump is also
+hungrier. The station's pumps share that model with small per-unit
+efficiency spread. Stations also get a system curve sized for all but one
+duty pump, and a wet well sized from the station flow. Everything is drawn
+from one seed, so a generated fleet is reproducible.
+"""
+
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+PUMP_TYPES = ('PumpType', 'InfluentPumpType')
+
+# Used when a template has no designSpecs (same as IPS_PMP_001)
+DEFAULT_DESIGN_SPECS = {
+    'DesignFlow': 2500.0,
+    'DesignHead': 15.0,
+    'DesignPower': 150.0,
+    'MaxRPM': 1180,
+    'MinRPM': 600,
+    'FullLoadAmps': 225.0,
+    'RatedVoltage': 480,
+    'ImpellerDiameter': 450.0,
+    'NPSHRequired': 4.5,
+    'ManufacturerBEP_Efficiency': 84.0,
+    'MotorEfficiency': 95.4,
+}
+
+PUMP_ALARMS = ['HighVibrationAlarm', 'HighBearingTempAlarm', 'OverloadAlarm', 'CavitationAlarm']
+CHAMBER_ALARMS = ['HighLevelAlarm_WetWell', 'LowLevelAlarm_WetWell']
+
+
+def _scaled_specs(base: Dict[str, Any], flow_scale: float, head_scale: float) -> Dict[str, Any]:
+    """Scale a pump model's specs to a new flow and head at similar efficiency."""
+    specs = dict(base)
+    power_scale = flow_scale * head_scale
+    for key, scale in (('DesignFlow', flow_scale), ('DesignHead', head_scale),
+                       ('DesignPower', power_scale), ('FullLoadAmps', power_scale),
+                       ('ImpellerDiameter', math.sqrt(head_scale)),
+                       ('NPSHRequired', flow_scale ** (2.0 / 3.0))):
+        if key in specs:
+            specs[key] = round(float(specs[key]) * scale, 1)
+    return specs
+
+
+def generate_fleet(template: Dict[str, Any], stations: int, pumps_per_station: int,
+                   chambers_per_station: int = 1, seed: int = 0, spread: float = 0.25,
+                   prefix: str = 'SYN') -> Dict[str, Any]:
+    """Generate an assets.json-style configuration from a pump template.
+
+    Args:
+        template: Template dict from DatabaseManager.get_templates(), or a raw
+            assets.json pump entry
+        stations: Number of pump stations
+        pumps_per_station: Simulated pumps per station
+        chambers_per_station: Simulated chambers per station (the first is the wet well)
+        seed: Random seed
+        spread: Log-normal sigma of the per-station flow and head scale
+        prefix: Id prefix of every generated asset
+
+    Returns:
+        Configuration with 'metadata', 'assets' and 'summary' like assets.json
+    """
+    if 'template' in template:
+        entry = template.get('template') or {}
+        type_name = template.get('type_name') or entry.get('type', 'PumpType')
+        base_specs = template.get('design_specs') or entry.get('designSpecs') or {}
+    else:
+        entry = template
+        type_name = template.get('type', 'PumpType')
+        base_specs = template.get('designSpecs') or {}
+    if type_name not in PUMP_TYPES:
+        raise ValueError(f"Template type {type_name} is not a pump type")
+    base_specs = dict(base_specs or DEFAULT_DESIGN_SPECS)
+    base_properties = entry.get('properties', {})
+    alarms = list(entry.get('alarms') or PUMP_ALARMS)
+
+    rng = random.Random(seed)
+    station_width = max(4, len(str(stations)))
+    pump_width = max(3, len(str(pumps_per_station)))
+    chamber_width = max(2, len(str(chambers_per_station)))
+    installed = datetime(2015, 1, 1)
+
+    assets: List[Dict[str, Any]] = [{
+        'id': prefix,
+        'name': f'{prefix}_SyntheticPlant',
+        'displayName': f'{prefix} - Synthetic Plant',
+        'description': f'Generated fleet: {stations} stations x {pumps_per_station} pumps',
+        'type': 'Folder',
+        'hierarchyLevel': 'Plant',
+        'parent': 'ObjectsFolder',
+    }]
+
+    for s in range(1, stations + 1):
+        station_id = f'{prefix}_S{s:0{station_width}d}'
+        specs = _scaled_specs(base_specs, rng.lognormvariate(0.0, spread), rng.lognormvariate(0.0, spread))
+        design_flow = float(specs.get('DesignFlow', DEFAULT_DESIGN_SPECS['DesignFlow']))
+        design_head = float(specs.get('DesignHead', DEFAULT_DESIGN_SPECS['DesignHead']))
+        station_flow = design_flow * max(1, pumps_per_station - 1)
+
+        assets.append({
+            'id': station_id,
+            'name': f'{station_id}_PumpStation',
+            'displayName': f'{station_id} - Pump Station {s}',
+            'description': f'Synthetic pump station {s}',
+            'type': 'Folder',
+            'hierarchyLevel': 'System',
+            'parent': prefix,
+            'systemCurve': {
+                'StaticHead': round(design_head * rng.uniform(0.4, 0.7), 2),
+                'DesignFlow': round(station_flow, 1),
+                'DesignHead': design_head,
+            },
+        })
+
+        for p in range(1, pumps_per_station + 1):
+            pump_id = f'{station_id}_PMP_{p:0{pump_width}d}'
+            pump_specs = dict(specs)
+            for key in ('ManufacturerBEP_Efficiency', 'MotorEfficiency'):
+                if key in pump_specs:
+                    pump_specs[key] = round(min(97.0, float(pump_specs[key]) + rng.gauss(0.0, 0.5)), 1)
+            properties = dict(base_properties)
+            properties.update({
+                'AssetId': pump_id.replace('_', '-'),
+                'AssetName': f'Station {s} Pump {p}',
+                'Location': f'Pump Station {s} - Bay {p}',
+                'SerialNumber': f'SYN-{rng.randrange(10 ** 8):08d}',
+                'InstallationDate': (installed + timedelta(days=rng.randrange(3650))).strftime('%Y-%m-%dT00:00:00Z'),
+            })
+            assets.append({
+                'id': pump_id,
+                'name': pump_id,
+                'displayName': f'Station {s} Pump {p}',
+                'description': f'Synthetic {type_name} {p} of station {s}',
+                'type': type_name,
+                'hierarchyLevel': 'Asset',
+                'parent': station_id,
+                'simulate': True,
+                'properties': properties,
+                'designSpecs': pump_specs,
+                'alarms': alarms,
+            })
+
+        for c in range(1, chambers_per_station + 1):
+            chamber_id = f'{station_id}_WW_{c:0{chamber_width}d}'
+            chamber: Dict[str, Any] = {
+                'id': chamber_id,
+                'name': chamber_id,
+                'displayName': f'Station {s} Wet Well {c}',
+                'description': f'Synthetic wet well {c} of station {s}',
+                'type': 'ChamberType',
+                'hierarchyLevel': 'Asset',
+                'parent': station_id,
+                'simulate': True,
+                'properties': {
+                    'AssetId': chamber_id.replace('_', '-'),
+                    'AssetName': f'Station {s} Wet Well {c}',
+                    'Location': f'Pump Station {s}',
+                },
+                'alarms': list(CHAMBER_ALARMS),
+            }
+            if c == 1:
+                inflow = station_flow * rng.uniform(0.5, 0.8)
+                chamber['wetWell'] = {
+                    'Area': round(inflow * rng.uniform(8.0, 15.0) / 60.0, 1),
+                    'Inflow': round(inflow, 1),
+                }
+            assets.append(chamber)
+
+    pumps = stations * pumps_per_station
+    chambers = stations * chambers_per_station
+    return {
+        'metadata': {
+            'version': '2.0',
+            'description': f'Synthetic fleet generated from a {type_name} template',
+            'generator': {'stations': stations, 'pumpsPerStation': pumps_per_station,
+                          'chambersPerStation': chambers_per_station, 'seed': seed, 'spread': spread},
+        },
+        'assets': assets,
+        'summary': {
+            'totalAssets': len(assets),
+            'hierarchy': {'plants': 1, 'systems': stations},
+            'assetsByType': {type_name: pumps, 'ChamberType': chambers, 'Folder': stations + 1},
+            'simulatedAssets': pumps + chambers,
+        },
+    }
+
+
+def parse_fleet_size(text: str) -> Dict[str, int]:
+    """Parse "STATIONSxPUMPS[xCHAMBERS]" (e.g. "500x20x1") into generate_fleet counts."""
+    parts = [int(part) for part in text.lower().split('x')]
+    if len(parts) not in (2, 3) or min(parts) < 0 or parts[0] < 1:
+        raise ValueError(f"Invalid fleet size {text!r} (expected STATIONSxPUMPS[xCHAMBERS])")
+    return {
+        'stations': parts[0],
+        'pumps_per_station': parts[1],
+        'chambers_per_station': parts[2] if len(parts) == 3 else 1,
+    }
+
+
+def select_template(templates: List[Dict[str, Any]], name: Optional[str] = None) -> Dict[str, Any]:
+    """Pick a pump template by name (default: the first enabled pump template)."""
+    for template in templates:
+        if template.get('type_name') not in PUMP_TYPES:
+            continue
+        if name is None or name in (template.get('name'), str(template.get('id'))):
+            return template
+    raise ValueError(f"No pump template {name!r}" if name else "No pump templates available")
@@ -2,16 +2,102 @@
 
 Instantiates assets from assets.json configuration using types defined in types.yaml.
 Builds the complete asset hierarchy (Plant -> Process -> System -> Asset).
+Assets are ordered once so every parent is built before its children
+(order_assets), and each asset is then built exactly once, however deep
+the hierarchy. Subtrees are built one after another (the in-process
+server inserts nodes without yielding to the event loop, so building
+siblings concurrently gains nothing), and the wall-clock time of every
+subtree is recorded (get_subtree_timings).
+
+Each ObjectType is compiled once into an InstanceBlueprint, and every
+instance of it is a clone of that blueprint inserted with one batch
+add_nodes call, its properties and design specs filled in at clone time.
+Every node an instance gets is recorded in a binding manifest (dotted
+browse path -> NodeBinding with the node, variant type, EURange and
+written value), which simulations bind from instead of browsing the
+address space again.
 """
 
 import logging
-from typing import Dict, List, Any, Optional, Callable
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Iterable, Tuple
 from asyncua import Server, ua
 from config.loader import ConfigLoader, AssetDef, TypeDef
+from opcua.blueprint import BindingManifest, InstanceBlueprint
 
 _logger = logging.getLogger('opcua.asset_builder')
 
 
+def order_assets(asset_defs: List[AssetDef], roots: Iterable[str]
+                 ) -> Tuple[List[AssetDef], Dict[str, List[str]], List[List[str]]]:
+    """Order assets so that every parent comes before its children.
+
+    The parent graph is walked depth-first from the roots, keeping the
+    configured order among siblings, so each subtree is contiguous.
+
+    Args:
+        asset_defs: Asset definitions in configuration order
+        roots: Ids of nodes that already exist (e.g. 'ObjectsFolder')
+
+    Returns:
+        (ordered, missing_parents, cycles): buildable assets in build order,
+        unknown parent id -> ids of the assets under it, and the asset id
+        cycles found among the assets that cannot be reached from a root
+        (assets below a cycle are in neither)
+    """
+    roots = set(roots)
+    by_id = {asset_def.id: asset_def for asset_def in asset_defs}
+    children: Dict[str, List[AssetDef]] = {}
+    for asset_def in asset_defs:
+        children.setdefault(asset_def.parent, []).append(asset_def)
+
+    ordered: List[AssetDef] = []
+    reached = set()
+    stack = [child for root in roots for child in reversed(children.get(root, []))]
+    while stack:
+        asset_def = stack.pop()
+        if asset_def.id in reached:
+            continue
+        reached.add(asset_def.id)
+        ordered.append(asset_def)
+        stack.extend(reversed(children.get(asset_def.id, [])))
+
+    # Unreached assets hang below an unknown parent or sit on (or below) a cycle
+    missing_parents: Dict[str, List[str]] = {}
+    cycles: List[List[str]] = []
+    blocked_by: Dict[str, Optional[str]] = {}  # unreached asset -> unknown parent (None = cycle)
+    for asset_def in asset_defs:
+        path: List[str] = []
+        current = asset_def
+        while current.id not in reached and current.id not in blocked_by and current.id not in path:
+            path.append(current.id)
+            if current.parent not in by_id:
+                cause = current.parent
+                break
+            current = by_id[current.parent]
+        else:
+            if current.id in path:
+                cycles.append(path[path.index(current.id):])
+                cause = None
+            else:
+                cause = blocked_by.get(current.id)
+        for asset_id in path:
+            blocked_by[asset_id] = cause
+            if cause is not None:
+                missing_parents.setdefault(cause, []).append(asset_id)
+
+    return ordered, missing_parents, cycles
+
+
+@dataclass
+class SubtreeTiming:
+    """Build time of one asset and everything below it."""
+    assets: int = 0            # assets built in the subtree, including its root
+    own_ms: float = 0.0        # creating the root asset itself
+    elapsed_ms: float = 0.0    # wall clock for the whole subtree
+
+
 class AssetBuilder:
     """Builds OPC-UA asset instances from configuration."""
 
@@ -20,40 +106,75 @@ class AssetBuilder:
         self.config = config
         self.type_nodes = type_nodes
         self.idx = idx
+        self.subtree_timings: Dict[str, SubtreeTiming] = {}  # asset id -> timing (assets with children)
         self.node_map: Dict[str, Any] = {'ObjectsFolder': server.nodes.objects}
         self.simulation_targets: List[Dict] = []  # Assets that need simulation binding
+        self.blueprints: Dict[str, InstanceBlueprint] = {}  # type name -> compiled instance blueprint
+        self._folders = {'ObjectsFolder'}  # ids of folder nodes (children are organized, not components)
 
     async def build_all_assets(self) -> Dict[str, Any]:
         """Build all asset instances from configuration."""
         asset_defs = self.config.get_asset_definitions()
         type_defs = self.config.get_type_definitions()
 
-        # Process assets in multiple passes to handle parent dependencies
-        pending = asset_defs.copy()
-        max_passes = 10
-        passes = 0
-
-        while pending and passes < max_passes:
-            remaining = []
-            progress = False
-
-            for asset_def in pending:
-                if asset_def.parent in self.node_map:
-                    await self._build_asset(asset_def, type_defs)
-                    progress = True
-                else:
-                    remaining.append(asset_def)
-
-            pending = remaining
-            passes += 1
+        # Order once so parents are always built before their children
+        ordered, missing_parents, cycles = order_assets(asset_defs, self.node_map)
+        for parent, asset_ids in missing_parents.items():
+            _logger.error(f"Cannot resolve parent {parent} of {len(asset_ids)} asset(s): {asset_ids}")
+        for cycle in cycles:
+            _logger.error(f"Parent cycle: {' -> '.join(cycle + cycle[:1])}")
+        if len(ordered) < len(asset_defs):
+            _logger.error(f"{len(asset_defs) - len(ordered)} asset(s) cannot be built")
+
+        children: Dict[str, List[AssetDef]] = {}
+        for asset_def in ordered:
+            children.setdefault(asset_def.parent, []).append(asset_def)
+
+        started = time.perf_counter()
+        roots = [asset_def for root in list(self.node_map) for asset_def in children.get(root, [])]
+        for asset_def in roots:
+            await self._build_subtree(asset_def, children, type_defs)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+        for asset_def in roots:
+            timing = self.subtree_timings.get(asset_def.id)
+            if timing:
+                _logger.info(f"Built {asset_def.name}: {timing.assets} asset(s) in {timing.elapsed_ms:.0f} ms")
+        _logger.info(f"Built {len(self.node_map) - 1} assets from {len(self.blueprints)} blueprint(s) "
+                     f"in {elapsed_ms:.0f} ms")
+        return self.node_map
 
-            if not progress and pending:
-                missing_parents = set(a.parent for a in pending)
-                _logger.error(f"Cannot resolve parents: {missing_parents}")
-                break
+    async def _build_subtree(self, asset_def: AssetDef, children: Dict[str, List[AssetDef]],
+                             type_defs: Dict[str, TypeDef]) -> int:
+        """Build an asset, then its children's subtrees in configuration order.
 
-        _logger.info(f"Built {len(self.node_map) - 1} assets in {passes} passes")
-        return self.node_map
+        Returns:
+            Number of assets built in the subtree
+        """
+        started = time.perf_counter()
+        node = await self._build_asset(asset_def, type_defs)
+        own_ms = (time.perf_counter() - started) * 1000.0
+
+        below = children.get(asset_def.id, [])
+        if node is None:
+            # A parent of an unknown type is not built, and neither is its subtree
+            self._skip_subtree(below, children)
+            return 0
+        if not below:
+            return 1
+
+        counts = [await self._build_subtree(child, children, type_defs) for child in below]
+        timing = SubtreeTiming(1 + sum(counts), own_ms, (time.perf_counter() - started) * 1000.0)
+        self.subtree_timings[asset_def.id] = timing
+        _logger.debug(f"Built subtree {asset_def.name}: {timing.assets} asset(s) in {timing.elapsed_ms:.1f} ms "
+                      f"({timing.own_ms:.1f} ms own)")
+        return timing.assets
+
+    def _skip_subtree(self, asset_defs: List[AssetDef], children: Dict[str, List[AssetDef]]) -> None:
+        """Log every asset below a parent that was not built."""
+        for asset_def in asset_defs:
+            _logger.warning(f"Skipping {asset_def.name}: parent {asset_def.parent} was not built")
+            self._skip_subtree(children.get(asset_def.id, []), children)
 
     async def _build_asset(self, asset_def: AssetDef, type_defs: Dict[str, TypeDef]) -> Any:
         """Build a single asset instance."""
@@ -62,25 +183,19 @@ class AssetBuilder:
         if asset_def.asset_type == 'Folder':
             # Create folder
             node = await parent_node.add_folder(self.idx, asset_def.name)
+            self._folders.add(asset_def.id)
             _logger.debug(f"Created folder: {asset_def.name}")
 
         elif asset_def.asset_type in self.type_nodes:
-            # Instantiate from type
-            type_node = self.type_nodes[asset_def.asset_type]
-            node = await parent_node.add_object(self.idx, asset_def.name, objecttype=type_node.nodeid)
-
-            # Get type definition for manual component building
-            type_def = type_defs.get(asset_def.asset_type)
-            if type_def:
-                await self._build_instance_components(node, type_def, type_defs)
-
-            # Apply properties
-            if asset_def.properties:
-                await self._apply_properties(node, asset_def.properties)
-
-            # Apply design specs
-            if asset_def.design_specs:
-                await self._apply_design_specs(node, asset_def.design_specs)
+            # Clone the type's blueprint in one batch
+            blueprint = self._blueprint(asset_def.asset_type, type_defs)
+            reference_type = (ua.ObjectIds.Organizes if asset_def.parent in self._folders
+                              else ua.ObjectIds.HasComponent)
+            bindings: BindingManifest
+            node, bindings = await blueprint.instantiate(
+                parent_node, self.idx, asset_def.id, asset_def.name,
+                self.type_nodes[asset_def.asset_type].nodeid, reference_type,
+                self._instance_values(asset_def, blueprint), self._placeholder_method)
 
             # Track for simulation binding
             if asset_def.simulate:
@@ -89,7 +204,8 @@ class AssetBuilder:
                     'name': asset_def.name,
                     'type': asset_def.asset_type,
                     'node': node,
-                    'design_specs': asset_def.design_specs
+                    'design_specs': asset_def.design_specs,
+                    'bindings': bindings
                 })
 
             _logger.debug(f"Created {asset_def.asset_type}: {asset_def.name}")
@@ -101,215 +217,58 @@ class AssetBuilder:
         self.node_map[asset_def.id] = node
         return node
 
-    async def _build_instance_components(self, node: Any, type_def: TypeDef,
-                                          type_defs: Dict[str, TypeDef]) -> None:
-        """Manually build instance components from type definition.
-
-        asyncua doesn't always instantiate all components from ObjectType,
-        so we need to build them manually.
-        """
-        # Include inherited components
-        all_components = {}
-        all_properties = {}
-        all_methods = {}
-
-        # Walk inheritance chain
-        current_type = type_def
-        while current_type:
-            # Merge (child overrides parent)
-            for name, comp in current_type.components.items():
-                if name not in all_components:
-                    all_components[name] = comp
-            for name, prop in current_type.properties.items():
-                if name not in all_properties:
-                    all_properties[name] = prop
-            for name, method in current_type.methods.items():
-                if name not in all_methods:
-                    all_methods[name] = method
-
-            # Get parent type
-            if current_type.base and current_type.base != 'BaseObjectType':
-                current_type = type_defs.get(current_type.base)
+    def _blueprint(self, type_name: str, type_defs: Dict[str, TypeDef]) -> InstanceBlueprint:
+        """Get a type's instance blueprint, compiling it on first use."""
+        blueprint = self.blueprints.get(type_name)
+        if blueprint is None:
+            type_def = type_defs.get(type_name) or TypeDef(type_name, 'ObjectType', 'BaseObjectType')
+            blueprint = InstanceBlueprint.compile(type_def, type_defs)
+            self.blueprints[type_name] = blueprint
+        return blueprint
+
+    def _instance_values(self, asset_def: AssetDef, blueprint: InstanceBlueprint) -> Dict[str, Any]:
+        """Map an asset's properties and design specs onto blueprint paths."""
+        values: Dict[str, Any] = {}
+        for prop_name, prop_value in asset_def.properties.items():
+            self._set_value(values, blueprint, prop_name, prop_value, ua.Variant(prop_value).VariantType)
+
+        for spec_name, spec_value in asset_def.design_specs.items():
+            # Determine correct variant type
+            if isinstance(spec_value, int):
+                variant_type = ua.VariantType.UInt32
+            elif isinstance(spec_value, float):
+                variant_type = ua.VariantType.Double
             else:
-                break
-
-        # Build properties
-        from opcua.type_builder import TypeBuilder
-        for prop_name, prop_def in all_properties.items():
-            await self._ensure_component(node, prop_name, prop_def)
-
-        # Build components
-        for comp_name, comp_def in all_components.items():
-            await self._ensure_component(node, comp_name, comp_def)
-
-        # Build methods
-        for method_name, method_def in all_methods.items():
-            await self._ensure_method(node, method_name, method_def)
-
-    async def _ensure_component(self, parent: Any, name: str, comp_def: Any) -> Optional[Any]:
-        """Ensure a component exists on an instance, creating if needed."""
-        # Check if already exists
-        children = await parent.get_children()
-        for child in children:
-            bn = await child.read_browse_name()
-            if bn.Name == name:
-                # Already exists, maybe add nested components
-                if comp_def.component_type == 'Object' and comp_def.components:
-                    for nested_name, nested_def in comp_def.components.items():
-                        await self._ensure_component(child, nested_name, nested_def)
-                return child
-
-        # Create component
-        from opcua.type_builder import TypeBuilder
-        variant_type = TypeBuilder.DATA_TYPE_MAP.get(comp_def.data_type, ua.VariantType.String)
-        initial_value = comp_def.value if comp_def.value is not None else self._get_default(variant_type)
-
-        try:
-            node = None
-
-            if comp_def.component_type == 'Property':
-                node = await parent.add_property(self.idx, name, initial_value, varianttype=variant_type)
-
-            elif comp_def.component_type == 'Object':
-                node = await parent.add_object(self.idx, name)
-                for nested_name, nested_def in comp_def.components.items():
-                    await self._ensure_component(node, nested_name, nested_def)
-
-            elif comp_def.component_type in ('AnalogItemType', 'DataItemType'):
-                node = await parent.add_variable(self.idx, name, initial_value, varianttype=variant_type)
-                # Add EURange
-                if comp_def.eu_range:
-                    eu_range = ua.Range(Low=comp_def.eu_range.low, High=comp_def.eu_range.high)
-                    await node.add_property(self.idx, "EURange", eu_range)
-
-            elif comp_def.component_type == 'TwoStateDiscreteType':
-                node = await parent.add_variable(self.idx, name, False, varianttype=ua.VariantType.Boolean)
-                if comp_def.true_state:
-                    await node.add_property(self.idx, "TrueState", ua.LocalizedText(comp_def.true_state))
-                if comp_def.false_state:
-                    await node.add_property(self.idx, "FalseState", ua.LocalizedText(comp_def.false_state))
-                if comp_def.access_level == 'ReadWrite':
-                    await node.set_writable()
-
-            else:
-                node = await parent.add_variable(self.idx, name, initial_value, varianttype=variant_type)
-
-            return node
-
-        except Exception as e:
-            _logger.debug(f"Could not create {name}: {e}")
-            return None
-
-    async def _ensure_method(self, parent: Any, name: str, method_def: Any) -> Optional[Any]:
-        """Ensure a method exists on an instance."""
-        # Check if already exists
-        children = await parent.get_children()
-        for child in children:
-            bn = await child.read_browse_name()
-            if bn.Name == name:
-                return child
-
-        # Create method with placeholder
-        from opcua.type_builder import TypeBuilder
-
-        input_args = []
-        for arg in method_def.input_arguments:
-            arg_type = TypeBuilder.DATA_TYPE_MAP.get(arg.get('dataType', 'String'), ua.VariantType.String)
-            input_args.append(ua.Argument(
-                Name=arg.get('name', ''),
-                DataType=ua.NodeId(arg_type.value, 0),
-                ValueRank=-1,
-                Description=ua.LocalizedText(arg.get('description', ''))
-            ))
-
-        output_args = []
-        for arg in method_def.output_arguments:
-            arg_type = TypeBuilder.DATA_TYPE_MAP.get(arg.get('dataType', 'String'), ua.VariantType.String)
-            output_args.append(ua.Argument(
-                Name=arg.get('name', ''),
-                DataType=ua.NodeId(arg_type.value, 0),
-                ValueRank=-1,
-                Description=ua.LocalizedText(arg.get('description', ''))
-            ))
-
-        async def placeholder(parent, *args):
-            return []
-
-        try:
-            method_node = await parent.add_method(self.idx, name, placeholder, input_args, output_args)
-            return method_node
-        except Exception as e:
-            _logger.debug(f"Could not create method {name}: {e}")
-            return None
-
-    async def _apply_properties(self, node: Any, properties: Dict[str, Any]) -> None:
-        """Apply property values to an instance."""
-        children = await node.get_children()
-        child_map = {}
-        for child in children:
-            bn = await child.read_browse_name()
-            child_map[bn.Name] = child
-
-        for prop_name, prop_value in properties.items():
-            if prop_name in child_map:
-                try:
-                    await child_map[prop_name].write_value(prop_value)
-                except Exception as e:
-                    _logger.debug(f"Could not set property {prop_name}: {e}")
-
-    async def _apply_design_specs(self, node: Any, specs: Dict[str, Any]) -> None:
-        """Apply design specifications to a pump instance."""
-        # Find DesignSpecs object
-        children = await node.get_children()
-        design_specs_node = None
-
-        for child in children:
-            bn = await child.read_browse_name()
-            if bn.Name == 'DesignSpecs':
-                design_specs_node = child
-                break
-
-        if not design_specs_node:
-            _logger.debug(f"DesignSpecs not found on {node}")
+                variant_type = ua.Variant(spec_value).VariantType
+            self._set_value(values, blueprint, f"DesignSpecs.{spec_name}", spec_value, variant_type)
+        return values
+
+    def _set_value(self, values: Dict[str, Any], blueprint: InstanceBlueprint, path: str,
+                   value: Any, variant_type: ua.VariantType) -> None:
+        """Use value for the node at path if the node has that variant type."""
+        entry = blueprint.get(path)
+        if entry is None:
             return
+        if entry.variant_type != variant_type:
+            _logger.debug(f"Could not set {path}: {variant_type.name} value for {entry.variant_type.name} node")
+            return
+        values[path] = value
 
-        # Get children of DesignSpecs
-        spec_children = await design_specs_node.get_children()
-        spec_map = {}
-        for child in spec_children:
-            bn = await child.read_browse_name()
-            spec_map[bn.Name] = child
-
-        # Apply values
-        for spec_name, spec_value in specs.items():
-            if spec_name in spec_map:
-                try:
-                    # Determine correct variant type
-                    if isinstance(spec_value, int):
-                        await spec_map[spec_name].write_value(spec_value, varianttype=ua.VariantType.UInt32)
-                    elif isinstance(spec_value, float):
-                        await spec_map[spec_name].write_value(spec_value, varianttype=ua.VariantType.Double)
-                    else:
-                        await spec_map[spec_name].write_value(spec_value)
-                except Exception as e:
-                    _logger.debug(f"Could not set spec {spec_name}: {e}")
-
-    def _get_default(self, variant_type: ua.VariantType) -> Any:
-        """Get default value for variant type."""
-        defaults = {
-            ua.VariantType.Double: 0.0,
-            ua.VariantType.Float: 0.0,
-            ua.VariantType.Int32: 0,
-            ua.VariantType.UInt32: 0,
-            ua.VariantType.Boolean: False,
-            ua.VariantType.String: "",
-        }
-        return defaults.get(variant_type, None)
+    @staticmethod
+    async def _placeholder_method(parent, *args):
+        return []
 
     def get_simulation_targets(self) -> List[Dict]:
         """Get list of assets that need simulation binding."""
         return self.simulation_targets
 
+    def get_subtree_timings(self) -> Dict[str, Dict[str, Any]]:
+        """Get the build time of every asset subtree."""
+        return {asset_id: {'assets': timing.assets,
+                           'own_ms': round(timing.own_ms, 2),
+                           'elapsed_ms': round(timing.elapsed_ms, 2)}
+                for asset_id, timing in self.subtree_timings.items()}
+
     def get_node(self, asset_id: str) -> Optional[Any]:
         """Get a node by asset ID."""
         return self.node_map.get(asset_id)
@@ -0,0 +1,269 @@
+"""Per-type instance blueprints.
+
+An ObjectType is compiled once into an InstanceBlueprint: a flat list of
+the nodes every instance gets (properties, variables with their
+EURange/TrueState/FalseState properties, nested objects, methods with their
+argument properties), each with its node attributes, reference type, type
+definition and parent browse path. The inheritance chain is resolved at
+compile time (a derived type overrides its base).
+
+Instances are stamped out by cloning the blueprint: every node gets a fresh
+NodeId derived from the instance id and its browse path, per-instance
+values (asset properties, design specs) are substituted, and the whole
+instance is inserted with a single add_nodes call instead of one awaited
+call per node.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from asyncua import Node, ua
+from config.loader import ComponentDef, TypeDef
+from opcua.type_builder import TypeBuilder
+from simulation.write_plan import NodeBinding
+
+# Browse path -> binding for one asset's nodes
+BindingManifest = Dict[str, NodeBinding]
+
+_logger = logging.getLogger('opcua.blueprint')
+
+_READ = ua.AccessLevel.CurrentRead.mask
+_READ_WRITE = ua.AccessLevel.CurrentRead.mask | ua.AccessLevel.CurrentWrite.mask
+
+
+@dataclass(frozen=True)
+class BlueprintNode:
+    """One node of an instance, relative to the instance root."""
+    path: str                  # dotted browse path below the instance
+    parent: str                # path of the parent node ('' = instance root)
+    name: str
+    node_class: ua.NodeClass
+    reference_type: int        # ua.ObjectIds.HasComponent / HasProperty
+    type_definition: Optional[int] = None
+    variant_type: Optional[ua.VariantType] = None
+    data_type: Optional[ua.NodeId] = None
+    value: Any = None
+    value_rank: int = ua.ValueRank.Scalar
+    writable: bool = False
+    eu_range: Optional[Tuple[float, float]] = None
+    namespace: Optional[int] = None  # browse name namespace (None = the instance's)
+    bind: bool = True          # recorded in the binding manifest
+
+
+def _default_value(variant_type: ua.VariantType) -> Any:
+    """Get default value for variant type."""
+    defaults = {
+        ua.VariantType.Double: 0.0,
+        ua.VariantType.Float: 0.0,
+        ua.VariantType.Int32: 0,
+        ua.VariantType.UInt32: 0,
+        ua.VariantType.Boolean: False,
+        ua.VariantType.String: "",
+    }
+    return defaults.get(variant_type, None)
+
+
+def _arguments(args: List[Dict]) -> List[ua.Argument]:
+    """Build method Argument structures from their definitions."""
+    arguments = []
+    for arg in args:
+        arg_type = TypeBuilder.DATA_TYPE_MAP.get(arg.get('dataType', 'String'), ua.VariantType.String)
+        arguments.append(ua.Argument(
+            Name=arg.get('name', ''),
+            DataType=ua.NodeId(arg_type.value, 0),
+            ValueRank=-1,
+            Description=ua.LocalizedText(arg.get('description', ''))
+        ))
+    return arguments
+
+
+class InstanceBlueprint:
+    """The nodes of one ObjectType's instances, compiled once."""
+
+    def __init__(self, type_name: str, nodes: List[BlueprintNode]):
+        self.type_name = type_name
+        self.nodes = nodes
+        self.instances = 0
+        self._by_path = {entry.path: entry for entry in nodes}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get(self, path: str) -> Optional[BlueprintNode]:
+        """Get the node at a dotted browse path."""
+        return self._by_path.get(path)
+
+    @classmethod
+    def compile(cls, type_def: TypeDef, type_defs: Dict[str, TypeDef]) -> 'InstanceBlueprint':
+        """Compile a type, including its inherited components."""
+        all_components: Dict[str, ComponentDef] = {}
+        all_properties: Dict[str, ComponentDef] = {}
+        all_methods: Dict[str, ComponentDef] = {}
+
+        # Walk inheritance chain
+        current_type = type_def
+        while current_type:
+            # Merge (child overrides parent)
+            for name, comp in current_type.components.items():
+                all_components.setdefault(name, comp)
+            for name, prop in current_type.properties.items():
+                all_properties.setdefault(name, prop)
+            for name, method in current_type.methods.items():
+                all_methods.setdefault(name, method)
+
+            # Get parent type
+            if current_type.base and current_type.base != 'BaseObjectType':
+                current_type = type_defs.get(current_type.base)
+            else:
+                break
+
+        nodes: List[BlueprintNode] = []
+        for prop_name, prop_def in all_properties.items():
+            cls._compile_component(nodes, '', prop_name, prop_def)
+        for comp_name, comp_def in all_components.items():
+            cls._compile_component(nodes, '', comp_name, comp_def)
+        for method_name, method_def in all_methods.items():
+            cls._compile_method(nodes, method_name, method_def)
+
+        _logger.debug(f"Compiled {type_def.name} blueprint: {len(nodes)} nodes")
+        return cls(type_def.name, nodes)
+
+    @staticmethod
+    def _compile_component(nodes: List[BlueprintNode], parent: str, name: str, comp_def: ComponentDef) -> None:
+        """Append a component (and its nested components and properties)."""
+        path = f"{parent}.{name}" if parent else name
+
+        if comp_def.component_type == 'Object':
+            nodes.append(BlueprintNode(path, parent, name, ua.NodeClass.Object, ua.ObjectIds.HasComponent,
+                                       ua.ObjectIds.BaseObjectType))
+            for nested_name, nested_def in comp_def.components.items():
+                InstanceBlueprint._compile_component(nodes, path, nested_name, nested_def)
+            return
+
+        variant_type = TypeBuilder.DATA_TYPE_MAP.get(comp_def.data_type, ua.VariantType.String)
+        value = comp_def.value if comp_def.value is not None else _default_value(variant_type)
+        eu_range = (comp_def.eu_range.low, comp_def.eu_range.high) if comp_def.eu_range else None
+        properties: List[Tuple[str, Any]] = []
+        writable = False
+
+        if comp_def.component_type in ('AnalogItemType', 'DataItemType'):
+            if comp_def.eu_range:
+                properties.append(("EURange", ua.Range(Low=comp_def.eu_range.low, High=comp_def.eu_range.high)))
+
+        elif comp_def.component_type == 'TwoStateDiscreteType':
+            variant_type, value = ua.VariantType.Boolean, False
+            if comp_def.true_state:
+                properties.append(("TrueState", ua.LocalizedText(comp_def.true_state)))
+            if comp_def.false_state:
+                properties.append(("FalseState", ua.LocalizedText(comp_def.false_state)))
+            writable = comp_def.access_level == 'ReadWrite'
+
+        if comp_def.component_type == 'Property':
+            reference_type, type_definition = ua.ObjectIds.HasProperty, ua.ObjectIds.PropertyType
+        else:
+            reference_type, type_definition = ua.ObjectIds.HasComponent, ua.ObjectIds.BaseDataVariableType
+
+        nodes.append(BlueprintNode(path, parent, name, ua.NodeClass.Variable, reference_type, type_definition,
+                                   variant_type, ua.NodeId(getattr(ua.ObjectIds, variant_type.name)),
+                                   value, writable=writable, eu_range=eu_range))
+        for prop_name, prop_value in properties:
+            prop_type = (ua.VariantType.LocalizedText if isinstance(prop_value, ua.LocalizedText)
+                         else ua.VariantType.ExtensionObject)
+            nodes.append(BlueprintNode(f"{path}.{prop_name}", path, prop_name, ua.NodeClass.Variable,
+                                       ua.ObjectIds.HasProperty, ua.ObjectIds.PropertyType, prop_type,
+                                       ua.NodeId(getattr(ua.ObjectIds, type(prop_value).__name__)), prop_value))
+
+    @staticmethod
+    def _compile_method(nodes: List[BlueprintNode], name: str, method_def: ComponentDef) -> None:
+        """Append a method and its InputArguments/OutputArguments properties."""
+        nodes.append(BlueprintNode(name, '', name, ua.NodeClass.Method, ua.ObjectIds.HasComponent))
+        for prop_name, args in (("InputArguments", method_def.input_arguments),
+                                ("OutputArguments", method_def.output_arguments)):
+            if args:
+                nodes.append(BlueprintNode(f"{name}.{prop_name}", name, prop_name, ua.NodeClass.Variable,
+                                           ua.ObjectIds.HasProperty, ua.ObjectIds.PropertyType,
+                                           ua.VariantType.ExtensionObject, ua.NodeId(ua.ObjectIds.Argument),
+                                           _arguments(args), ua.ValueRank.OneDimension, namespace=0, bind=False))
+
+    async def instantiate(self, parent: Any, idx: int, instance_id: str, name: str, type_nodeid: ua.NodeId,
+                          reference_type: int = ua.ObjectIds.HasComponent,
+                          values: Optional[Dict[str, Any]] = None,
+                          method_callback: Optional[Callable[..., Any]] = None
+                          ) -> Tuple[Any, BindingManifest]:
+        """Clone the blueprint below parent in one batch insert.
+
+        Args:
+            parent: Parent node
+            idx: Namespace index of the new nodes
+            instance_id: Unique id the new NodeIds are derived from
+            name: Browse name of the instance
+            type_nodeid: ObjectType the instance is typed by
+            reference_type: Reference from parent to the instance
+            values: Browse path -> per-instance value (must match the node's variant type)
+            method_callback: Placeholder linked to every method until a simulation binds its own
+
+        Returns:
+            (instance node, binding manifest)
+        """
+        values = values or {}
+        root_id = ua.NodeId(instance_id, idx)
+        nodeids = {'': root_id}
+        items = [self._add_item(root_id, parent.nodeid, ua.QualifiedName(name, idx), ua.NodeClass.Object,
+                                reference_type, type_nodeid, ua.ObjectAttributes(EventNotifier=0))]
+
+        for entry in self.nodes:
+            nodeid = ua.NodeId(f"{instance_id}.{entry.path}", idx)
+            nodeids[entry.path] = nodeid
+            qname = ua.QualifiedName(entry.name, idx if entry.namespace is None else entry.namespace)
+            if entry.node_class == ua.NodeClass.Variable:
+                access_level = _READ_WRITE if entry.writable else _READ
+                attrs = ua.VariableAttributes(
+                    Value=ua.Variant(values.get(entry.path, entry.value), entry.variant_type),
+                    DataType=entry.data_type, ValueRank=entry.value_rank,
+                    AccessLevel=access_level, UserAccessLevel=access_level, Historizing=False)
+            elif entry.node_class == ua.NodeClass.Method:
+                attrs = ua.MethodAttributes(Executable=True, UserExecutable=True)
+            else:
+                attrs = ua.ObjectAttributes(EventNotifier=0)
+            type_definition = ua.NodeId(entry.type_definition) if entry.type_definition else ua.NodeId()
+            items.append(self._add_item(nodeid, nodeids[entry.parent], qname, entry.node_class,
+                                        entry.reference_type, type_definition, attrs))
+
+        session = parent.session
+        results = await session.add_nodes(items)
+        results[0].StatusCode.check()
+
+        bindings: BindingManifest = {}
+        for entry, result in zip(self.nodes, results[1:]):
+            if not result.StatusCode.is_good():
+                _logger.debug(f"Could not create {name}.{entry.path}: {result.StatusCode.name}")
+                continue
+            child = Node(session, nodeids[entry.path])
+            if entry.node_class == ua.NodeClass.Method and method_callback is not None:
+                session.add_method_callback(child.nodeid, method_callback)
+            if entry.bind:
+                bindings[entry.path] = NodeBinding(child, entry.node_class, entry.variant_type, entry.eu_range,
+                                                   values.get(entry.path, entry.value))
+
+        self.instances += 1
+        return Node(session, root_id), bindings
+
+    @staticmethod
+    def _add_item(nodeid: ua.NodeId, parent_nodeid: ua.NodeId, qname: ua.QualifiedName,
+                  node_class: ua.NodeClass, reference_type: int, type_definition: ua.NodeId,
+                  attrs: Any) -> ua.AddNodesItem:
+        """Build one AddNodesItem."""
+        attrs.DisplayName = ua.LocalizedText(qname.Name)
+        attrs.Description = ua.LocalizedText(qname.Name)
+        attrs.WriteMask = 0
+        attrs.UserWriteMask = 0
+        return ua.AddNodesItem(
+            ParentNodeId=parent_nodeid,
+            ReferenceTypeId=ua.NodeId(reference_type),
+            RequestedNewNodeId=nodeid,
+            BrowseName=qname,
+            NodeClass_=node_class,
+            NodeAttributes=attrs,
+            TypeDefinition=type_definition,
+        )
+
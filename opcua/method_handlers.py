@@ -1,6 +1,8 @@
 """OPC-UA method handlers.
 
 Binds Python callbacks to OPC-UA methods on SimulationConfig and pumps.
+Every state change goes through the engine command queue and is applied
+at the start of the next tick.
 """
 
 import logging
@@ -8,7 +10,7 @@ from typing import Dict, Any, Optional
 from asyncua import ua, uamethod
 
 from simulation.engine import SimulationEngine
-from simulation.modes import SimulationMode, FailureType
+from simulation.modes import SimulationMode, FailureType, MAX_TIME_ACCELERATION
 
 _logger = logging.getLogger('opcua.method_handlers')
 
@@ -51,11 +53,11 @@ class MethodHandlers:
             _logger.debug("Bound ApplyAging method")
 
     @uamethod
-    def _set_mode_handler(self, parent, new_mode: int):
+    async def _set_mode_handler(self, parent, new_mode: int):
         """Handle SetMode method call."""
         try:
             mode = SimulationMode(new_mode)
-            self.engine.set_mode(mode)
+            await self.engine.submit('SetMode', self.engine.set_mode, mode)
             _logger.info(f"Simulation mode set to {mode.name}")
             return [True]
         except ValueError:
@@ -63,46 +65,45 @@ class MethodHandlers:
             return [False]
 
     @uamethod
-    def _trigger_failure_handler(self, parent, failure_type: int):
+    async def _trigger_failure_handler(self, parent, failure_type: int):
         """Handle TriggerFailure method call."""
         try:
             ftype = FailureType(failure_type)
+        except ValueError:
+            _logger.warning(f"Invalid failure type: {failure_type}")
+            return [False]
 
+        def trigger() -> bool:
             # Trigger on first running pump, or first pump if none running
             for pump in self.engine.pumps.values():
                 if pump.is_running:
                     self.engine.trigger_failure(pump.asset_id, ftype)
-                    _logger.info(f"Triggered {ftype.name} failure on {pump.name}")
-                    return [True]
+                    return True
 
             # No running pump, trigger on first pump
             if self.engine.pumps:
                 first_pump = next(iter(self.engine.pumps.values()))
-                self.engine.trigger_failure(first_pump.asset_id, ftype)
-                _logger.info(f"Triggered {ftype.name} failure on {first_pump.name}")
-                return [True]
+                return self.engine.trigger_failure(first_pump.asset_id, ftype)
 
-            return [False]
+            return False
 
-        except ValueError:
-            _logger.warning(f"Invalid failure type: {failure_type}")
-            return [False]
+        return [await self.engine.submit('TriggerFailure', trigger)]
 
     @uamethod
-    def _reset_simulation_handler(self, parent):
+    async def _reset_simulation_handler(self, parent):
         """Handle ResetSimulation method call."""
-        self.engine.reset_simulation()
+        await self.engine.submit('ResetSimulation', self.engine.reset_simulation)
         _logger.info("Simulation reset to OPTIMAL")
         return [True]
 
     @uamethod
-    def _apply_aging_handler(self, parent, years: float):
+    async def _apply_aging_handler(self, parent, years: float):
         """Handle ApplyAging method call."""
         if years < 0 or years > 50:
             _logger.warning(f"Invalid aging years: {years}")
             return [False]
 
-        self.engine.apply_aging(years)
+        await self.engine.submit('ApplyAging', self.engine.apply_aging, years)
         _logger.info(f"Applied {years} years of aging")
         return [True]
 
@@ -196,7 +197,7 @@ class IntervalChangeHandler:
         self.engine = engine
 
     def datachange_notification(self, node, val, data):
-        self.engine.set_interval(float(val))
+        self.engine.post('SimulationInterval', self.engine.set_interval, float(val))
 
 
 class TimeAccelerationHandler:
@@ -206,7 +207,10 @@ class TimeAccelerationHandler:
         self.engine = engine
 
     def datachange_notification(self, node, val, data):
-        self.engine.mode_params.time_acceleration = max(0.1, min(100.0, float(val)))
+        self.engine.post('TimeAcceleration', self._set, float(val))
+
+    def _set(self, value: float) -> None:
+        self.engine.mode_params.time_acceleration = max(0.1, min(MAX_TIME_ACCELERATION, value))
         _logger.info(f"Time acceleration set to {self.engine.mode_params.time_acceleration}")
 
 
@@ -219,6 +223,6 @@ class ModeChangeHandler:
     def datachange_notification(self, node, val, data):
         try:
             mode = SimulationMode(int(val))
-            self.engine.set_mode(mode)
+            self.engine.post('Mode', self.engine.set_mode, mode)
         except ValueError:
             _logger.warning(f"Invalid mode value: {val}")
@@ -12,6 +12,19 @@ Simulates a wastewater treatment facility influent pump station with:
 Usage:
     python server.py              # Run OPC-UA server only
     python server.py --with-api   # Run OPC-UA server with REST API
+    python server.py --headless --duration-hours 336 --output history.csv
+                                  # Batch-simulate two weeks without a server
+    python server.py --record run.rec       # Record engine inputs while serving
+    python server.py --synthetic 500x20x1 --fleet
+                                  # Stress-test with 10k generated pumps
+    python server.py --export history.parquet
+                                  # Stream pump time series to Parquet files while serving
+    python server.py --replay run.rec --output run.csv
+                                  # Reproduce a recorded run offline
+    python server.py --headless --wet-wells --scenario storm.json
+                                  # Script failures, mode changes and inflow on simulated time
+    python server.py --monte-carlo space.json --runs 2000 --duration-hours 168 --output dataset/
+                                  # Labelled degradation runs across a process pool
 
 Server endpoint: opc.tcp://0.0.0.0:4840/freeopcua/server/
 API endpoint: http://0.0.0.0:8080
@@ -19,9 +32,11 @@ API endpoint: http://0.0.0.0:8080
 
 import argparse
 import asyncio
+import json
 import logging
 import signal
 import sys
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
@@ -31,6 +46,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from asyncua import Server
 
 from config.loader import ConfigLoader
+from config.synthetic import generate_fleet, parse_fleet_size, select_template
 from database.manager import DatabaseManager
 from opcua.type_builder import TypeBuilder
 from opcua.asset_builder import AssetBuilder
@@ -41,6 +57,14 @@ from simulation.pump import PumpSimulation
 from simulation.chamber import ChamberSimulation
 from simulation.modes import ModeParameters, SimulationMode, FailureType
 from simulation.pubsub import PubSubManager
+from simulation.scheduler import CatchUpPolicy
+from simulation.shedding import ShedPolicy, ShedAction
+from simulation.batch import build_headless_engine, CsvRecorder
+from simulation.recording import replay
+from simulation.montecarlo import MonteCarloRunner
+from simulation.export import ParquetExporter
+from simulation.hydraulics import group_stations
+from simulation.wetwell import group_wet_wells
 
 # Configure logging
 logging.basicConfig(
@@ -69,6 +93,59 @@ def parse_args():
                         help='Load configuration from database instead of files')
     parser.add_argument('--auto-start', action='store_true',
                         help='Automatically start all pumps when server starts')
+    parser.add_argument('--fleet', action='store_true',
+                        help='Use the vectorized fleet engine for pump physics')
+    parser.add_argument('--shards', type=int, default=0,
+                        help='Evaluate pumps and chambers in N worker processes (default: 0, in-process)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Noise seed for reproducible runs (default: random)')
+    parser.add_argument('--catch-up', choices=['skip', 'burst'], default='skip',
+                        help='How missed tick deadlines are handled after an overrun (default: skip)')
+    parser.add_argument('--no-pipeline', action='store_true',
+                        help='Publish each tick before computing the next (no overlapping publish stages)')
+    parser.add_argument('--shed-order', type=str, default='websocket_pubsub,mqtt,chambers',
+                        help='Output shed in this order while ticks overrun '
+                             '(websocket_pubsub, mqtt, chambers, opcua; empty to disable)')
+    parser.add_argument('--no-deadband', action='store_true',
+                        help='Write every value every tick (disable the types.yaml deadbands)')
+    parser.add_argument('--hydraulics', action='store_true',
+                        help='Solve pumps sharing a station header against its system curve')
+    parser.add_argument('--wet-wells', action='store_true',
+                        help='Integrate wet-well levels from inflow and pump outflow')
+    parser.add_argument('--single-rate', action='store_true',
+                        help='Sample every variable on every tick (ignore the types.yaml sampling intervals)')
+    parser.add_argument('--scenario', type=str, default=None,
+                        help='JSON file of events scheduled on simulated time (see simulation/scenario.py)')
+    parser.add_argument('--synthetic', type=str, default=None,
+                        help='Replace assets.json with a generated fleet of STATIONSxPUMPS[xCHAMBERS] '
+                             '(e.g. 500x20x1; seeded by --seed)')
+    parser.add_argument('--template', type=str, default=None,
+                        help='Pump template name or id for --synthetic (default: first pump template)')
+    parser.add_argument('--headless', action='store_true',
+                        help='Run a batch simulation on a virtual clock without OPC-UA, API or MQTT')
+    parser.add_argument('--duration-hours', type=float, default=24.0,
+                        help='Simulated hours to run in headless mode (default: 24)')
+    parser.add_argument('--step', type=float, default=60.0,
+                        help='Simulated seconds per tick in headless mode (default: 60)')
+    parser.add_argument('--start', type=str, default=None,
+                        help='Simulated UTC start time in headless mode (ISO 8601, default: now)')
+    parser.add_argument('--output', type=str, default=None,
+                        help='CSV or .parquet file for pump telemetry in headless or replay mode '
+                             '(output directory for --monte-carlo)')
+    parser.add_argument('--export', type=str, default=None,
+                        help='Stream pump time series to numbered Parquet files (PATH-00000.parquet, ...) '
+                             'while serving (requires pyarrow)')
+    parser.add_argument('--record', type=str, default=None,
+                        help='Record trajectory-changing engine inputs to this file')
+    parser.add_argument('--replay', type=str, default=None,
+                        help='Replay a recording headless at full speed and exit')
+    parser.add_argument('--monte-carlo', type=str, default=None,
+                        help='Run headless simulations sampled from this JSON parameter space '
+                             '(see simulation/montecarlo.py) across a process pool and exit')
+    parser.add_argument('--runs', type=int, default=100,
+                        help='Number of Monte Carlo runs (default: 100)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Monte Carlo worker processes (default: CPU count)')
     parser.add_argument('--debug', action='store_true',
                         help='Enable debug logging')
     return parser.parse_args()
@@ -201,6 +278,95 @@ async def setup_alarms(alarm_manager: AlarmManager, config: ConfigLoader,
     _logger.info(f"Configured alarms for {len(pump_sims)} pumps")
 
 
+def is_parquet(path: Optional[str]) -> bool:
+    """Whether an --output/--export path asks for Parquet rather than CSV."""
+    return bool(path) and path.lower().endswith('.parquet')
+
+
+def use_synthetic_fleet(config: ConfigLoader, db: DatabaseManager, args) -> None:
+    """Replace assets.json with a fleet generated from a database pump template."""
+    template = select_template(db.get_templates(), args.template)
+    fleet = generate_fleet(template, seed=args.seed or 0, **parse_fleet_size(args.synthetic))
+    config.use_assets(fleet)
+    _logger.info(f"Generated synthetic fleet from {template['name']}: {fleet['summary']['assetsByType']}")
+
+
+async def run_headless(args) -> None:
+    """Run a batch simulation on the virtual clock and exit."""
+    config = ConfigLoader()
+    if args.use_db or args.synthetic:
+        db = DatabaseManager(args.db_path)
+        db.initialize()
+        mode_params = load_mode_params_from_db(db) if args.use_db else ModeParameters()
+        if args.synthetic:
+            use_synthetic_fleet(config, db, args)
+        db.close()
+    else:
+        mode_params = ModeParameters()
+
+    engine = build_headless_engine(config, mode_params, fleet_mode=args.fleet, shards=args.shards,
+                                   seed=args.seed, hydraulics=args.hydraulics, wet_wells=args.wet_wells)
+    start = datetime.fromisoformat(args.start) if args.start else None
+    if args.scenario:
+        engine.scenario.load(args.scenario)
+    if args.record:
+        engine.start_recording(args.record)
+    if is_parquet(args.output):
+        engine.start_export(args.output)
+
+    output = open(args.output, 'w', newline='') if args.output and not is_parquet(args.output) else None
+    recorder = CsvRecorder(output) if output else None
+    try:
+        ticks = await engine.run_headless(args.duration_hours * 3600.0, args.step,
+                                          start=start, on_snapshot=recorder)
+    finally:
+        if output:
+            output.close()
+
+    _logger.info(f"Simulated {ticks} ticks up to {engine.clock.now.isoformat()}")
+    if recorder:
+        _logger.info(f"Wrote {recorder.rows} rows to {args.output}")
+
+
+async def run_replay(args) -> None:
+    """Reproduce a recorded run offline and exit."""
+    if is_parquet(args.output):
+        output = None
+        recorder = ParquetExporter(args.output)
+    else:
+        output = open(args.output, 'w', newline='') if args.output else None
+        recorder = CsvRecorder(output) if output else None
+    try:
+        engine = await replay(args.replay, fleet_mode=args.fleet, on_snapshot=recorder)
+    finally:
+        if output:
+            output.close()
+        elif recorder:
+            recorder.close()
+
+    _logger.info(f"Replayed {engine.tick_count} ticks up to {engine.clock.now.isoformat()}")
+    if recorder:
+        _logger.info(f"Wrote {recorder.rows} rows to {args.output}")
+
+
+def run_monte_carlo(args) -> None:
+    """Run sampled headless simulations across a process pool and exit."""
+    with open(args.monte_carlo, 'r', encoding='utf-8') as f:
+        space = json.load(f)
+
+    runner = MonteCarloRunner(
+        space, args.runs, args.duration_hours * 3600.0, args.step,
+        workers=args.workers, seed=args.seed or 0,
+        start=datetime.fromisoformat(args.start) if args.start else None,
+        output_dir=args.output or 'montecarlo',
+        fleet_mode=args.fleet, hydraulics=args.hydraulics, wet_wells=args.wet_wells,
+    )
+    results = runner.run()
+    failed = sum(1 for result in results if result.error)
+    _logger.info(f"Monte Carlo finished: {len(results) - failed} runs, {failed} failed, "
+                 f"{sum(result.rows for result in results)} rows in {runner.output_dir}")
+
+
 async def main():
     """Main server entry point."""
     global shutdown_event, db_manager
@@ -210,6 +376,18 @@ async def main():
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    if args.replay:
+        await run_replay(args)
+        return
+
+    if args.monte_carlo:
+        run_monte_carlo(args)
+        return
+
+    if args.headless:
+        await run_headless(args)
+        return
+
     _logger.info("Starting OPC-UA Pump Simulation Server...")
 
     # Initialize database
@@ -252,6 +430,8 @@ async def main():
 
     # Load configuration (from files or database)
     config = ConfigLoader()
+    if args.synthetic:
+        use_synthetic_fleet(config, db_manager, args)
 
     if args.use_db:
         # Load mode params from database
@@ -273,7 +453,10 @@ async def main():
     _logger.info(f"Built {len(node_map)} assets")
 
     # Initialize simulation engine
-    engine = SimulationEngine(mode_params)
+    engine = SimulationEngine(mode_params, fleet_mode=args.fleet,
+                              catch_up=CatchUpPolicy(args.catch_up), shards=args.shards,
+                              seed=args.seed, pipelined=not args.no_pipeline,
+                              shed_policy=ShedPolicy(order=ShedPolicy.parse_order(args.shed_order)))
     
     # Initialize PubSub Manager (Secondary OT Communication)
     pubsub_manager = PubSubManager(host='0.0.0.0', port=1883)
@@ -294,6 +477,18 @@ async def main():
     # Bind simulations to assets
     simulation_targets = asset_builder.get_simulation_targets()
     pump_sims = {}
+    reporting = {}
+
+    def apply_reporting(sim, asset_type):
+        """Give a simulation its type's sampling and deadband settings before it compiles its write plan."""
+        if asset_type not in reporting:
+            settings = config.get_reporting(asset_type)
+            if args.no_deadband:
+                settings.deadbands = {}
+            if args.single_rate:
+                settings.sampling_intervals = {}
+            reporting[asset_type] = settings
+        sim.reporting = reporting[asset_type]
 
     for target in simulation_targets:
         asset_type = target['type']
@@ -311,7 +506,8 @@ async def main():
                 server=server,
                 mode_params=mode_params
             )
-            await pump_sim.bind()
+            apply_reporting(pump_sim, asset_type)
+            await pump_sim.bind(target.get('bindings'))
             engine.add_pump(pump_sim)
             pump_sims[asset_id] = pump_sim
             _logger.debug(f"Bound pump simulation: {asset_name}")
@@ -324,19 +520,42 @@ async def main():
                 server=server,
                 mode_params=mode_params
             )
-            await chamber_sim.bind()
+            apply_reporting(chamber_sim, asset_type)
+            await chamber_sim.bind(target.get('bindings'))
             engine.add_chamber(chamber_sim)
             _logger.debug(f"Bound chamber simulation: {asset_name}")
 
     _logger.info(f"Bound simulations to {len(simulation_targets)} assets")
 
+    # Station hydraulics for pumps sharing a discharge header
+    if args.hydraulics:
+        for station_id, (pump_ids, curve) in group_stations(config.get_asset_definitions()).items():
+            engine.add_station(station_id, pump_ids, curve)
+
+    # Wet-well mass balance
+    if args.wet_wells:
+        for chamber_id, (pump_ids, spec) in group_wet_wells(config.get_asset_definitions()).items():
+            engine.add_wet_well(chamber_id, pump_ids, spec.get('Area'), spec.get('Inflow'))
+
+    # Scripted scenario events
+    if args.scenario:
+        engine.scenario.load(args.scenario)
+
     # Auto-start pumps if requested
     if args.auto_start:
         for pump_id, pump_sim in pump_sims.items():
-            await pump_sim.start()
+            pump_sim.start()
             _logger.info(f"Auto-started pump: {pump_sim.name}")
         _logger.info(f"Auto-started {len(pump_sims)} pumps")
 
+    # Record engine inputs for offline replay
+    if args.record:
+        engine.start_recording(args.record)
+
+    # Columnar export of the simulated time series
+    if args.export:
+        engine.start_export(args.export, max_file_rows=10_000_000)
+
     # Setup alarms for pumps
     await setup_alarms(alarm_manager, config, pump_sims, node_map)
 
@@ -367,9 +586,14 @@ async def main():
         register_engine(engine)
         _logger.info("Simulation engine registered for API control")
 
-        # Wire up WebSocket broadcast callback
-        async def ws_broadcast(all_states):
-            await ws_manager.update_all_pumps(all_states)
+        # Wire up WebSocket broadcast callback (reads the per-tick engine snapshot)
+        async def ws_broadcast(snapshot):
+            all_states = snapshot.pump_states
+            await ws_manager.update_all_pumps(all_states, timestamp=snapshot.iso_timestamp)
+
+            # PubSub frames are the first output dropped when the engine falls behind
+            if engine.shedder.skip(ShedAction.WEBSOCKET_PUBSUB):
+                return
             
             # Also simulate PubSub flow by broadcasting MQTT-style packets
             for pump_id, state in all_states.items():
@@ -1,14 +1,55 @@
 from .engine import SimulationEngine
 from .pump import PumpSimulation
 from .chamber import ChamberSimulation
+from .fleet import FleetSimulation
+from .shards import ShardPool
+from .snapshot import EngineSnapshot, PumpColumns
+from .pipeline import TickPipeline
+from .commands import CommandQueue
+from .shedding import LoadShedder, ShedPolicy, ShedAction
+from .scheduler import TickScheduler, CatchUpPolicy
+from .rates import RateSchedule
+from .hydraulics import StationHydraulics, SystemCurve
+from .wetwell import WetWellBalance
+from .scenario import ScenarioScheduler
+from .montecarlo import MonteCarloRunner
+from .export import ParquetExporter
+from .clock import SimulationClock
+from .noise import NoiseStream
+from .recording import EngineRecorder, Recording, replay
 from .physics import PumpPhysics
+from .curves import PumpCurves
 from .modes import SimulationMode, FailureType, ModeParameters
 
 __all__ = [
     'SimulationEngine',
     'PumpSimulation',
     'ChamberSimulation',
+    'FleetSimulation',
+    'ShardPool',
+    'EngineSnapshot',
+    'PumpColumns',
+    'TickPipeline',
+    'CommandQueue',
+    'LoadShedder',
+    'ShedPolicy',
+    'ShedAction',
+    'TickScheduler',
+    'CatchUpPolicy',
+    'RateSchedule',
+    'StationHydraulics',
+    'SystemCurve',
+    'WetWellBalance',
+    'ScenarioScheduler',
+    'MonteCarloRunner',
+    'ParquetExporter',
+    'SimulationClock',
+    'NoiseStream',
+    'EngineRecorder',
+    'Recording',
+    'replay',
     'PumpPhysics',
+    'PumpCurves',
     'SimulationMode',
     'FailureType',
     'ModeParameters'
@@ -8,12 +8,15 @@ Simulates tanks, wet wells, channels, and clarifiers with:
 
 import logging
 import math
-import random
 from datetime import datetime
 from typing import Dict, Any, Optional
 from asyncua import ua
 
+from config.loader import ReportingDef
+
 from .modes import ModeParameters
+from .noise import NoiseStream
+from .write_plan import WritePlan, NodeBinding, bulk_write
 
 _logger = logging.getLogger('simulation.chamber')
 
@@ -32,11 +35,20 @@ class ChamberSimulation:
         # Node references
         self.nodes: Dict[str, Any] = {}
         self.eu_ranges: Dict[str, tuple] = {}
+        self.write_plan: Optional[WritePlan] = None
+
+        # Sampling and report-by-exception settings from the type definition (set before bind)
+        self.reporting = ReportingDef()
 
         # State variables
         self.level = 4.0  # meters
         self.temperature = 20.0  # °C
         self.tick_count = 0
+        self.elapsed = 0.0  # simulated seconds stepped (phase of the level and temperature cycles)
+        self.noise = NoiseStream(asset_id=asset_id)
+
+        # Simulated seconds since the last step (chambers step at their own sampling rate)
+        self.pending_dt = 0.0
 
         # Simulation parameters
         self.level_min = 1.0
@@ -45,10 +57,27 @@ class ChamberSimulation:
         self.level_rate = 0.1  # m/s change rate
         self.temp_ambient = 18.0
 
-    async def bind(self) -> None:
-        """Bind to OPC-UA nodes."""
-        await self._recursive_bind(self.node)
-        await self._read_eu_ranges()
+        # Wet well coupled to its pumps' outflow (level integrated by wetwell.py, not step())
+        self.coupled = False
+        self.area = 0.0  # m² plan area
+        self.inflow = 0.0  # m³/h at a diurnal multiplier of 1.0
+
+    async def bind(self, bindings: Optional[Dict[str, NodeBinding]] = None) -> None:
+        """Bind to OPC-UA nodes.
+
+        Args:
+            bindings: Binding manifest from AssetBuilder (None = browse the node)
+        """
+        if bindings is not None:
+            self.nodes = {key: binding.node for key, binding in bindings.items()}
+            self.eu_ranges = {name: bindings[name].eu_range for name in ['Level', 'Temperature']
+                              if name in bindings and bindings[name].eu_range is not None}
+            self.write_plan = WritePlan.from_bindings(bindings, ['Level', 'Temperature'], self.reporting)
+        else:
+            await self._recursive_bind(self.node)
+            await self._read_eu_ranges()
+            self.write_plan = await WritePlan.compile(self.nodes, ['Level', 'Temperature'], self.eu_ranges,
+                                                      self.reporting)
 
         _logger.info(f"Bound chamber simulation: {self.name} with {len(self.nodes)} nodes")
 
@@ -80,65 +109,59 @@ class ChamberSimulation:
                 except Exception:
                     pass
 
-    async def tick(self, dt: float) -> None:
-        """Update chamber values for one simulation tick."""
+    @property
+    def sampling_interval(self) -> Optional[float]:
+        """Interval (ms) at which the chamber is stepped (None = every engine tick)."""
+        return self.reporting.fastest_interval
+
+    async def tick(self, dt: float, due: Optional[Dict[float, bool]] = None) -> None:
+        """Update chamber values for one simulation step."""
+        self.step(dt)
+
+        # Write values
+        await self.write_values(due)
+
+    def step(self, dt: float) -> Dict[str, float]:
+        """Advance chamber level and temperature by dt seconds."""
         self.tick_count += 1
+        self.elapsed += dt
 
         # Simulate level with sinusoidal variation (simulating fill/drain cycles)
         # Period of about 10 minutes with random perturbation
-        period = 600.0 + random.uniform(-60, 60)
-        self.level = self.level_setpoint + 1.5 * math.sin(2 * math.pi * self.tick_count * dt / period)
+        # (drawn for coupled wet wells too, so every step consumes the noise stream identically)
+        period = 600.0 + self.noise.uniform(-60, 60)
+        level = self.level_setpoint + 1.5 * math.sin(2 * math.pi * self.elapsed / period)
 
         # Add some random noise
-        self.level += random.uniform(-0.05, 0.05)
+        level += self.noise.uniform(-0.05, 0.05)
 
         # Clamp to range
-        self.level = max(self.level_min, min(self.level_max, self.level))
+        if not self.coupled:
+            self.level = max(self.level_min, min(self.level_max, level))
 
         # Temperature with slow daily variation
         daily_period = 86400.0  # seconds
-        self.temperature = self.temp_ambient + 3.0 * math.sin(2 * math.pi * self.tick_count * dt / daily_period)
-        self.temperature += random.uniform(-0.2, 0.2)
+        self.temperature = self.temp_ambient + 3.0 * math.sin(2 * math.pi * self.elapsed / daily_period)
+        self.temperature += self.noise.uniform(-0.2, 0.2)
 
-        # Write values
-        await self._write_values()
+        return self.get_values()
 
-    async def _write_values(self) -> None:
-        """Write values to OPC-UA nodes with current timestamp."""
-        now = datetime.utcnow()
+    def seed_noise(self, seed: Optional[int]) -> None:
+        """Restart this chamber's noise stream from (seed, asset_id)."""
+        self.noise = NoiseStream(seed, self.asset_id)
 
-        values = {
+    def get_values(self) -> Dict[str, float]:
+        return {
             'Level': self.level,
             'Temperature': self.temperature
         }
 
-        for var_name, value in values.items():
-            if var_name not in self.nodes:
-                continue
-
-            try:
-                # Clamp to EURange
-                if var_name in self.eu_ranges:
-                    low, high = self.eu_ranges[var_name]
-                    value = max(low, min(high, value))
-
-                # Create DataValue with current source timestamp
-                variant = ua.Variant(float(value), ua.VariantType.Double)
-                data_value = ua.DataValue(
-                    Value=variant,
-                    StatusCode_=ua.StatusCode(ua.StatusCodes.Good),
-                    SourceTimestamp=now,
-                    ServerTimestamp=now
-                )
-
-                # Write using write_attribute for full DataValue support
-                await self.nodes[var_name].write_attribute(
-                    ua.AttributeIds.Value,
-                    data_value
-                )
-
-            except Exception as e:
-                _logger.debug(f"Could not write {var_name}: {e}")
+    async def write_values(self, due: Optional[Dict[float, bool]] = None) -> None:
+        """Write values to OPC-UA nodes with current timestamp (only sampling intervals that are due)."""
+        if self.write_plan is None:
+            return
+
+        await bulk_write(self.write_plan.session, self.write_plan.build(self.get_values(), datetime.utcnow(), due))
 
     def set_level(self, level: float) -> None:
         """Set chamber level directly."""
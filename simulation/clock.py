@@ -0,0 +1,50 @@
+"""Simulation clock.
+
+Time-of-day dependent behaviour (the diurnal flow profile) reads the hour
+from a SimulationClock instead of the wall clock. The engine advances the
+clock by dt * time_acceleration every tick, so a live server tracks real
+time at 1x while a headless batch run can step through weeks of simulated
+days as fast as the CPU allows.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class SimulationClock:
+    """Simulated UTC time with a fixed local offset for time-of-day lookups."""
+
+    def __init__(self, start: Optional[datetime] = None,
+                 utc_offset: Optional[timedelta] = None):
+        """
+        Args:
+            start: Simulated UTC start time (default: now)
+            utc_offset: Local offset used for the hour of day (default: system timezone)
+        """
+        self.start = start or datetime.utcnow()
+        self.now = self.start
+        self.utc_offset = utc_offset if utc_offset is not None else datetime.now().astimezone().utcoffset()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Simulated seconds since the clock started."""
+        return (self.now - self.start).total_seconds()
+
+    @property
+    def local_time(self) -> datetime:
+        return self.now + self.utc_offset
+
+    @property
+    def hour(self) -> int:
+        """Local hour of day (0-23) used by the diurnal flow profile."""
+        return self.local_time.hour
+
+    def advance(self, seconds: float) -> datetime:
+        """Move simulated time forward and return the new UTC time."""
+        self.now += timedelta(seconds=seconds)
+        return self.now
+
+    def reset(self, start: Optional[datetime] = None) -> None:
+        """Restart the clock at start (default: now)."""
+        self.start = start or datetime.utcnow()
+        self.now = self.start
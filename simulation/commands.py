@@ -0,0 +1,118 @@
+"""Tick-boundary command queue.
+
+Control actions (REST pump start/stop/speed/reset, the pumps' OPC-UA
+StartPump/StopPump/SetSpeed/ResetFault methods and the SimulationConfig
+methods) do not change engine state from whichever coroutine receives
+them. They are appended to one CommandQueue, and the engine drains the
+queue as a batch at the start of each tick, before scenario events and
+before the recorder captures the tick's inputs. A command therefore takes
+effect within one tick, and its status changes (RunCommand, FaultStatus,
+...) reach the address space in that tick's normal batched write instead
+of a separate write per command.
+
+The queue is a deque (appends and pops are atomic), so submitting never
+takes a lock. Each submit returns a future that resolves to the action's
+result once it has been applied; post queues an action nobody waits for
+(a failure is only logged). While the engine is not running, or is between
+headless ticks, nothing drains the queue and commands are applied
+immediately instead.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+_logger = logging.getLogger('simulation.commands')
+
+
+@dataclass
+class CommandStats:
+    """Command throughput and latency accounting."""
+    submitted: int = 0
+    applied: int = 0
+    errors: int = 0
+    batches: int = 0
+    max_batch: int = 0
+    last_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+
+class CommandQueue:
+    """Control actions applied by the engine at the start of a tick."""
+
+    def __init__(self):
+        self._pending: Deque[Tuple[str, Callable[..., Any], tuple, Optional[asyncio.Future], float]] = deque()
+        self.active = False  # set by the engine while its loop drains the queue
+        self.stats = CommandStats()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, name: str, action: Callable[..., Any], *args: Any) -> Optional[asyncio.Future]:
+        """Queue action(*args) for the next tick boundary.
+
+        Args:
+            name: Label for logging and errors
+            action: Callable applied to the engine state
+            args: Positional arguments for action
+
+        Returns:
+            Future resolving to the action's return value (or raising its
+            exception); None when submitted outside an event loop
+        """
+        try:
+            future = asyncio.get_running_loop().create_future()
+        except RuntimeError:
+            future = None
+        self._enqueue(name, action, args, future)
+        return future
+
+    def post(self, name: str, action: Callable[..., Any], *args: Any) -> None:
+        """Queue action(*args) for the next tick boundary without a result future."""
+        self._enqueue(name, action, args, None)
+
+    def _enqueue(self, name: str, action: Callable[..., Any], args: tuple,
+                 future: Optional[asyncio.Future]) -> None:
+        self.stats.submitted += 1
+        self._pending.append((name, action, args, future, time.perf_counter()))
+        if not self.active:
+            self.apply()
+
+    def apply(self) -> int:
+        """Apply every command queued so far, in submission order.
+
+        Returns:
+            Number of commands applied
+        """
+        count = len(self._pending)
+        for _ in range(count):
+            name, action, args, future, submitted = self._pending.popleft()
+            try:
+                result = action(*args)
+            except Exception as e:
+                self.stats.errors += 1
+                _logger.warning(f"Command {name} failed: {e}")
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            else:
+                if future is not None and not future.done():
+                    future.set_result(result)
+            latency_ms = (time.perf_counter() - submitted) * 1000.0
+            self.stats.last_latency_ms = latency_ms
+            self.stats.max_latency_ms = max(self.stats.max_latency_ms, latency_ms)
+
+        if count:
+            self.stats.applied += count
+            self.stats.batches += 1
+            self.stats.max_batch = max(self.stats.max_batch, count)
+            _logger.debug(f"Applied {count} command(s)")
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get command statistics."""
+        stats = asdict(self.stats)
+        stats['queued'] = len(self._pending)
+        return stats
@@ -2,15 +2,38 @@
 
 Manages all simulation instances and runs the main tick loop.
 Provides methods for mode changes and global simulation control.
+Chambers are stepped and variables written at their own sampling
+intervals on the tick grid (see rates.py). In the live loop each tick's
+snapshot is published to OPC-UA, WebSocket, MQTT and the export by
+pipelined stages while the next tick is computed (see pipeline.py).
+Control actions are queued and applied at the start of a tick (see
+commands.py). Output is shed in a configured order while ticks overrun
+(see shedding.py).
 """
 
 import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Mapping, Tuple
 
 from .pump import PumpSimulation
 from .chamber import ChamberSimulation
+from .clock import SimulationClock
+from .fleet import FleetSimulation
+from .snapshot import EngineSnapshot, LazyStates, freeze
+from .pipeline import TickPipeline
+from .commands import CommandQueue
+from .shedding import LoadShedder, ShedPolicy, ShedAction
+from .write_plan import bulk_write
+from .scheduler import TickScheduler, CatchUpPolicy
+from .rates import RateSchedule
+from .hydraulics import StationHydraulics, SystemCurve
+from .wetwell import WetWellBalance
+from .scenario import ScenarioScheduler
+from .shards import ShardPool
+from .recording import EngineRecorder, new_seed
+from .export import ParquetExporter
 from .modes import ModeParameters, SimulationMode, FailureType
 
 _logger = logging.getLogger('simulation.engine')
@@ -19,7 +42,10 @@ _logger = logging.getLogger('simulation.engine')
 class SimulationEngine:
     """Coordinates all simulation instances."""
 
-    def __init__(self, mode_params: Optional[ModeParameters] = None):
+    def __init__(self, mode_params: Optional[ModeParameters] = None, fleet_mode: bool = False,
+                 catch_up: CatchUpPolicy = CatchUpPolicy.SKIP, shards: int = 0,
+                 seed: Optional[int] = None, pipelined: bool = True,
+                 shed_policy: Optional[ShedPolicy] = None):
         self.mode_params = mode_params or ModeParameters()
         self.pumps: Dict[str, PumpSimulation] = {}
         self.chambers: Dict[str, ChamberSimulation] = {}
@@ -27,14 +53,63 @@ class SimulationEngine:
         self.last_tick_time: Optional[datetime] = None
         self.pubsub_manager = None
 
+        # Most recent tick result, read by every output channel
+        self.tick_count = 0
+        self.snapshot: Optional[EngineSnapshot] = None
+
         # Timing
         self.interval_ms = 1000.0  # Default 1 second
+        self.scheduler = TickScheduler(self.interval_ms / 1000.0, policy=catch_up)
+
+        # Publish stages run concurrently with the next tick's compute (see pipeline.py)
+        self.pipeline: Optional[TickPipeline] = TickPipeline() if pipelined else None
+
+        # Output degraded in priority order while ticks overrun (see shedding.py)
+        self.shedder = LoadShedder(shed_policy)
+
+        # Control actions applied at the start of each tick (see commands.py)
+        self.commands = CommandQueue()
+
+        # Sampling intervals due on each tick (see rates.py)
+        self.rates = RateSchedule()
 
         # WebSocket broadcast callback
         self._ws_broadcast_callback = None
 
+        # Noise seed shared by all assets (each derives its own stream from it)
+        self.seed = seed
+
+        # Trajectory recorder (see recording.py)
+        self.recorder: Optional[EngineRecorder] = None
+
+        # Columnar time-series export (see export.py)
+        self.exporter: Optional[ParquetExporter] = None
+
+        # Simulated time (drives the diurnal profile; advanced by dt * time_acceleration)
+        self.clock = SimulationClock()
+
+        # Vectorized fleet (struct-of-arrays physics for all pumps at once)
+        self.fleet: Optional[FleetSimulation] = (
+            FleetSimulation(self.mode_params, self.clock) if fleet_mode else None
+        )
+
+        # Operating points of pumps sharing a discharge header (see hydraulics.py)
+        self.hydraulics = StationHydraulics(self.mode_params)
+
+        # Wet-well levels integrated from inflow and pump outflow (see wetwell.py)
+        self.wet_wells = WetWellBalance(self.mode_params, self.clock)
+
+        # Scripted events on simulated time (see scenario.py)
+        self.scenario = ScenarioScheduler()
+
+        # Worker processes evaluating pumps and chambers over shared memory
+        self.shards: Optional[ShardPool] = ShardPool(shards, self.clock, seed) if shards > 0 else None
+
     def set_ws_broadcast_callback(self, callback) -> None:
-        """Set callback for WebSocket broadcasting."""
+        """Set callback for WebSocket broadcasting.
+
+        The callback is awaited once per tick with the EngineSnapshot.
+        """
         self._ws_broadcast_callback = callback
         _logger.info("WebSocket broadcast callback registered")
 
@@ -46,13 +121,59 @@ class SimulationEngine:
     def add_pump(self, pump: PumpSimulation) -> None:
         """Add a pump simulation."""
         self.pumps[pump.asset_id] = pump
+        pump.clock = self.clock
+        pump.commands = self.commands
+        pump.seed_noise(self.seed)
+        self.rates.register(pump.reporting.sampling_intervals.values())
+        # Shard workers evaluate the pumps whenever there are any (see _compute_tick)
+        if self.shards is not None:
+            self.shards.add_pump(pump)
+        elif self.fleet is not None:
+            self.fleet.add_pump(pump)
         _logger.debug(f"Added pump simulation: {pump.name}")
 
     def add_chamber(self, chamber: ChamberSimulation) -> None:
         """Add a chamber simulation."""
         self.chambers[chamber.asset_id] = chamber
+        chamber.seed_noise(self.seed)
+        self.rates.register(chamber.reporting.sampling_intervals.values())
+        if self.shards is not None:
+            self.shards.add_chamber(chamber)
         _logger.debug(f"Added chamber simulation: {chamber.name}")
 
+    def add_station(self, station_id: str, pump_ids: List[str],
+                    curve: Optional[SystemCurve] = None) -> Optional[SystemCurve]:
+        """Solve the flow of already added pumps against a shared station system curve.
+
+        Args:
+            station_id: Station (parent folder) asset id
+            pump_ids: Pumps discharging into the station header
+            curve: System curve (default: sized from the largest pump)
+        """
+        pumps = [self.pumps[pump_id] for pump_id in pump_ids if pump_id in self.pumps]
+        if not pumps:
+            return None
+        return self.hydraulics.add_station(station_id, pumps, curve)
+
+    def add_wet_well(self, chamber_id: str, pump_ids: List[str],
+                     area: Optional[float] = None, inflow: Optional[float] = None) -> bool:
+        """Integrate an already added chamber's level from its inflow and its pumps' outflow.
+
+        Args:
+            chamber_id: Wet well chamber asset id
+            pump_ids: Pumps drawing from the wet well
+            area: Plan area in m² (default: sized from the inflow)
+            inflow: Inflow in m³/h at a diurnal multiplier of 1.0 (default: largest pump's design flow)
+        """
+        chamber = self.chambers.get(chamber_id)
+        if chamber is None:
+            return False
+        pumps = [self.pumps[pump_id] for pump_id in pump_ids if pump_id in self.pumps]
+        self.wet_wells.add_well(chamber, pumps, area, inflow)
+        if self.shards is not None:
+            self.shards.add_chamber(chamber)  # restart workers with the coupled chamber
+        return True
+
     def get_pump(self, asset_id: str) -> Optional[PumpSimulation]:
         """Get pump by asset ID."""
         return self.pumps.get(asset_id)
@@ -64,8 +185,66 @@ class SimulationEngine:
     def set_interval(self, interval_ms: float) -> None:
         """Set simulation tick interval in milliseconds."""
         self.interval_ms = max(10.0, min(10000.0, interval_ms))
+        self.scheduler.set_interval(self.interval_ms / 1000.0)
         _logger.info(f"Simulation interval set to {self.interval_ms}ms")
 
+    def set_catch_up_policy(self, policy: CatchUpPolicy) -> None:
+        """Set how missed tick deadlines are handled after an overrun."""
+        self.scheduler.set_policy(policy)
+        _logger.info(f"Catch-up policy set to {policy.value}")
+
+    def set_seed(self, seed: Optional[int]) -> None:
+        """Restart every asset's noise stream from a new engine seed."""
+        self.seed = seed
+        for pump in self.pumps.values():
+            pump.seed_noise(seed)
+        for chamber in self.chambers.values():
+            chamber.seed_noise(seed)
+        if self.fleet is not None:
+            self.fleet.reset_noise()
+        if self.shards is not None:
+            self.shards.set_seed(seed)
+        _logger.info(f"Noise seed set to {seed}")
+
+    def start_recording(self, path: str) -> EngineRecorder:
+        """Record trajectory-changing inputs from the next tick on.
+
+        An unseeded engine is given a random seed first, and all noise streams
+        restart, so the recording can be replayed exactly.
+        """
+        self.stop_recording()
+        self.set_seed(self.seed if self.seed is not None else new_seed())
+        self.recorder = EngineRecorder.open(path)
+        _logger.info(f"Recording engine inputs to {path}")
+        return self.recorder
+
+    def stop_recording(self) -> None:
+        """Finish the current recording, if any."""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def start_export(self, path: str, **kwargs: Any) -> ParquetExporter:
+        """Export every tick's pump values to Parquet (kwargs as ParquetExporter)."""
+        self.stop_export()
+        self.exporter = ParquetExporter(path, **kwargs)
+        _logger.info(f"Exporting pump time series to {path}")
+        return self.exporter
+
+    def stop_export(self) -> None:
+        """Write the buffered rows and close the current export, if any."""
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
+
+    def submit(self, name: str, action: Callable[..., Any], *args: Any) -> Optional[asyncio.Future]:
+        """Queue a control action for the start of the next tick (see CommandQueue.submit)."""
+        return self.commands.submit(name, action, *args)
+
+    def post(self, name: str, action: Callable[..., Any], *args: Any) -> None:
+        """Queue a control action without waiting for its result (see CommandQueue.post)."""
+        self.commands.post(name, action, *args)
+
     def set_mode(self, mode: SimulationMode) -> None:
         """Change simulation mode for all pumps."""
         self.mode_params.mode = mode
@@ -85,7 +264,14 @@ class SimulationEngine:
     def reset_simulation(self) -> None:
         """Reset all simulations to OPTIMAL state."""
         self.mode_params = ModeParameters()
+        if self.fleet is not None:
+            self.fleet.mode_params = self.mode_params
+        self.hydraulics.mode_params = self.mode_params
+        self.wet_wells.mode_params = self.mode_params
+        for chamber in self.chambers.values():
+            chamber.mode_params = self.mode_params
         for pump in self.pumps.values():
+            pump.mode_params = self.mode_params
             pump.runtime_hours = 0.0
             pump.start_count = 0
             pump.is_faulted = False
@@ -100,75 +286,344 @@ class SimulationEngine:
     async def run(self) -> None:
         """Main simulation loop."""
         self.is_running = True
-        self.last_tick_time = datetime.now()
+        self.commands.active = True
+        self.clock.reset()
+        self.scheduler.start()
 
-        _logger.info(f"Simulation engine started with {len(self.pumps)} pumps and {len(self.chambers)} chambers")
+        _logger.info(f"Simulation engine started with {len(self.pumps)} pumps and {len(self.chambers)} chambers"
+                     f"{self._physics_label()}")
+
+        if self.pipeline is not None:
+            if not self.pipeline.stages:
+                for name, handler in self._publish_stages():
+                    self.pipeline.add_stage(name, handler)
+            self.pipeline.start()
 
         try:
             while self.is_running:
-                # Calculate time delta
-                now = datetime.now()
-                dt = (now - self.last_tick_time).total_seconds()
-                self.last_tick_time = now
-
-                # Update failure progression if in FAILURE mode
-                if self.mode_params.mode == SimulationMode.FAILURE:
-                    self._update_failure_progression(dt)
-
-                # Tick all simulations
-                await self._tick_all(dt)
-
-                # Wait for next tick
-                await asyncio.sleep(self.interval_ms / 1000.0)
+                # Sleep until the next deadline on the fixed tick grid
+                dt, timestamp = await self.scheduler.wait()
+                self.last_tick_time = timestamp
+
+                # Tick all simulations (publishing overlaps the next tick when pipelined)
+                self.rates.set_base(self.scheduler.interval)
+                if self.pipeline is not None:
+                    await self.pipeline.submit(await self._compute_tick(dt, timestamp, self.scheduler.slot))
+                else:
+                    await self._tick_all(dt, timestamp, self.scheduler.slot)
+                overran = self.scheduler.complete()
+                self.shedder.update(overran or self.scheduler.stats.last_lateness_ms > self.interval_ms)
 
         except asyncio.CancelledError:
             _logger.info("Simulation engine stopped")
         except Exception as e:
             _logger.error(f"Simulation engine error: {e}")
             raise
+        finally:
+            self.commands.active = False
+            self.commands.apply()
+            if self.pipeline is not None:
+                await self.pipeline.stop(drain=not self.is_running)
+            self.stop_recording()
+            self.stop_export()
+            if self.shards is not None:
+                self.shards.close()
+
+    async def run_headless(self, duration_s: float, step_s: float = 1.0,
+                           start: Optional[datetime] = None,
+                           on_snapshot: Optional[Callable[[EngineSnapshot], Awaitable[None]]] = None) -> int:
+        """Run a batch simulation on the virtual clock without sleeping.
+
+        Intended for engines with no OPC-UA nodes bound: every tick advances
+        the clock by step_s * time_acceleration simulated seconds and is
+        stamped with the simulated time, so weeks of diurnal flow, aging and
+        failure progression can be generated as fast as the CPU allows.
+
+        Args:
+            duration_s: Simulated seconds to run (before time acceleration)
+            step_s: Simulated seconds per tick
+            start: Simulated UTC start time (default: now)
+            on_snapshot: Awaited with each tick's EngineSnapshot
+
+        Returns:
+            Number of ticks run
+        """
+        if step_s <= 0:
+            raise ValueError("step_s must be positive")
+
+        self.is_running = True
+        self.commands.active = True
+        self.clock.reset(start)
+        self.rates.set_base(step_s)
+        ticks = int(duration_s // step_s)
+
+        _logger.info(f"Headless run: {ticks} ticks of {step_s}s for {len(self.pumps)} pumps "
+                     f"and {len(self.chambers)} chambers from {self.clock.now.isoformat()}")
+
+        count = 0
+        try:
+            while count < ticks and self.is_running:
+                await self._tick_all(step_s)
+                self.last_tick_time = self.snapshot.timestamp
+                if on_snapshot:
+                    # Between ticks nothing drains the queue, so the callback's commands apply at once
+                    self.commands.active = False
+                    try:
+                        await on_snapshot(self.snapshot)
+                    finally:
+                        self.commands.active = True
+                count += 1
+        finally:
+            self.is_running = False
+            self.commands.active = False
+            self.commands.apply()
+            self.stop_recording()
+            self.stop_export()
+            if self.shards is not None:
+                self.shards.close()
+
+        _logger.info(f"Headless run finished after {count} ticks at {self.clock.now.isoformat()}")
+        return count
 
     def stop(self) -> None:
         """Stop the simulation loop."""
         self.is_running = False
 
-    async def _tick_all(self, dt: float) -> None:
-        """Tick all simulation instances."""
-        # Tick pumps
-        for pump in self.pumps.values():
+    def _physics_label(self) -> str:
+        if self.shards is not None:
+            return f" ({self.shards.workers} shard workers)"
+        if self.fleet is not None:
+            return " (fleet mode)"
+        return ""
+
+    async def _tick_all(self, dt: float, timestamp: Optional[datetime] = None,
+                        slot: Optional[int] = None) -> None:
+        """Tick all simulation instances and publish one shared snapshot."""
+        snapshot = await self._compute_tick(dt, timestamp, slot)
+        for _, publish in self._publish_stages():
+            await publish(snapshot)
+
+    async def _compute_tick(self, dt: float, timestamp: Optional[datetime] = None,
+                            slot: Optional[int] = None) -> EngineSnapshot:
+        """Advance all simulation instances by one tick and freeze the result.
+
+        Args:
+            dt: Seconds since the previous tick
+            timestamp: UTC grid time of the tick (default: simulated time)
+            slot: Grid slot of the tick (default: the slot after the previous tick's)
+        """
+        # Control actions queued since the last tick, applied before they are recorded
+        self.commands.apply()
+
+        # Scenario events due by the end of this tick, applied before they are recorded
+        if self.scenario:
+            self.scenario.run_due(self, self.clock.elapsed_seconds + dt * self.mode_params.time_acceleration)
+
+        if slot is None:
+            slot = self.rates.slot + 1
+        if self.rates.base is None:
+            self.rates.set_base(dt)
+
+        if self.recorder is not None:
+            self.recorder.capture(self, dt, slot)
+
+        self.tick_count += 1
+        self.rates.update(slot)
+        sim_time = self.clock.advance(dt * self.mode_params.time_acceleration)
+        timestamp = timestamp or sim_time
+
+        # Update failure progression if in FAILURE mode
+        if self.mode_params.mode == SimulationMode.FAILURE:
+            self._update_failure_progression(dt)
+
+        # Station operating points for the speeds the pumps reach this tick
+        if self.hydraulics.pumps:
             try:
-                await pump.tick(dt)
+                self.hydraulics.solve(dt)
             except Exception as e:
-                _logger.warning(f"Error ticking pump {pump.name}: {e}")
+                _logger.warning(f"Error solving station hydraulics: {e}")
 
-        # Tick chambers
-        for chamber in self.chambers.values():
+        # Chambers due for a step this tick, with the time since their last step
+        chamber_steps = self._chamber_steps(dt)
+
+        # Advance pumps (physics evaluated exactly once per pump per tick)
+        if self.shards is not None:
+            pump_values = await self._step_shards(dt, chamber_steps)
+        elif self.fleet is not None:
+            pump_values = self._step_fleet(dt)
+        else:
+            pump_values = self._step_pumps(dt)
+
+        # Wet-well levels from this tick's inflow and pump outflow
+        if self.wet_wells.wells:
             try:
-                await chamber.tick(dt)
+                self.wet_wells.step(dt, pump_values)
             except Exception as e:
-                _logger.warning(f"Error ticking chamber {chamber.name}: {e}")
+                _logger.warning(f"Error integrating wet wells: {e}")
+
+        # Step due chambers (already advanced by the shard workers in shard mode)
+        if self.shards is None:
+            for chamber_id, step_dt in chamber_steps.items():
+                chamber = self.chambers[chamber_id]
+                try:
+                    chamber.step(step_dt)
+                except Exception as e:
+                    _logger.warning(f"Error ticking chamber {chamber.name}: {e}")
+
+        snapshot = self._build_snapshot(timestamp, pump_values, chamber_steps)
+        self.snapshot = snapshot
+
+        if self.recorder is not None:
+            self.recorder.settle(self)
+
+        return snapshot
+
+    def _publish_stages(self) -> List[Tuple[str, Callable[[EngineSnapshot], Awaitable[None]]]]:
+        """Output channels fed with every snapshot, in publishing order."""
+        return [
+            ('opcua', self._publish_opcua),
+            ('websocket', self._publish_websocket),
+            ('mqtt', self._publish_mqtt),
+            ('export', self._publish_export),
+        ]
+
+    async def _publish_opcua(self, snapshot: EngineSnapshot) -> None:
+        """Write pump and chamber values to OPC-UA nodes."""
+        if self.shedder.skip(ShedAction.OPCUA):
+            return
+        try:
+            await self._write_values(snapshot)
+        except Exception as e:
+            _logger.error(f"Tick write error: {e}", exc_info=True)
 
-        # Broadcast pump states via WebSocket
+    async def _publish_websocket(self, snapshot: EngineSnapshot) -> None:
+        """Broadcast pump states via WebSocket."""
         if self._ws_broadcast_callback:
             try:
-                all_states = self.get_all_pump_states()
-                await self._ws_broadcast_callback(all_states)
+                await self._ws_broadcast_callback(snapshot)
             except Exception as e:
                 _logger.debug(f"WebSocket broadcast error: {e}")
 
-        # Broadcast pump stats via MQTT (PubSub)
-        if self.pubsub_manager:
+    async def _publish_mqtt(self, snapshot: EngineSnapshot) -> None:
+        """Broadcast pump stats via MQTT (PubSub)."""
+        if self.pubsub_manager and not self.shedder.skip(ShedAction.MQTT):
             try:
-                states = self.get_all_pump_states()
-                for pump_id, state in states.items():
-                    # Add metadata for PubSub
-                    state['timestamp'] = datetime.now().isoformat()
-                    state['mode'] = self.mode_params.mode.name
-                    state['fault'] = "NONE" if not state.get('is_faulted') else self.mode_params.failure_config.failure_type.name
-                    
+                for pump_id, state in snapshot.pump_states.items():
                     self.pubsub_manager.publish_pump_telemetry(pump_id, state)
             except Exception as e:
                 _logger.debug(f"PubSub broadcast error: {e}")
 
+    async def _publish_export(self, snapshot: EngineSnapshot) -> None:
+        """Buffer the tick for the Parquet export."""
+        exporter = self.exporter
+        if exporter is not None:
+            try:
+                await exporter.write(snapshot)
+            except Exception as e:
+                _logger.error(f"Parquet export error: {e}")
+
+    async def _write_values(self, snapshot: EngineSnapshot) -> None:
+        """Write pump and stepped chamber values to the address space in one bulk write."""
+        write_values = []
+        session = None
+        for pump_id, values in snapshot.pumps.items():
+            pump = self.pumps[pump_id]
+            if pump.write_plan is None:
+                continue
+            session = pump.write_plan.session
+            pump_writes = pump.write_plan.build(values, snapshot.timestamp, snapshot.due)
+            pump.log_write(len(pump_writes), values)
+            write_values.extend(pump_writes)
+
+        for chamber_id in snapshot.chambers_stepped:
+            chamber = self.chambers[chamber_id]
+            if chamber.write_plan is None:
+                continue
+            session = chamber.write_plan.session
+            write_values.extend(chamber.write_plan.build(snapshot.chambers[chamber_id], snapshot.timestamp,
+                                                         snapshot.due))
+
+        if session is not None:
+            await bulk_write(session, write_values)
+
+    def _chamber_steps(self, dt: float) -> Dict[str, float]:
+        """Accumulate dt on every chamber and return the step length of those due this tick.
+
+        Chambers are not shed while recording: a replay steps them on every due tick.
+        """
+        steps = {}
+        for chamber_id, chamber in self.chambers.items():
+            chamber.pending_dt += dt
+            if (self.rates.is_due(chamber.sampling_interval)
+                    and (self.recorder is not None or not self.shedder.skip(ShedAction.CHAMBERS, chamber_id))):
+                steps[chamber_id] = chamber.pending_dt
+                chamber.pending_dt = 0.0
+        return steps
+
+    def _step_pumps(self, dt: float) -> Dict[str, Dict[str, Any]]:
+        """Advance each pump individually."""
+        pump_values = {}
+        for pump_id, pump in self.pumps.items():
+            try:
+                pump_values[pump_id] = pump.step(dt)
+            except Exception as e:
+                _logger.warning(f"Error ticking pump {pump.name}: {e}")
+        return pump_values
+
+    def _step_fleet(self, dt: float) -> Mapping[str, Mapping[str, Any]]:
+        """Advance all pumps in one vectorized pass."""
+        try:
+            return self.fleet.tick(dt)
+        except Exception as e:
+            _logger.warning(f"Error ticking pump fleet: {e}")
+            return {}
+
+    async def _step_shards(self, dt: float, chamber_steps: Dict[str, float]) -> Mapping[str, Mapping[str, Any]]:
+        """Advance pumps and chambers in the shard worker processes.
+
+        The blocking wait for the workers runs in a thread so the event loop
+        keeps serving OPC-UA, WebSocket and API traffic meanwhile.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            pump_values, _ = await loop.run_in_executor(
+                None, self.shards.tick, dt, self.clock.now, self.mode_params, chamber_steps
+            )
+            return pump_values
+        except Exception as e:
+            _logger.warning(f"Error ticking shards: {e}")
+            return {}
+
+    def _build_snapshot(self, timestamp: datetime, pump_values: Mapping[str, Mapping[str, Any]],
+                        chamber_steps: Optional[Dict[str, float]] = None) -> EngineSnapshot:
+        """Freeze this tick's values; state dicts are derived when a channel first reads them."""
+        mode = self.mode_params.mode.name
+        failure_type = self.mode_params.failure_config.failure_type.name
+        iso_timestamp = timestamp.isoformat()
+        pumps = freeze(pump_values)
+
+        def pump_state(pump_id: str) -> Dict[str, Any]:
+            state = self.pumps[pump_id].get_state(pumps[pump_id])
+            state['timestamp'] = iso_timestamp
+            state['mode'] = mode
+            state['fault'] = failure_type if state['is_faulted'] else "NONE"
+            return state
+
+        chambers = {chamber_id: chamber.get_values() for chamber_id, chamber in self.chambers.items()}
+
+        return EngineSnapshot(
+            tick=self.tick_count,
+            timestamp=timestamp,
+            mode=mode,
+            pumps=pumps,
+            pump_states=LazyStates(pumps, pump_state),
+            chambers=freeze(chambers),
+            failure_type=failure_type,
+            failure_progression=self.mode_params.failure_config.failure_progression,
+            due=MappingProxyType(dict(self.rates.due)),
+            chambers_stepped=frozenset(chamber_steps or ()),
+        )
+
     def _update_failure_progression(self, dt: float) -> None:
         """Update failure progression over time."""
         if self.mode_params.failure_config.time_to_failure <= 0:
@@ -178,46 +633,76 @@ class SimulationEngine:
         hours_elapsed = (dt / 3600.0) * self.mode_params.time_acceleration
         progress_rate = 100.0 / self.mode_params.failure_config.time_to_failure
 
-        new_progression = (
-            self.mode_params.failure_config.failure_progression +
-            progress_rate * hours_elapsed * 3600.0
-        )
+        previous = self.mode_params.failure_config.failure_progression
+        new_progression = previous + progress_rate * hours_elapsed
 
         self.mode_params.failure_config.failure_progression = min(100.0, new_progression)
 
         # Check if failure is complete
-        if self.mode_params.failure_config.failure_progression >= 100.0:
+        if previous < 100.0 <= self.mode_params.failure_config.failure_progression:
             _logger.warning("Failure simulation complete - pump has failed")
 
     # =========================================================================
     # BULK CONTROL METHODS
     # =========================================================================
 
-    async def start_all_pumps(self) -> None:
-        """Start all pumps."""
-        for pump in self.pumps.values():
-            await pump.start()
-        _logger.info("Started all pumps")
+    async def start_all_pumps(self) -> List[str]:
+        """Start every stopped, unfaulted pump in one command.
 
-    async def stop_all_pumps(self) -> None:
-        """Stop all pumps."""
-        for pump in self.pumps.values():
-            await pump.stop()
-        _logger.info("Stopped all pumps")
+        Returns:
+            Asset ids of the pumps started
+        """
+        def start_all() -> List[str]:
+            return [pump_id for pump_id, pump in self.pumps.items()
+                    if not pump.is_running and pump.start()]
+
+        started = await self.submit('start_all_pumps', start_all)
+        _logger.info(f"Started {len(started)} pumps")
+        return started
+
+    async def stop_all_pumps(self) -> List[str]:
+        """Stop every running pump in one command.
+
+        Returns:
+            Asset ids of the pumps stopped
+        """
+        def stop_all() -> List[str]:
+            stopped = [pump_id for pump_id, pump in self.pumps.items() if pump.is_running]
+            for pump_id in stopped:
+                self.pumps[pump_id].stop()
+            return stopped
+
+        stopped = await self.submit('stop_all_pumps', stop_all)
+        _logger.info(f"Stopped {len(stopped)} pumps")
+        return stopped
 
     async def start_pump(self, asset_id: str) -> bool:
         """Start a specific pump."""
         pump = self.pumps.get(asset_id)
         if pump:
-            await pump.start()
-            return True
+            return await self.submit(f"{pump.name}.start", pump.start)
         return False
 
     async def stop_pump(self, asset_id: str) -> bool:
         """Stop a specific pump."""
         pump = self.pumps.get(asset_id)
         if pump:
-            await pump.stop()
+            await self.submit(f"{pump.name}.stop", pump.stop)
+            return True
+        return False
+
+    async def set_pump_speed(self, asset_id: str, rpm: float) -> bool:
+        """Set a specific pump's target speed."""
+        pump = self.pumps.get(asset_id)
+        if pump:
+            return await self.submit(f"{pump.name}.set_speed", pump.set_speed, rpm)
+        return False
+
+    async def reset_pump_fault(self, asset_id: str) -> bool:
+        """Reset a specific pump's fault."""
+        pump = self.pumps.get(asset_id)
+        if pump:
+            await self.submit(f"{pump.name}.reset_fault", pump.reset_fault)
             return True
         return False
 
@@ -228,14 +713,45 @@ class SimulationEngine:
             'mode': self.mode_params.mode.name,
             'interval_ms': self.interval_ms,
             'time_acceleration': self.mode_params.time_acceleration,
+            'simulated_time': self.clock.now.isoformat(),
+            'fleet_mode': self.fleet is not None,
+            'seed': self.seed,
+            'shard_workers': self.shards.workers if self.shards is not None else 0,
+            'scheduler': self.scheduler.get_stats(),
+            'shedding': self.shedder.get_stats(),
+            'pipeline': self.pipeline.get_stats() if self.pipeline is not None else None,
+            'sampling': self.rates.get_stats(),
+            'hydraulics': self.hydraulics.get_stats(),
+            'stations': self.hydraulics.get_state(),
+            'wet_wells': self.wet_wells.get_state(),
+            'scenario': self.scenario.get_stats(),
+            'commands': self.commands.get_stats(),
+            'writes_suppressed': sum(
+                sim.write_plan.suppressed
+                for sim in list(self.pumps.values()) + list(self.chambers.values())
+                if sim.write_plan is not None
+            ),
             'pump_count': len(self.pumps),
             'chamber_count': len(self.chambers),
             'pumps_running': sum(1 for p in self.pumps.values() if p.is_running),
             'failure_progression': self.mode_params.failure_config.failure_progression
         }
 
+    def get_pump_state(self, asset_id: str) -> Dict[str, Any]:
+        """Get the state of one pump from the latest snapshot."""
+        if self.snapshot is not None and asset_id in self.snapshot.pump_states:
+            return self.snapshot.get_pump_state(asset_id)
+        pump = self.pumps.get(asset_id)
+        return pump.get_state() if pump else {}
+
     def get_all_pump_states(self) -> Dict[str, Dict[str, Any]]:
-        """Get current state of all pumps for WebSocket broadcasting."""
+        """Get state of all pumps from the latest snapshot.
+
+        Falls back to the pumps' own state before the first tick.
+        """
+        if self.snapshot is not None:
+            return self.snapshot.get_all_pump_states()
+
         states = {}
         for pump_id, pump in self.pumps.items():
             try:
@@ -0,0 +1,348 @@
+"""Vectorized fleet simulation.
+
+Keeps the state of every pump in struct-of-arrays form (one NumPy array per
+quantity, one slot per pump) and evaluates the PumpPhysics equations for the
+whole fleet in a single batched pass. Head, efficiency and shaft power are
+interpolated from the pumps' curve tables (simulation.curves) in one
+batched lookup. Produces the same 27 data points as
+PumpSimulation._calculate_values, without a Python loop over pumps.
+
+The arrays own the pumps' control inputs and integrated state (run
+command, target speed, fault/local flags, wet well level, station hydraulic
+flow, speed, runtime): once a pump is in the fleet, its state attributes
+read and write its slot (see pump.SlotField). OPC-UA methods, REST endpoints
+and queued commands keep acting on the PumpSimulation objects unchanged,
+and a tick neither gathers nor pushes back anything. Its values are handed
+over column-wise (PumpColumns) without building a dict per pump.
+"""
+
+import logging
+import math
+from datetime import datetime
+from typing import Dict, Any, List, Mapping, Optional
+
+import numpy as np
+
+from .clock import SimulationClock
+from .curves import lookup_batch, power_factor_batch, stack_curves
+from .pump import PumpSimulation
+from .snapshot import PumpColumns
+from .modes import ModeParameters, SimulationMode, get_diurnal_multiplier
+
+_logger = logging.getLogger('simulation.fleet')
+
+SQRT3 = math.sqrt(3)
+
+
+class FleetSimulation:
+    """Struct-of-arrays pump fleet evaluated with batched NumPy math."""
+
+    # Noise draws per pump per tick, in the order PumpSimulation._calculate_values
+    # consumes them from the pump's stream: suction, discharge, voltage, winding,
+    # vibration, bearing DE, bearing NDE, seal, ambient, 6 vibration axes
+    NOISE_DRAWS = 15
+    # Ticks of noise pre-drawn per refill of the fleet noise block
+    NOISE_BLOCK_TICKS = 16
+    # Array dtypes of the pump state fields (float64 unless listed; station_flow None = NaN)
+    STATE_DTYPES = {'is_running': bool, 'is_faulted': bool, 'is_local_mode': bool,
+                    'wet_well_coupled': bool, 'start_count': np.int64}
+
+    def __init__(self, mode_params: ModeParameters, clock: Optional[SimulationClock] = None):
+        self.mode_params = mode_params
+        self.clock = clock
+        self.pumps: List[PumpSimulation] = []
+        self.slots: Dict[str, int] = {}
+        self.asset_ids: List[str] = []
+        self._row_slots: Dict[str, int] = {}
+        self._dirty = True
+        # Changes whenever the slots of the pumps may change (see pump.SlotField)
+        self.layout = 0
+
+    def __len__(self) -> int:
+        return len(self.pumps)
+
+    def add_pump(self, pump: PumpSimulation) -> None:
+        """Add a pump to the fleet. Arrays are rebuilt lazily on next tick."""
+        if pump.asset_id in self.slots:
+            self.pumps[self.slots[pump.asset_id]].detach_state()
+            self.pumps[self.slots[pump.asset_id]] = pump
+        else:
+            self.slots[pump.asset_id] = len(self.pumps)
+            self.pumps.append(pump)
+        self._dirty = True
+        self.layout += 1
+
+    # =========================================================================
+    # ARRAY LAYOUT
+    # =========================================================================
+
+    def _rebuild(self) -> None:
+        """(Re)allocate all arrays from the current pump list and take over the pumps' state."""
+        pumps = self.pumps
+        n = len(pumps)
+
+        # Pump state, read through the previous arrays for pumps already in the fleet
+        for name in PumpSimulation.STATE_FIELDS:
+            values = (getattr(p, name) for p in pumps)
+            if name == 'station_flow':
+                values = (np.nan if value is None else value for value in values)
+            setattr(self, name, np.fromiter(values, dtype=self.STATE_DTYPES.get(name, np.float64), count=n))
+        for slot, pump in enumerate(pumps):
+            pump.state_store = self
+            pump.state_slot = slot
+        self.asset_ids = [p.asset_id for p in pumps]
+        self._row_slots = dict(self.slots)
+
+        def spec(key: str, default: float) -> np.ndarray:
+            return np.fromiter((float(p.design_specs.get(key, default)) for p in pumps),
+                               dtype=np.float64, count=n)
+
+        # Design specs (from the physics design point, as PumpPhysics uses them)
+        self.max_rpm = np.fromiter((p.physics.design.max_rpm for p in pumps), dtype=np.float64, count=n)
+        self.design_flow = np.fromiter((p.physics.design.flow for p in pumps), dtype=np.float64, count=n)
+
+        # Coefficients of the distinct curve tables and each pump's table offset
+        self.curve_coefficients, self.curve_offsets = stack_curves([p.physics.curves for p in pumps])
+
+        # Design specs read directly from the specs dict by _calculate_values
+        self.spec_flow = spec('DesignFlow', 2500)
+        self.rated_voltage = spec('RatedVoltage', 480)
+        self.full_load_amps = spec('FullLoadAmps', 225)
+        self.design_power = spec('DesignPower', 150)
+        self.motor_efficiency = spec('MotorEfficiency', 95.0)
+
+        # Motor pole count for VFD frequency (6-pole unless > 1500 RPM)
+        self.poles = np.where(self.max_rpm > 1500, 4.0, 6.0)
+
+        # Wear factors (per pump, filled from mode parameters each tick)
+        self.efficiency_factor = np.ones(n)
+        self.vibration_factor = np.ones(n)
+        self.temperature_offset = np.zeros(n)
+        self.flow_reduction = np.ones(n)
+        self.seal_wear = np.zeros(n)
+
+        # Pre-drawn noise for the next NOISE_BLOCK_TICKS ticks (filled on demand)
+        self._noise_block: Optional[np.ndarray] = None
+        self._noise_tick = self.NOISE_BLOCK_TICKS
+
+        self._dirty = False
+        self.layout += 1
+        _logger.info(f"Fleet arrays built for {n} pumps")
+
+    def read_slot(self, name: str, slot: int) -> Any:
+        """Read one pump's state field (see pump.SlotField)."""
+        value = getattr(self, name)[slot].item()
+        if name == 'station_flow' and math.isnan(value):
+            return None
+        return value
+
+    def write_slot(self, name: str, slot: int, value: Any) -> None:
+        """Write one pump's state field (see pump.SlotField)."""
+        getattr(self, name)[slot] = np.nan if value is None else value
+
+    def state_column(self, name: str) -> np.ndarray:
+        """Array of one state field of every pump, indexed by slot (writable)."""
+        return getattr(self, name)
+
+    def load_state(self, names: List[str], block: np.ndarray) -> None:
+        """Overwrite state fields of every pump from a (pumps, len(names)) float64 block."""
+        if self._dirty:
+            self._rebuild()
+        for j, name in enumerate(names):
+            array = getattr(self, name)
+            array[:] = block[:, j].astype(array.dtype)
+
+    def store_state(self, names: List[str], block: np.ndarray) -> None:
+        """Copy state fields of every pump into a (pumps, len(names)) float64 block."""
+        for j, name in enumerate(names):
+            block[:, j] = getattr(self, name)
+
+    def _apply_mode_factors(self) -> None:
+        """Broadcast the mode parameters into the per-pump wear arrays."""
+        mp = self.mode_params
+        self.efficiency_factor.fill(mp.get_efficiency_factor())
+        self.vibration_factor.fill(mp.get_vibration_factor())
+        self.temperature_offset.fill(mp.get_temperature_offset())
+        self.flow_reduction.fill(mp.get_flow_reduction_factor())
+        self.seal_wear.fill(mp.degraded_config.seal_wear / 100.0
+                            if mp.mode == SimulationMode.DEGRADED else 0.0)
+
+    def reset_noise(self) -> None:
+        """Drop pre-drawn noise (after the pumps' streams were reseeded)."""
+        self._noise_block = None
+        self._noise_tick = self.NOISE_BLOCK_TICKS
+
+    def _next_noise(self) -> np.ndarray:
+        """Get this tick's (NOISE_DRAWS, n) standard uniforms, refilling the block when used up.
+
+        Each pump's row comes from its own stream in consumption order, so the
+        values match what the scalar path would draw tick by tick.
+        """
+        if self._noise_tick >= self.NOISE_BLOCK_TICKS:
+            draws = self.NOISE_DRAWS * self.NOISE_BLOCK_TICKS
+            self._noise_block = np.stack([pump.noise.take(draws) for pump in self.pumps], axis=1)
+            self._noise_tick = 0
+        start = self._noise_tick * self.NOISE_DRAWS
+        self._noise_tick += 1
+        return self._noise_block[start:start + self.NOISE_DRAWS]
+
+    # =========================================================================
+    # SIMULATION TICK
+    # =========================================================================
+
+    def tick(self, dt: float) -> Mapping[str, Mapping[str, Any]]:
+        """Advance every pump by dt seconds and calculate all sensor values.
+
+        Returns:
+            The values column-wise, read as asset_id -> values (same keys as
+            PumpSimulation._calculate_values)
+        """
+        if not self.pumps:
+            return {}
+        columns = self.advance(dt)
+        return PumpColumns(self.asset_ids, columns, self._row_slots)
+
+    def advance(self, dt: float) -> Dict[str, List[Any]]:
+        """Advance every pump by dt seconds and return the sensor values column-wise."""
+        if self._dirty:
+            self._rebuild()
+
+        self._apply_mode_factors()
+
+        # RPM with inertia
+        step = self.rpm_ramp_rate * dt
+        self.current_rpm = np.where(
+            self.target_rpm > self.current_rpm,
+            np.minimum(self.target_rpm, self.current_rpm + step),
+            np.maximum(self.target_rpm, self.current_rpm - step)
+        )
+
+        # Runtime counter
+        self.runtime_hours += np.where(
+            self.is_running, (dt / 3600.0) * self.mode_params.time_acceleration, 0.0
+        )
+
+        hour = self.clock.hour if self.clock is not None else datetime.now().hour
+        target_flow_ratio = get_diurnal_multiplier(hour)
+        self.target_flow_ratio.fill(target_flow_ratio)
+        return self.calculate_values(target_flow_ratio)
+
+    def calculate_values(self, target_flow_ratio: float) -> Dict[str, List[Any]]:
+        """Calculate all sensor values for the fleet in one batched pass.
+
+        Mirrors PumpSimulation._calculate_values and the PumpPhysics models
+        element-wise. Returns one Python list per variable, indexed by slot.
+        """
+        rpm = self.current_rpm
+        running = self.is_running
+
+        # One row of standard uniforms per draw, one column per pump (each from its own stream)
+        u = self._next_noise()
+
+        def uniform(low: float, high: float, draw: int) -> np.ndarray:
+            return low + (high - low) * u[draw]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            has_speed_range = self.max_rpm != 0
+            speed_ratio = np.where(has_speed_range, rpm / self.max_rpm, 0.0)
+
+            # Flow rate (affinity law, wear, diurnal demand; station pumps from the hydraulic solve)
+            flow = self.design_flow * speed_ratio * self.flow_reduction * target_flow_ratio
+            flow = np.where(np.isnan(self.station_flow), flow, self.station_flow)
+
+            # Head, efficiency and shaft power from the curve tables
+            bep_flow = self.design_flow * speed_ratio
+            on_curve = has_speed_range & (bep_flow != 0)
+            flow_ratio = np.where(on_curve, flow / bep_flow, 0.0)
+            head, efficiency, shaft = lookup_batch(self.curve_coefficients, self.curve_offsets, speed_ratio, flow_ratio)
+            head = np.where(on_curve, head, 0.0)
+
+            # Pressures
+            has_design_flow = self.spec_flow > 0
+            friction = np.where(has_design_flow, 0.1 * (flow / self.spec_flow) ** 2, 0.0)
+            suction = np.clip(self.wet_well_level / 10.2 - friction + uniform(-0.02, 0.02, 0), -0.5, 2.0)
+            discharge = suction + head / 10.2 + uniform(-0.02, 0.02, 1)
+
+            # Pump efficiency scaled by wear, which raises the tabulated shaft power
+            pump_efficiency = np.where(on_curve, efficiency, 0.0) * self.efficiency_factor
+            shaft = np.where(pump_efficiency > 0, shaft / self.efficiency_factor, 0.0)
+
+            # Electrical power
+            power = np.where(self.motor_efficiency > 0, shaft / (self.motor_efficiency / 100.0), 0.0)
+            power = np.where(running & (power < 5.0), 5.0, power)
+
+            # Electrical values
+            load_fraction = np.where(running, power / self.design_power, 0.0)
+            power_factor = power_factor_batch(load_fraction)
+            voltage = self.rated_voltage * (0.98 + uniform(-0.02, 0.02, 2))
+            current = np.where((voltage != 0) & (power_factor != 0),
+                               power * 1000 / (SQRT3 * voltage * power_factor), 0.0)
+            frequency = np.clip(rpm * self.poles / 120.0, 0.0, 65.0)
+
+            # Motor winding temperature (I² copper losses)
+            ambient = self.ambient_temp + self.temperature_offset
+            winding_rise = 80.0 * (current / self.full_load_amps) ** 2 + uniform(-2.0, 2.0, 3)
+            motor_winding_temp = np.where(self.full_load_amps != 0,
+                                          np.clip(ambient + winding_rise, ambient, 180.0), ambient)
+
+            # Base vibration
+            flow_deviation = np.where(has_design_flow, (flow - self.spec_flow * 0.8) / self.spec_flow, 0.0)
+            vf = self.vibration_factor
+            base_vib = 2.0 * speed_ratio
+            vibration = (base_vib + 0.5 * vf * speed_ratio + 0.3 * (vf - 1.0) * speed_ratio
+                         + np.abs(flow_deviation) * 1.5 + uniform(-0.1, 0.1, 4) * base_vib)
+            vibration = np.where(rpm == 0, 0.1, np.clip(vibration, 0.3, 30.0))
+
+            # Bearing temperatures
+            bearing_temp_de = np.clip(
+                ambient + power * 0.15 + vibration * 2.0 + (vf - 1.0) * 15.0 + uniform(-1.0, 1.0, 5),
+                ambient, 150.0
+            )
+            bearing_temp_nde = bearing_temp_de - uniform(2, 5, 6)
+
+            # Seal chamber temperature
+            low_flow = has_design_flow & (flow < self.spec_flow * 0.5)
+            low_flow_rise = np.where(low_flow, (1.0 - flow / (self.spec_flow * 0.5)) * 20.0, 0.0)
+            seal_temp = np.clip(
+                ambient + 5.0 + low_flow_rise + self.seal_wear * 10.0 + uniform(-1.0, 1.0, 7),
+                ambient, 120.0
+            )
+
+        def axis(base: np.ndarray, factor: float, draw: int) -> List[float]:
+            return (base * factor * (1.0 + uniform(-0.1, 0.1, draw))).tolist()
+
+        nde_vibration = vibration * 0.85
+        not_faulted = ~self.is_faulted
+        remote = ~self.is_local_mode
+
+        return {
+            'FlowRate': flow.tolist(),
+            'SuctionPressure': suction.tolist(),
+            'DischargePressure': discharge.tolist(),
+            'RPM': rpm.tolist(),
+            'MotorCurrent': current.tolist(),
+            'Voltage': voltage.tolist(),
+            'PowerConsumption': power.tolist(),
+            'PowerFactor': power_factor.tolist(),
+            'VFDFrequency': frequency.tolist(),
+            'MotorWindingTemp': motor_winding_temp.tolist(),
+            'BearingTemp_DE': bearing_temp_de.tolist(),
+            'BearingTemp_NDE': bearing_temp_nde.tolist(),
+            'SealChamberTemp': seal_temp.tolist(),
+            'AmbientTemp': (self.ambient_temp + uniform(-0.5, 0.5, 8)).tolist(),
+            'Vibration_DE_H': axis(vibration, 1.0, 9),
+            'Vibration_DE_V': axis(vibration, 0.9, 10),
+            'Vibration_DE_A': axis(vibration, 0.7, 11),
+            'Vibration_NDE_H': axis(nde_vibration, 1.0, 12),
+            'Vibration_NDE_V': axis(nde_vibration, 0.9, 13),
+            'Vibration_NDE_A': axis(nde_vibration, 0.7, 14),
+            'RuntimeHours': self.runtime_hours.tolist(),
+            'StartCount': self.start_count.tolist(),
+            'RunCommand': running.tolist(),
+            'RunFeedback': (running & (rpm > 100)).tolist(),
+            'FaultStatus': self.is_faulted.tolist(),
+            'ReadyStatus': (not_faulted & remote).tolist(),
+            'LocalRemote': remote.tolist(),
+            'WetWellLevel': np.where(self.wet_well_coupled, self.wet_well_level,
+                                     self.wet_well_level + np.sin(self.runtime_hours * 0.1) * 0.5).tolist(),
+        }
@@ -0,0 +1,379 @@
+"""Station hydraulics for pumps sharing a discharge header.
+
+Pumps in the same station discharge in parallel into one header, so they
+all run at the header head H and together deliver the flow the system
+curve allows at that head:
+
+    system curve   H = H_static + R * Q_total²
+    pump i         H = s_i² * H_shutoff_i - k_i * s_i² * Q_i²    (PumpPhysics.head_at_flow)
+
+Inverting each pump curve gives its flow at a given header head (zero when
+the head is above what the pump can make at its speed, i.e. its check valve
+is closed), and the station operating point is the root of
+
+    f(H) = H - H_static - R * (Σ Q_i(H))²
+
+f is increasing in H, negative at H_static and non-negative at the highest
+shutoff head of the running pumps, so the root is bracketed. Every station
+is solved at once with a vectorized, safeguarded Newton iteration: one
+NumPy pass per iteration for all pumps of all stations, falling back to
+bisection of the bracket when a Newton step leaves it. Each station starts
+from its previous tick's head, so in steady operation the first evaluation
+already meets the tolerance and a tick costs one pass; speed changes and
+pump starts take a few iterations.
+
+The static head of a station's curve is given at REFERENCE_LEVEL in the wet
+well and moves with the mean wet_well_level of the station's pumps, so a
+rising wet well lifts the flow. The solve also returns each pump's flow
+sensitivity to that level (station_flow_slope), which the wet-well mass
+balance uses for its implicit step (see wetwell.py).
+
+In fleet and shard mode the pumps' state lives in the store's arrays
+(see pump.SlotField), and the solve reads its inputs from and writes
+station_flow and station_flow_slope to those arrays by slot, so a tick costs
+no Python pass over the pumps. The plain engine reads and writes the pump
+objects one by one.
+
+Pump wear (the mode's flow reduction factor) scales each pump's curve
+along the flow axis. Diurnal demand does not set the flow of station pumps;
+they deliver whatever the curve intersection gives.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+import numpy as np
+
+from .modes import ModeParameters
+from .pump import PumpSimulation
+
+_logger = logging.getLogger('simulation.hydraulics')
+
+# Default system curve: static lift as a fraction of the largest pump's
+# design head, friction sized so that pump alone runs at its design point
+DEFAULT_STATIC_FRACTION = 0.5
+
+# Wet well level (m) at which system curve static heads are given
+REFERENCE_LEVEL = 4.0
+
+# Newton iteration limits
+MAX_ITERATIONS = 30
+TOLERANCE = 1e-9  # metres of head
+
+
+@dataclass
+class SystemCurve:
+    """Station system curve H = static_head + resistance * Q² (H in m, Q in m³/h)."""
+    static_head: float
+    resistance: float
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any]) -> 'SystemCurve':
+        """Build from a systemCurve entry in assets.json.
+
+        The curve passes through (0, StaticHead) and (DesignFlow, DesignHead).
+        """
+        static_head = float(spec['StaticHead'])
+        design_flow = float(spec['DesignFlow'])
+        design_head = float(spec['DesignHead'])
+        if design_flow <= 0 or design_head < static_head:
+            raise ValueError(f"Invalid system curve {spec}: needs DesignFlow > 0 and DesignHead >= StaticHead")
+        return cls(static_head, (design_head - static_head) / design_flow ** 2)
+
+    @classmethod
+    def for_pumps(cls, pumps: Iterable[PumpSimulation]) -> 'SystemCurve':
+        """Default curve on which the largest pump alone runs at its design point."""
+        design = max((p.physics.design for p in pumps), key=lambda d: d.flow * d.head)
+        static_head = design.head * DEFAULT_STATIC_FRACTION
+        return cls(static_head, (design.head - static_head) / design.flow ** 2)
+
+    def head_at(self, flow: float) -> float:
+        return self.static_head + self.resistance * flow ** 2
+
+    def to_dict(self) -> Dict[str, float]:
+        return {'static_head': self.static_head, 'resistance': self.resistance}
+
+
+class StationHydraulics:
+    """Solves the operating point of every station's running pumps in one vectorized pass."""
+
+    def __init__(self, mode_params: ModeParameters):
+        self.mode_params = mode_params
+        self.station_ids: List[str] = []
+        self.curves: List[SystemCurve] = []
+        self.pumps: List[PumpSimulation] = []
+        self._pump_station: List[int] = []
+        self._dirty = True
+
+        # State store holding every station pump and their slots in it (see _store_slots)
+        self._store_key: Optional[Tuple[Any, int]] = None
+        self._slots: Optional[np.ndarray] = None
+
+        # Header head per station (warm start for the next solve)
+        self.head = np.zeros(0)
+        self.flow = np.zeros(0)
+
+        # Solver statistics
+        self.solves = 0
+        self.iterations = 0
+        self.max_iterations = 0
+        self.unconverged = 0
+
+    def __len__(self) -> int:
+        return len(self.station_ids)
+
+    def add_station(self, station_id: str, pumps: List[PumpSimulation],
+                    curve: Optional[SystemCurve] = None) -> SystemCurve:
+        """Register a station and the pumps discharging into its header.
+
+        Args:
+            station_id: Station (parent folder) asset id
+            pumps: Pumps in the station
+            curve: System curve (default: SystemCurve.for_pumps)
+        """
+        if not pumps:
+            raise ValueError(f"Station {station_id} has no pumps")
+        if station_id in self.station_ids:
+            raise ValueError(f"Station {station_id} already registered")
+        curve = curve or SystemCurve.for_pumps(pumps)
+        index = len(self.station_ids)
+        self.station_ids.append(station_id)
+        self.curves.append(curve)
+        for pump in pumps:
+            self.pumps.append(pump)
+            self._pump_station.append(index)
+        self._dirty = True
+        _logger.info(f"Station {station_id}: {len(pumps)} pumps on H = {curve.static_head:.2f} m "
+                     f"+ {curve.resistance:.3g} Q²")
+        return curve
+
+    # =========================================================================
+    # ARRAY LAYOUT
+    # =========================================================================
+
+    def _rebuild(self) -> None:
+        """(Re)allocate all arrays from the current station list."""
+        pumps = self.pumps
+        n = len(pumps)
+        self.station_index = np.array(self._pump_station, dtype=np.intp)
+        self.n_stations = len(self.station_ids)
+
+        self.max_rpm = np.fromiter((p.physics.design.max_rpm for p in pumps), dtype=np.float64, count=n)
+        self.shutoff_head = np.fromiter((p.physics.shutoff_head for p in pumps), dtype=np.float64, count=n)
+        self.k = np.fromiter((p.physics.k for p in pumps), dtype=np.float64, count=n)
+
+        self.static_head = np.array([c.static_head for c in self.curves])
+        self.resistance = np.array([c.resistance for c in self.curves])
+        self.pump_count = np.bincount(self.station_index, minlength=self.n_stations).astype(np.float64)
+
+        # Keep the warm start of stations that were already solved
+        head = np.array(self.static_head)
+        head[:len(self.head)] = self.head[:self.n_stations]
+        self.head = head
+        self.flow = np.zeros(self.n_stations)
+        self._dirty = False
+
+    # =========================================================================
+    # SOLVE
+    # =========================================================================
+
+    def solve(self, dt: float) -> None:
+        """Solve every station for the pump speeds reached at the end of this tick.
+
+        Sets station_flow on each station pump, which the pump, fleet and
+        shard paths use as the pump's flow instead of the speed/demand model,
+        and station_flow_slope, its derivative with respect to the wet well
+        level (m³/h per m).
+
+        Args:
+            dt: Tick length in seconds (to anticipate the RPM ramp)
+        """
+        if not self.pumps:
+            return
+        if self._dirty:
+            self._rebuild()
+
+        store, slots = self._store_slots()
+        if store is not None:
+            def read(name: str) -> np.ndarray:
+                return store.state_column(name)[slots]
+        else:
+            pumps = self.pumps
+
+            def read(name: str) -> np.ndarray:
+                return np.fromiter((getattr(p, name) for p in pumps), dtype=np.float64, count=len(pumps))
+
+        level = read('wet_well_level')
+        station_level = np.bincount(self.station_index, weights=level, minlength=self.n_stations) / self.pump_count
+        static_head = self.static_head - (station_level - REFERENCE_LEVEL)
+
+        speed_ratio = self._speed_ratio(dt, read('current_rpm'), read('target_rpm'), read('rpm_ramp_rate'))
+        flow, level_slope = self._solve(speed_ratio, self.mode_params.get_flow_reduction_factor(), static_head)
+        if store is not None:
+            store.state_column('station_flow')[slots] = flow
+            store.state_column('station_flow_slope')[slots] = level_slope
+        else:
+            for pump, pump_flow, pump_slope in zip(self.pumps, flow.tolist(), level_slope.tolist()):
+                pump.station_flow = pump_flow
+                pump.station_flow_slope = pump_slope
+
+    def _store_slots(self) -> Tuple[Optional[Any], Optional[np.ndarray]]:
+        """State store holding every station pump and the pumps' slots in it.
+
+        Returns (None, None) when the pumps hold their own state (plain
+        engine, or a store that has not taken them all over yet). The slots
+        are only looked up again when the store's layout changes.
+        """
+        store = self.pumps[0].state_store
+        if store is None:
+            return None, None
+        key = (store, store.layout)
+        if key != self._store_key:
+            self._store_key = key
+            self._slots = None
+            if all(p.state_store is store for p in self.pumps):
+                self._slots = np.fromiter((p.state_slot for p in self.pumps), dtype=np.intp, count=len(self.pumps))
+        if self._slots is None:
+            return None, None
+        return store, self._slots
+
+    def _speed_ratio(self, dt: float, rpm: np.ndarray, target: np.ndarray, ramp_rate: np.ndarray) -> np.ndarray:
+        """Speed ratio of each pump after this tick's RPM ramp (as PumpSimulation._update_rpm)."""
+        step = ramp_rate * dt
+        rpm = np.where(target > rpm, np.minimum(target, rpm + step), np.maximum(target, rpm - step))
+        return np.where(self.max_rpm != 0, rpm / np.where(self.max_rpm != 0, self.max_rpm, 1.0), 0.0)
+
+    def _solve(self, speed_ratio: np.ndarray, flow_reduction: float,
+               static_head: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the header head of every station.
+
+        Returns:
+            (flow, level_slope) per pump: the flow at the station's operating
+            point and its derivative with respect to the wet well level
+        """
+        station = self.station_index
+        n_stations = self.n_stations
+        resistance = self.resistance
+
+        # Pump curves at this speed: Q_i(H) = c_i * sqrt(H_max_i - H) for H < H_max_i
+        s2 = speed_ratio ** 2
+        turning = s2 > 0
+        pump_max_head = s2 * self.shutoff_head
+        with np.errstate(divide='ignore', invalid='ignore'):
+            c = np.where(turning & (self.k > 0), flow_reduction / np.sqrt(self.k * s2), 0.0)
+
+        # Bracket: f(static) <= 0 <= f(highest shutoff head of the station)
+        low = static_head.copy()
+        high = np.zeros(n_stations)
+        np.maximum.at(high, station, pump_max_head)
+        can_lift = high > low
+        high = np.maximum(high, low)
+
+        def evaluate(head: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+            margin = pump_max_head - head[station]
+            delivering = margin > 0
+            root = np.sqrt(np.where(delivering, margin, 0.0))
+            flow = c * root
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slope = np.where(delivering & (root > 0), -0.5 * c / root, 0.0)
+            total = np.bincount(station, weights=flow, minlength=n_stations)
+            total_slope = np.bincount(station, weights=slope, minlength=n_stations)
+            residual = head - static_head - resistance * total ** 2
+            derivative = 1.0 - 2.0 * resistance * total * total_slope
+            return flow, slope, residual, derivative
+
+        # Warm start from the previous tick, pulled into the bracket
+        head = np.where(can_lift, np.clip(self.head, low, high), static_head)
+        flow, slope, residual, derivative = evaluate(head)
+        iterations = 0
+        active = can_lift & (np.abs(residual) > TOLERANCE)
+        while active.any() and iterations < MAX_ITERATIONS:
+            iterations += 1
+            low = np.where(active & (residual < 0), head, low)
+            high = np.where(active & (residual > 0), head, high)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = head - residual / derivative
+            inside = np.isfinite(newton) & (newton > low) & (newton < high)
+            head = np.where(active, np.where(inside, newton, 0.5 * (low + high)), head)
+            flow, slope, residual, derivative = evaluate(head)
+            active = can_lift & (np.abs(residual) > TOLERANCE) & (high - low > TOLERANCE)
+
+        self.solves += 1
+        self.iterations += iterations
+        self.max_iterations = max(self.max_iterations, iterations)
+        if active.any():
+            self.unconverged += 1
+            _logger.debug(f"Station solve stopped after {iterations} iterations "
+                          f"with {int(active.sum())} stations unconverged")
+
+        self.head = head
+        self.flow = np.bincount(station, weights=flow, minlength=n_stations)
+
+        # Implicit function theorem: raising the level lowers the static head,
+        # dH/dlevel = -1 / f'(H), and each pump's flow follows its own curve
+        with np.errstate(divide='ignore', invalid='ignore'):
+            head_slope = np.where(can_lift & (derivative > 0), -1.0 / derivative, 0.0)
+        return flow, slope * head_slope[station]
+
+    # =========================================================================
+    # STATUS
+    # =========================================================================
+
+    def get_state(self) -> Dict[str, Dict[str, float]]:
+        """Header head and total flow of each station from the last solve."""
+        if self._dirty:
+            return {}
+        return {
+            station_id: {'head': head, 'flow': flow}
+            for station_id, head, flow in zip(self.station_ids, self.head.tolist(), self.flow.tolist())
+        }
+
+    def get_stations(self) -> List[Dict[str, Any]]:
+        """Station layout, system curves and warm-start heads (for recordings)."""
+        state = self.get_state()
+        return [
+            {
+                'id': station_id,
+                'pumps': [p.asset_id for p, s in zip(self.pumps, self._pump_station) if s == index],
+                'curve': curve.to_dict(),
+                'head': state[station_id]['head'] if station_id in state else None,
+            }
+            for index, (station_id, curve) in enumerate(zip(self.station_ids, self.curves))
+        ]
+
+    def warm_start(self, heads: List[float]) -> None:
+        """Set the header heads the next solve starts from."""
+        self.head = np.array(heads, dtype=np.float64)
+        self._dirty = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'stations': len(self.station_ids),
+            'pumps': len(self.pumps),
+            'solves': self.solves,
+            'mean_iterations': round(self.iterations / self.solves, 2) if self.solves else 0.0,
+            'max_iterations': self.max_iterations,
+            'unconverged': self.unconverged,
+        }
+
+
+def group_stations(asset_defs: Iterable[Any]) -> Dict[str, Tuple[List[str], Optional[SystemCurve]]]:
+    """Group simulated pumps by parent folder.
+
+    Returns:
+        station_id -> (pump asset ids, system curve from the folder's
+        systemCurve entry or None for the default)
+    """
+    asset_defs = list(asset_defs)
+    folders = {a.id: a for a in asset_defs}
+    stations: Dict[str, Tuple[List[str], Optional[SystemCurve]]] = {}
+    for asset_def in asset_defs:
+        if not asset_def.simulate or asset_def.asset_type not in ('PumpType', 'InfluentPumpType'):
+            continue
+        if asset_def.parent not in stations:
+            folder = folders.get(asset_def.parent)
+            spec = folder.system_curve if folder is not None else {}
+            stations[asset_def.parent] = ([], SystemCurve.from_spec(spec) if spec else None)
+        stations[asset_def.parent][0].append(asset_def.id)
+    return stations
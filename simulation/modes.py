@@ -8,8 +8,8 @@ Supports 4 modes per SPECS.md:
 """
 
 from enum import IntEnum
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Optional
 
 
 class SimulationMode(IntEnum):
@@ -72,6 +72,10 @@ class FlowProfileConfig:
     peak_hour_2: int = 19        # Evening peak (0-23)
 
 
+# Upper bound for time_acceleration set at runtime (one simulated hour per second)
+MAX_TIME_ACCELERATION = 3600.0
+
+
 @dataclass
 class ModeParameters:
     """Complete simulation mode parameters."""
@@ -83,6 +87,28 @@ class ModeParameters:
     simulation_interval: float = 1000.0  # ms
     time_acceleration: float = 1.0
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain (JSON-serializable) copy of all parameters."""
+        data = asdict(self)
+        data['mode'] = int(self.mode)
+        data['failure_config']['failure_type'] = int(self.failure_config.failure_type)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ModeParameters':
+        """Rebuild parameters from to_dict() output."""
+        failure = dict(data.get('failure_config', {}))
+        failure['failure_type'] = FailureType(failure.get('failure_type', 0))
+        return cls(
+            mode=SimulationMode(data.get('mode', 0)),
+            aged_config=AgedConfig(**data.get('aged_config', {})),
+            degraded_config=DegradedConfig(**data.get('degraded_config', {})),
+            failure_config=FailureConfig(**failure),
+            flow_profile=FlowProfileConfig(**data.get('flow_profile', {})),
+            simulation_interval=data.get('simulation_interval', 1000.0),
+            time_acceleration=data.get('time_acceleration', 1.0),
+        )
+
     def get_efficiency_factor(self) -> float:
         """Get efficiency reduction factor based on mode and wear."""
         if self.mode == SimulationMode.OPTIMAL:
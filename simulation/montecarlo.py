@@ -0,0 +1,332 @@
+"""Monte Carlo degradation runs.
+
+Samples thousands of independent headless simulations from a parameter
+space and runs them across a process pool, producing one labelled time
+series per run for training predictive-maintenance models.
+
+A space maps ModeParameters sections to value specs, plus a few run-level
+entries:
+
+    {
+        "mode": ["DEGRADED", "FAILURE"],
+        "degraded_config": {"impeller_wear": [0, 50], "bearing_wear": [0, 100]},
+        "failure_config": {"failure_type": {"choice": ["BEARING", "SEAL", "MOTOR"]},
+                           "time_to_failure": [24, 240]},
+        "design": {"DesignFlow": [0.9, 1.1], "MaxRPM": [0.95, 1.05]},
+        "inflow": [0.6, 1.5],
+        "start_hour": [0, 24]
+    }
+
+A two-number list is sampled uniformly, {"choice": [...]} or a list of
+strings picks one entry, anything else is used as is. "design" entries
+scale every pump's design specs, "inflow" scales the inflow of coupled
+wet wells (so it requires wet_wells=True) and "start_hour" shifts the
+run's start within the diurnal profile. The diurnal profile itself is a
+fixed table, so a "flow_profile" section is rejected rather than sampled
+into labels for variation that never happens.
+
+Runs are sampled in the parent from one seed, so a dataset is reproducible
+whatever the number of workers. Each worker builds its own engine from
+assets.json and writes its run to run_NNNNN.csv (or returns the columns
+when there is no output directory). The runner also writes labels.csv,
+with one row of sampled parameters per run. Every series row carries the
+run's mode, failure type and the tick's failure progression as labels;
+the failure type is "NONE" whenever the mode is not FAILURE.
+"""
+
+import asyncio
+import csv
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from config.loader import ConfigLoader
+
+from .batch import build_headless_engine
+from .modes import ModeParameters, SimulationMode, FailureType
+from .snapshot import EngineSnapshot
+
+_logger = logging.getLogger('simulation.montecarlo')
+
+# ModeParameters sections a space may sample. flow_profile is left out: the
+# pumps follow the fixed diurnal table, so sampling it would only add labels.
+MODE_SECTIONS = ('aged_config', 'degraded_config', 'failure_config')
+
+LABEL_COLUMNS = ('run', 'timestamp', 'mode', 'failure_type', 'failure_progression')
+
+
+def failure_label(mode: SimulationMode, failure_type: FailureType) -> str:
+    """Failure type label of a run or tick ("NONE" unless the mode is FAILURE)."""
+    return failure_type.name if mode == SimulationMode.FAILURE else "NONE"
+
+
+def sample_value(spec: Any, rng: np.random.Generator) -> Any:
+    """Draw one value from a value spec (see module docstring)."""
+    if isinstance(spec, dict) and 'choice' in spec:
+        choices = spec['choice']
+        return choices[int(rng.integers(len(choices)))]
+    if isinstance(spec, (list, tuple)):
+        if len(spec) == 2 and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in spec):
+            return float(rng.uniform(spec[0], spec[1]))
+        return spec[int(rng.integers(len(spec)))]
+    return spec
+
+
+@dataclass
+class RunSpec:
+    """Sampled parameters of one run."""
+    index: int
+    seed: int
+    mode_params: Dict[str, Any]
+    start: datetime
+    design_scale: Dict[str, float] = field(default_factory=dict)
+    inflow_scale: float = 1.0
+    labels: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RunResult:
+    """Outcome of one run."""
+    index: int
+    labels: Dict[str, Any]
+    ticks: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    path: Optional[str] = None
+    series: Optional[Dict[str, List[Any]]] = None
+    error: Optional[str] = None
+
+
+def sample_runs(space: Dict[str, Any], runs: int, seed: int = 0,
+                start: Optional[datetime] = None) -> List[RunSpec]:
+    """Draw the parameters of every run from a space.
+
+    Args:
+        space: Parameter space (see module docstring)
+        runs: Number of runs
+        seed: Seed of the whole dataset
+        start: Simulated UTC start time before the start_hour shift (default: today 00:00)
+    """
+    if 'flow_profile' in space:
+        raise ValueError("flow_profile cannot be sampled: the pumps follow the fixed diurnal table")
+    start = start or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    specs = []
+    for index, child in enumerate(np.random.SeedSequence(seed).spawn(runs)):
+        rng = np.random.default_rng(child)
+        labels: Dict[str, Any] = {}
+        params = ModeParameters().to_dict()
+
+        if 'mode' in space:
+            mode = SimulationMode[str(sample_value(space['mode'], rng)).upper()]
+            params['mode'] = int(mode)
+        for section in MODE_SECTIONS:
+            for name, value_spec in space.get(section, {}).items():
+                value = sample_value(value_spec, rng)
+                if section == 'failure_config' and name == 'failure_type':
+                    value = int(FailureType[str(value).upper()])
+                else:
+                    labels[f'{section}.{name}'] = value
+                params[section][name] = value
+        labels['mode'] = SimulationMode(params['mode']).name
+        labels['failure_type'] = failure_label(SimulationMode(params['mode']),
+                                               FailureType(params['failure_config']['failure_type']))
+
+        design_scale = {name: float(sample_value(value_spec, rng))
+                        for name, value_spec in space.get('design', {}).items()}
+        labels.update({f'design.{name}': scale for name, scale in design_scale.items()})
+        inflow_scale = float(sample_value(space.get('inflow', 1.0), rng))
+        start_hour = float(sample_value(space.get('start_hour', 0.0), rng))
+        if 'inflow' in space:
+            labels['inflow'] = inflow_scale
+        labels['start_hour'] = start_hour
+
+        specs.append(RunSpec(
+            index=index,
+            seed=int(child.generate_state(1)[0]),
+            mode_params=params,
+            start=start + timedelta(hours=start_hour),
+            design_scale=design_scale,
+            inflow_scale=inflow_scale,
+            labels=labels,
+        ))
+    return specs
+
+
+class LabelledSeries:
+    """Collects pump rows with the run's labels from engine snapshots."""
+
+    def __init__(self, run: int, engine: Any, pumps: Optional[List[str]] = None,
+                 stream: Optional[Any] = None, every: int = 1):
+        """
+        Args:
+            run: Run index written to every row
+            engine: Engine whose mode parameters supply the labels
+            pumps: Pump asset ids to record (default: all)
+            stream: Open text stream for CSV rows (None = keep columns in memory)
+            every: Record every Nth tick
+        """
+        self.run = run
+        self.engine = engine
+        self.pumps = set(pumps) if pumps else None
+        self.every = max(1, every)
+        self.rows = 0
+        self.columns: Optional[Dict[str, List[Any]]] = None if stream is not None else {}
+        self._writer = csv.writer(stream) if stream is not None else None
+        self._names: List[str] = []
+
+    async def __call__(self, snapshot: EngineSnapshot) -> None:
+        if snapshot.tick % self.every:
+            return
+
+        mode_params = self.engine.mode_params
+        labels = (self.run, snapshot.iso_timestamp, mode_params.mode.name,
+                  failure_label(mode_params.mode, mode_params.failure_config.failure_type),
+                  mode_params.failure_config.failure_progression)
+        for pump_id, state in snapshot.pump_states.items():
+            if self.pumps is not None and pump_id not in self.pumps:
+                continue
+            if not self._names:
+                self._names = list(LABEL_COLUMNS) + list(state.keys())
+                if self._writer is not None:
+                    self._writer.writerow(self._names)
+                else:
+                    self.columns = {name: [] for name in self._names}
+            row = labels + tuple(state.values())
+            if self._writer is not None:
+                self._writer.writerow(row)
+            else:
+                for column, value in zip(self.columns.values(), row):
+                    column.append(value)
+            self.rows += 1
+
+
+def run_one(spec: RunSpec, options: Dict[str, Any]) -> RunResult:
+    """Run one sampled simulation to completion (process-pool entry point).
+
+    Args:
+        spec: Sampled run parameters
+        options: Runner settings shared by all runs (see MonteCarloRunner)
+    """
+    began = time.perf_counter()
+    result = RunResult(index=spec.index, labels=spec.labels)
+    try:
+        engine = build_headless_engine(
+            ConfigLoader(), ModeParameters.from_dict(spec.mode_params),
+            fleet_mode=options['fleet_mode'], seed=spec.seed,
+            hydraulics=options['hydraulics'], wet_wells=options['wet_wells'],
+            design_scale=spec.design_scale,
+        )
+        if spec.inflow_scale != 1.0 and not engine.wet_wells.wells:
+            raise ValueError("inflow was sampled but the run has no coupled wet wells")
+        for well in engine.wet_wells.wells:
+            well.inflow *= spec.inflow_scale
+
+        output_dir = options['output_dir']
+        if output_dir:
+            result.path = os.path.join(output_dir, f'run_{spec.index:05d}.csv')
+            with open(result.path, 'w', newline='') as stream:
+                series = LabelledSeries(spec.index, engine, options['pumps'], stream, options['every'])
+                result.ticks = asyncio.run(engine.run_headless(
+                    options['duration_s'], options['step_s'], start=spec.start, on_snapshot=series))
+        else:
+            series = LabelledSeries(spec.index, engine, options['pumps'], None, options['every'])
+            result.ticks = asyncio.run(engine.run_headless(
+                options['duration_s'], options['step_s'], start=spec.start, on_snapshot=series))
+            result.series = series.columns
+        result.rows = series.rows
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = time.perf_counter() - began
+    return result
+
+
+def _init_worker(level: int) -> None:
+    """Quiet per-run engine logging in pool workers."""
+    logging.getLogger('simulation').setLevel(level)
+
+
+class MonteCarloRunner:
+    """Fans sampled headless runs out across a process pool."""
+
+    def __init__(self, space: Dict[str, Any], runs: int, duration_s: float, step_s: float = 60.0,
+                 workers: Optional[int] = None, seed: int = 0, start: Optional[datetime] = None,
+                 output_dir: Optional[str] = None, pumps: Optional[List[str]] = None, every: int = 1,
+                 fleet_mode: bool = False, hydraulics: bool = False, wet_wells: bool = False):
+        """
+        Args:
+            space: Parameter space (see module docstring)
+            runs: Number of runs
+            duration_s: Simulated seconds per run (before time acceleration)
+            step_s: Simulated seconds per tick
+            workers: Worker processes (default: CPU count)
+            seed: Seed of the whole dataset
+            start: Simulated UTC start time before the start_hour shift
+            output_dir: Directory for run_NNNNN.csv and labels.csv (None = keep in memory)
+            pumps: Pump asset ids to record (default: all)
+            every: Record every Nth tick
+            fleet_mode: Use the vectorized fleet engine in each run
+            hydraulics: Solve pumps sharing a station header against its system curve
+            wet_wells: Integrate wet-well levels from inflow and pump outflow
+        """
+        if 'inflow' in space and not wet_wells:
+            raise ValueError("An inflow spec only has an effect with wet_wells=True")
+        self.specs = sample_runs(space, runs, seed, start)
+        self.workers = workers or os.cpu_count() or 1
+        self.output_dir = output_dir
+        self.options = {
+            'duration_s': duration_s,
+            'step_s': step_s,
+            'output_dir': output_dir,
+            'pumps': pumps,
+            'every': every,
+            'fleet_mode': fleet_mode,
+            'hydraulics': hydraulics,
+            'wet_wells': wet_wells,
+        }
+
+    def run(self) -> List[RunResult]:
+        """Run every sampled simulation and return the results in run order."""
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+
+        began = time.perf_counter()
+        total = len(self.specs)
+        results: List[RunResult] = []
+        report_every = max(1, total // 10)
+        _logger.info(f"Monte Carlo: {total} runs on {self.workers} workers")
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(logging.WARNING,)) as pool:
+            futures = [pool.submit(run_one, spec, self.options) for spec in self.specs]
+            for future in as_completed(futures):
+                result = future.result()
+                if result.error:
+                    _logger.warning(f"Run {result.index} failed: {result.error}")
+                results.append(result)
+                if len(results) % report_every == 0 or len(results) == total:
+                    _logger.info(f"Monte Carlo: {len(results)}/{total} runs done "
+                                 f"in {time.perf_counter() - began:.1f}s")
+
+        results.sort(key=lambda r: r.index)
+        if self.output_dir:
+            self._write_labels(results)
+        return results
+
+    def _write_labels(self, results: List[RunResult]) -> None:
+        """Write labels.csv: one row of sampled parameters and outcome per run."""
+        names = sorted({name for result in results for name in result.labels})
+        path = os.path.join(self.output_dir, 'labels.csv')
+        with open(path, 'w', newline='') as stream:
+            writer = csv.writer(stream)
+            writer.writerow(['run'] + names + ['ticks', 'rows', 'path', 'error'])
+            for result in results:
+                writer.writerow([result.index] + [result.labels.get(name) for name in names] +
+                                [result.ticks, result.rows,
+                                 os.path.basename(result.path) if result.path else None, result.error])
+        _logger.info(f"Wrote labels of {len(results)} runs to {path}")
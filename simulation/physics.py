@@ -11,9 +11,11 @@ Reference: SPECS.md Section 6 - Physics Models
 """
 
 import math
-import random
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
+
+from .curves import PumpCurves, power_factor
+from .noise import NoiseStream
 
 
 @dataclass
@@ -37,12 +39,27 @@ class PumpPhysics:
     WATER_DENSITY = 998.0  # kg/m³
     GRAVITY = 9.81  # m/s²
 
-    def __init__(self, design: DesignPoint):
+    def __init__(self, design: DesignPoint, noise: Optional[NoiseStream] = None):
         self.design = design
+        # Measurement noise source (the owning pump's stream)
+        self.noise = noise or NoiseStream()
         # Calculate shutoff head (typically 1.2x design head)
         self.shutoff_head = design.head * 1.2
         # Head curve coefficient
         self.k = (self.shutoff_head - design.head) / (design.flow ** 2)
+        # Operating-point tables (built on first use)
+        self._curves: Optional[PumpCurves] = None
+
+    @property
+    def curves(self) -> PumpCurves:
+        """Operating-point tables for this design (model tables unless replaced)."""
+        if self._curves is None:
+            self._curves = PumpCurves.for_physics(self)
+        return self._curves
+
+    @curves.setter
+    def curves(self, curves: PumpCurves) -> None:
+        self._curves = curves
 
     # =========================================================================
     # AFFINITY LAWS
@@ -149,6 +166,21 @@ class PumpPhysics:
         shaft_power = self.calculate_shaft_power(flow, head, pump_efficiency)
         return shaft_power / (motor_efficiency / 100.0)
 
+    def operating_point(self, flow: float, current_rpm: float) -> Tuple[float, float, float]:
+        """Look up (head, efficiency, shaft power) at an operating point in the curve tables.
+
+        Equivalent to head_at_flow(), estimate_efficiency() and
+        calculate_shaft_power() within the error bounds documented in
+        simulation.curves.
+        """
+        if self.design.max_rpm == 0:
+            return 0.0, 0.0, 0.0
+        speed_ratio = current_rpm / self.design.max_rpm
+        bep_flow = self.design.flow * speed_ratio
+        if bep_flow == 0:
+            return 0.0, 0.0, 0.0
+        return self.curves.lookup(speed_ratio, flow / bep_flow)
+
     def estimate_efficiency(self, flow: float, current_rpm: float) -> float:
         """Estimate pump efficiency at operating point.
 
@@ -187,14 +219,10 @@ class PumpPhysics:
     def estimate_power_factor(self, load_fraction: float) -> float:
         """Estimate power factor based on motor load.
 
-        Power factor improves with load, peaks around 75-100% load.
+        Power factor improves with load, peaks around 75-100% load
+        (see curves.POWER_FACTOR_CURVE).
         """
-        if load_fraction < 0.25:
-            return 0.65 + load_fraction * 0.4
-        elif load_fraction < 1.0:
-            return 0.75 + load_fraction * 0.15
-        else:
-            return 0.90
+        return power_factor(load_fraction)
 
     def calculate_vfd_frequency(self, current_rpm: float) -> float:
         """Calculate VFD output frequency from RPM.
@@ -227,6 +255,10 @@ class PumpPhysics:
 
         Returns vibration in mm/s.
         """
+        # Random component (±10% of base), drawn even when stopped so every
+        # tick consumes the noise stream identically
+        noise_factor = self.noise.uniform(-0.1, 0.1)
+
         if rpm == 0:
             return 0.1  # Baseline noise
 
@@ -244,8 +276,7 @@ class PumpPhysics:
         # Flow deviation (off-BEP causes hydraulic vibration)
         flow_vib = abs(flow_deviation) * 1.5
 
-        # Random component (±10%)
-        noise = random.uniform(-0.1, 0.1) * base_vibration
+        noise = noise_factor * base_vibration
 
         total = base_vibration + imbalance + bearing + flow_vib + noise
         return max(0.3, min(30.0, total))
@@ -276,7 +307,7 @@ class PumpPhysics:
         wear_rise = wear_factor * 15.0
 
         # Random variation
-        noise = random.uniform(-1.0, 1.0)
+        noise = self.noise.uniform(-1.0, 1.0)
 
         temp = ambient + power_rise + vibration_rise + wear_rise + noise
         return max(ambient, min(150.0, temp))
@@ -294,7 +325,7 @@ class PumpPhysics:
         # Class F insulation: max 155°C, typical rise 80°C at FLA
         temp_rise = 80.0 * (load_fraction ** 2)
 
-        noise = random.uniform(-2.0, 2.0)
+        noise = self.noise.uniform(-2.0, 2.0)
         temp = ambient + temp_rise + noise
         return max(ambient, min(180.0, temp))
 
@@ -319,7 +350,7 @@ class PumpPhysics:
         # Wear contribution
         wear_rise = wear_factor * 10.0
 
-        noise = random.uniform(-1.0, 1.0)
+        noise = self.noise.uniform(-1.0, 1.0)
         temp = base_temp + low_flow_rise + wear_rise + noise
         return max(ambient, min(120.0, temp))
 
@@ -344,7 +375,7 @@ class PumpPhysics:
             friction_loss = 0.0
 
         # Add small random variation
-        noise = random.uniform(-0.02, 0.02)
+        noise = self.noise.uniform(-0.02, 0.02)
 
         pressure = static_p - friction_loss + noise
         return max(-0.5, min(2.0, pressure))
@@ -356,11 +387,11 @@ class PumpPhysics:
         Discharge = Suction + Head (converted to bar)
         """
         head_bar = head / 10.2  # Convert meters to bar
-        noise = random.uniform(-0.02, 0.02)
+        noise = self.noise.uniform(-0.02, 0.02)
         return suction_pressure + head_bar + noise
 
 
-def create_physics_from_specs(specs: dict) -> PumpPhysics:
+def create_physics_from_specs(specs: dict, noise: Optional[NoiseStream] = None) -> PumpPhysics:
     """Create PumpPhysics instance from design specs dictionary."""
     design = DesignPoint(
         flow=specs.get('DesignFlow', 2500.0),
@@ -373,4 +404,4 @@ def create_physics_from_specs(specs: dict) -> PumpPhysics:
         impeller_diameter=specs.get('ImpellerDiameter', 450.0),
         npsh_required=specs.get('NPSHRequired', 4.5)
     )
-    return PumpPhysics(design)
+    return PumpPhysics(design, noise)
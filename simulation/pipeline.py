@@ -0,0 +1,149 @@
+"""Pipelined publish stages.
+
+The engine tick is split into a compute stage (scenario, physics,
+hydraulics, wet wells, chambers, snapshot) and publish stages that fan the
+snapshot out to OPC-UA, WebSocket, MQTT and the Parquet export. Each
+publish stage runs in its own task and takes snapshots from a bounded
+queue, so while tick N is still being written and broadcast the engine is
+already computing tick N+1:
+
+    compute(N+1) | opcua(N)  websocket(N)  mqtt(N)
+
+Snapshots are immutable, so the stages share them without copying. With
+the default depth of 1 a stage holds one snapshot in flight and one
+waiting (double buffering); a compute stage that gets further ahead than
+that waits for the slowest stage, so the tick period is bounded by the
+slowest stage rather than by the sum of all stages. Stages never skip a
+snapshot, so every channel still sees every tick in order.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .snapshot import EngineSnapshot
+
+_logger = logging.getLogger('simulation.pipeline')
+
+StageHandler = Callable[[EngineSnapshot], Awaitable[None]]
+
+
+@dataclass
+class StageStats:
+    """Throughput and back-pressure accounting for one stage."""
+    snapshots: int = 0
+    errors: int = 0
+    stalls: int = 0              # submits that had to wait for this stage's queue
+    last_duration_ms: float = 0.0
+    max_duration_ms: float = 0.0
+    total_duration_ms: float = 0.0
+    last_tick: int = 0
+
+    @property
+    def mean_duration_ms(self) -> float:
+        return self.total_duration_ms / self.snapshots if self.snapshots else 0.0
+
+
+class _Stage:
+    """One publish stage: a bounded snapshot queue drained by its own task."""
+
+    def __init__(self, name: str, handler: StageHandler, depth: int):
+        self.name = name
+        self.handler = handler
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+        self.stats = StageStats()
+        self.task: Optional[asyncio.Task] = None
+
+    async def run(self) -> None:
+        while True:
+            snapshot = await self.queue.get()
+            started = time.perf_counter()
+            try:
+                await self.handler(snapshot)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats.errors += 1
+                _logger.warning(f"Pipeline stage {self.name} error on tick {snapshot.tick}: {e}")
+            finally:
+                duration_ms = (time.perf_counter() - started) * 1000.0
+                self.stats.snapshots += 1
+                self.stats.last_duration_ms = duration_ms
+                self.stats.total_duration_ms += duration_ms
+                self.stats.max_duration_ms = max(self.stats.max_duration_ms, duration_ms)
+                self.stats.last_tick = snapshot.tick
+                self.queue.task_done()
+
+
+class TickPipeline:
+    """Runs publish stages concurrently with the engine's compute stage."""
+
+    def __init__(self, depth: int = 1):
+        """
+        Args:
+            depth: Snapshots each stage may have queued behind the one it is publishing
+        """
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.depth = depth
+        self.stages: List[_Stage] = []
+
+    @property
+    def is_running(self) -> bool:
+        return any(stage.task is not None for stage in self.stages)
+
+    def add_stage(self, name: str, handler: StageHandler) -> None:
+        """Add a publish stage (before start())."""
+        if self.is_running:
+            raise RuntimeError("Cannot add a stage to a running pipeline")
+        self.stages.append(_Stage(name, handler, self.depth))
+
+    def start(self) -> None:
+        """Start one task per stage."""
+        for stage in self.stages:
+            if stage.task is None:
+                stage.task = asyncio.create_task(stage.run(), name=f'pipeline-{stage.name}')
+
+    async def submit(self, snapshot: EngineSnapshot) -> None:
+        """Hand a snapshot to every stage, waiting while any stage's queue is full."""
+        for stage in self.stages:
+            if stage.queue.full():
+                stage.stats.stalls += 1
+            await stage.queue.put(snapshot)
+
+    async def drain(self) -> None:
+        """Wait until every submitted snapshot has been published."""
+        for stage in self.stages:
+            if stage.task is not None:
+                await stage.queue.join()
+
+    async def stop(self, drain: bool = True) -> None:
+        """Optionally publish what is queued, then cancel the stage tasks."""
+        if drain:
+            try:
+                await self.drain()
+            except asyncio.CancelledError:
+                pass
+        for stage in self.stages:
+            if stage.task is not None:
+                stage.task.cancel()
+                try:
+                    await stage.task
+                except (asyncio.CancelledError, Exception):
+                    pass
+                stage.task = None
+            while not stage.queue.empty():
+                stage.queue.get_nowait()
+                stage.queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-stage statistics."""
+        stats: Dict[str, Any] = {'depth': self.depth, 'stages': {}}
+        for stage in self.stages:
+            stage_stats = asdict(stage.stats)
+            stage_stats['mean_duration_ms'] = stage.stats.mean_duration_ms
+            stage_stats['queued'] = stage.queue.qsize()
+            stats['stages'][stage.name] = stage_stats
+        return stats
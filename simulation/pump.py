@@ -14,17 +14,54 @@ Supports simulation modes: OPTIMAL, AGED, DEGRADED, FAILURE
 
 import logging
 import math
-import random
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Mapping
 from asyncua import ua, uamethod
 
+from config.loader import ReportingDef
+
 from .physics import PumpPhysics, create_physics_from_specs
+from .clock import SimulationClock
+from .commands import CommandQueue
+from .noise import NoiseStream
+from .write_plan import WritePlan, NodeBinding, bulk_write
 from .modes import ModeParameters, SimulationMode, FailureType, get_diurnal_multiplier
 
 _logger = logging.getLogger('simulation.pump')
 
 
+class SlotField:
+    """Pump state attribute held in a state store's arrays while one owns the pump.
+
+    On its own a pump keeps the value itself. Once a FleetSimulation or
+    ShardPool takes the pump over (state_store, state_slot), reads and writes
+    go to the store's slot for the pump, so controls applied from anywhere
+    (commands, REST, replay) land in the arrays the batched tick evaluates,
+    and the integrated state the tick leaves there is what the pump reports.
+    Fleet-wide passes (e.g. the station solve) read and write a field for
+    many pumps at once through the store's state_column() instead; a store's
+    layout counter changes whenever its slots may have moved.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, pump: Any, owner: Optional[type] = None) -> Any:
+        if pump is None:
+            return self
+        store = pump.__dict__.get('state_store')
+        if store is None:
+            return pump.__dict__[self.name]
+        return store.read_slot(self.name, pump.state_slot)
+
+    def __set__(self, pump: Any, value: Any) -> None:
+        store = pump.__dict__.get('state_store')
+        if store is None:
+            pump.__dict__[self.name] = value
+        else:
+            store.write_slot(self.name, pump.state_slot, value)
+
+
 class PumpSimulation:
     """Simulates a centrifugal pump with full instrumentation."""
 
@@ -42,6 +79,33 @@ class PumpSimulation:
         'RunCommand', 'RunFeedback', 'FaultStatus', 'ReadyStatus', 'LocalRemote'
     ]
 
+    # DesignSpecs variables that feed the physics model
+    SPEC_KEYS = [
+        'MaxRPM', 'MinRPM', 'DesignFlow', 'DesignHead', 'DesignPower', 'FullLoadAmps',
+        'RatedVoltage', 'ManufacturerBEP_Efficiency', 'MotorEfficiency'
+    ]
+
+    # Control inputs and integrated state, held by the state store owning the pump (if any)
+    STATE_FIELDS = (
+        'is_running', 'is_faulted', 'is_local_mode', 'target_rpm', 'current_rpm', 'runtime_hours',
+        'start_count', 'ambient_temp', 'wet_well_level', 'rpm_ramp_rate', 'target_flow_ratio',
+        'station_flow', 'station_flow_slope', 'wet_well_coupled'
+    )
+    is_running = SlotField()
+    is_faulted = SlotField()
+    is_local_mode = SlotField()
+    target_rpm = SlotField()
+    current_rpm = SlotField()
+    runtime_hours = SlotField()
+    start_count = SlotField()
+    ambient_temp = SlotField()
+    wet_well_level = SlotField()
+    rpm_ramp_rate = SlotField()
+    target_flow_ratio = SlotField()
+    station_flow = SlotField()
+    station_flow_slope = SlotField()
+    wet_well_coupled = SlotField()
+
     def __init__(self, asset_id: str, name: str, node: Any, design_specs: Dict[str, Any],
                  server: Any, mode_params: ModeParameters):
         self.asset_id = asset_id
@@ -50,13 +114,23 @@ class PumpSimulation:
         self.server = server
         self.mode_params = mode_params
 
-        # Physics engine
-        self.physics = create_physics_from_specs(design_specs)
+        # Physics engine (measurement noise from this pump's own stream)
+        self.noise = NoiseStream(asset_id=asset_id)
+        self.physics = create_physics_from_specs(design_specs, self.noise)
         self.design_specs = design_specs
 
         # Node references (populated during bind)
         self.nodes: Dict[str, Any] = {}
         self.eu_ranges: Dict[str, tuple] = {}
+        self.write_plan: Optional[WritePlan] = None
+        self._write_log_counter = 0
+
+        # Sampling and report-by-exception settings from the type definition (set before bind)
+        self.reporting = ReportingDef()
+
+        # Fleet or shard pool holding the state fields, and the pump's slot in it
+        self.state_store: Optional[Any] = None
+        self.state_slot = 0
 
         # State variables
         self.is_running = False
@@ -73,18 +147,48 @@ class PumpSimulation:
         self.rpm_ramp_rate = 150.0  # RPM per second
         self.last_tick_time: Optional[datetime] = None
 
-        # Diurnal flow target
+        # Diurnal flow target (hour of day from the engine clock, wall clock if unset)
         self.target_flow_ratio = 1.0
+        self.clock: Optional[SimulationClock] = None
+
+        # Flow from the station hydraulic solve (None = speed/demand model, see hydraulics.py)
+        self.station_flow: Optional[float] = None
+        self.station_flow_slope = 0.0  # m³/h per m of wet well level
+
+        # Wet well level integrated by the mass balance (see wetwell.py)
+        self.wet_well_coupled = False
 
-    async def bind(self) -> None:
-        """Bind to OPC-UA nodes for reading/writing values."""
-        await self._recursive_bind(self.node)
+        # Values from the most recent tick (shared by all output channels)
+        self.last_values: Optional[Dict[str, Any]] = None
 
-        # Read design specs from nodes
-        await self._read_design_specs()
+        # Engine command queue the OPC-UA methods go through (see commands.py)
+        self.commands: Optional[CommandQueue] = None
 
-        # Read EURange for clamping
-        await self._read_eu_ranges()
+    async def bind(self, bindings: Optional[Dict[str, NodeBinding]] = None) -> None:
+        """Bind to OPC-UA nodes for reading/writing values.
+
+        Args:
+            bindings: Binding manifest from AssetBuilder (None = browse the node)
+        """
+        if bindings is not None:
+            # Everything is known from building the asset, no address-space reads
+            self._bind_manifest(bindings)
+            self.write_plan = WritePlan.from_bindings(
+                bindings, self.ANALOG_VARIABLES + self.DISCRETE_VARIABLES, self.reporting
+            )
+        else:
+            await self._recursive_bind(self.node)
+
+            # Read design specs from nodes
+            await self._read_design_specs()
+
+            # Read EURange for clamping
+            await self._read_eu_ranges()
+
+            # Compile the per-tick write plan
+            self.write_plan = await WritePlan.compile(
+                self.nodes, self.ANALOG_VARIABLES + self.DISCRETE_VARIABLES, self.eu_ranges, self.reporting
+            )
 
         # Bind methods
         await self._bind_methods()
@@ -94,6 +198,23 @@ class PumpSimulation:
         top_level = [k for k in self.nodes.keys() if '.' not in k]
         _logger.info(f"Pump {self.name} top-level nodes: {top_level}")
 
+    def _bind_manifest(self, bindings: Dict[str, NodeBinding]) -> None:
+        """Take nodes, EURanges and design specs from a binding manifest."""
+        self.nodes = {key: binding.node for key, binding in bindings.items()}
+        self.eu_ranges = {name: bindings[name].eu_range for name in self.ANALOG_VARIABLES
+                          if name in bindings and bindings[name].eu_range is not None}
+
+        for spec_key in self.SPEC_KEYS:
+            binding = bindings.get(f'DesignSpecs.{spec_key}')
+            if binding is not None and binding.value is not None:
+                try:
+                    self.design_specs[spec_key] = float(binding.value)
+                except (TypeError, ValueError):
+                    pass
+
+        # Recreate physics with updated specs
+        self.physics = create_physics_from_specs(self.design_specs, self.noise)
+
     async def _recursive_bind(self, node: Any, prefix: str = "") -> None:
         """Recursively bind all child nodes."""
         children = await node.get_children()
@@ -108,17 +229,7 @@ class PumpSimulation:
 
     async def _read_design_specs(self) -> None:
         """Read design specs from DesignSpecs object."""
-        spec_map = {
-            'DesignSpecs.MaxRPM': 'MaxRPM',
-            'DesignSpecs.MinRPM': 'MinRPM',
-            'DesignSpecs.DesignFlow': 'DesignFlow',
-            'DesignSpecs.DesignHead': 'DesignHead',
-            'DesignSpecs.DesignPower': 'DesignPower',
-            'DesignSpecs.FullLoadAmps': 'FullLoadAmps',
-            'DesignSpecs.RatedVoltage': 'RatedVoltage',
-            'DesignSpecs.ManufacturerBEP_Efficiency': 'ManufacturerBEP_Efficiency',
-            'DesignSpecs.MotorEfficiency': 'MotorEfficiency',
-        }
+        spec_map = {f'DesignSpecs.{spec_key}': spec_key for spec_key in self.SPEC_KEYS}
 
         for node_key, spec_key in spec_map.items():
             if node_key in self.nodes:
@@ -130,7 +241,7 @@ class PumpSimulation:
                     pass
 
         # Recreate physics with updated specs
-        self.physics = create_physics_from_specs(self.design_specs)
+        self.physics = create_physics_from_specs(self.design_specs, self.noise)
 
     async def _read_eu_ranges(self) -> None:
         """Read EURange properties for value clamping."""
@@ -150,22 +261,22 @@ class PumpSimulation:
 
     async def _bind_methods(self) -> None:
         """Bind method implementations."""
-        # Create wrapper functions that properly bind to self
+        # Create wrapper functions that properly bind to self (applied at the next tick boundary)
         @uamethod
-        def start_pump_wrapper(parent):
-            return self._do_start_pump()
+        async def start_pump_wrapper(parent):
+            return await self.control('StartPump', self._do_start_pump)
 
         @uamethod
-        def stop_pump_wrapper(parent):
-            return self._do_stop_pump()
+        async def stop_pump_wrapper(parent):
+            return await self.control('StopPump', self._do_stop_pump)
 
         @uamethod
-        def set_speed_wrapper(parent, target_rpm: float):
-            return self._do_set_speed(target_rpm)
+        async def set_speed_wrapper(parent, target_rpm: float):
+            return await self.control('SetSpeed', self._do_set_speed, target_rpm)
 
         @uamethod
-        def reset_fault_wrapper(parent):
-            return self._do_reset_fault()
+        async def reset_fault_wrapper(parent):
+            return await self.control('ResetFault', self._do_reset_fault)
 
         method_map = {
             'StartPump': start_pump_wrapper,
@@ -186,6 +297,12 @@ class PumpSimulation:
             else:
                 _logger.warning(f"Method {method_name} not found in nodes for pump {self.name}")
 
+    async def control(self, name: str, action: Callable[..., Any], *args: Any) -> Any:
+        """Apply a control action through the engine command queue (directly if unqueued)."""
+        if self.commands is None:
+            return action(*args)
+        return await self.commands.submit(f"{self.name}.{name}", action, *args)
+
     # =========================================================================
     # METHOD IMPLEMENTATIONS (called by OPC-UA method wrappers)
     # =========================================================================
@@ -236,13 +353,27 @@ class PumpSimulation:
     # =========================================================================
 
     async def tick(self, dt: float) -> None:
-        """Update all sensor values for one simulation tick.
+        """Update all sensor values for one simulation tick and write them.
 
         Args:
             dt: Time delta in seconds since last tick
         """
+        values = self.step(dt)
+
+        # Write values to OPC-UA nodes
+        try:
+            await self._write_values(values)
+        except Exception as e:
+            _logger.error(f"Pump {self.name} tick write error: {e}", exc_info=True)
+
+    def step(self, dt: float) -> Dict[str, Any]:
+        """Advance pump state by dt seconds and calculate sensor values once.
+
+        The result is kept in last_values so get_state() and the engine
+        snapshot reuse it instead of re-running the physics.
+        """
         # Update diurnal flow target
-        current_hour = datetime.now().hour
+        current_hour = self.clock.hour if self.clock is not None else datetime.now().hour
         self.target_flow_ratio = get_diurnal_multiplier(current_hour)
 
         # Update RPM with inertia
@@ -254,13 +385,22 @@ class PumpSimulation:
             self.runtime_hours += (dt / 3600.0) * self.mode_params.time_acceleration
 
         # Calculate physics
-        values = self._calculate_values()
-
-        # Write values to OPC-UA nodes
-        try:
-            await self._write_values(values)
-        except Exception as e:
-            _logger.error(f"Pump {self.name} tick write error: {e}", exc_info=True)
+        self.last_values = self._calculate_values()
+        return self.last_values
+
+    def detach_state(self) -> None:
+        """Take the state fields back from the store holding them."""
+        if self.state_store is None:
+            return
+        state = {name: getattr(self, name) for name in self.STATE_FIELDS}
+        self.state_store = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def seed_noise(self, seed: Optional[int]) -> None:
+        """Restart this pump's noise stream from (seed, asset_id)."""
+        self.noise = NoiseStream(seed, self.asset_id)
+        self.physics.noise = self.noise
 
     def _update_rpm(self, dt: float) -> None:
         """Update RPM with acceleration/deceleration inertia."""
@@ -289,12 +429,17 @@ class PumpSimulation:
         fla = self.design_specs.get('FullLoadAmps', 225)
         design_flow = self.design_specs.get('DesignFlow', 2500)
 
-        # Flow rate (affected by speed and wear)
-        base_flow = self.physics.flow_at_speed(self.current_rpm)
-        flow = base_flow * flow_reduction * self.target_flow_ratio
+        # Flow rate (affected by speed and wear, or set by the station's system curve)
+        if self.station_flow is not None:
+            flow = self.station_flow
+        else:
+            base_flow = self.physics.flow_at_speed(self.current_rpm)
+            flow = base_flow * flow_reduction * self.target_flow_ratio
+
+        # Head, efficiency and shaft power from the curve tables
+        head, curve_efficiency, curve_shaft_power = self.physics.operating_point(flow, self.current_rpm)
 
-        # Head and pressure
-        head = self.physics.head_at_flow(flow, self.current_rpm)
+        # Pressure
         suction_pressure = self.physics.calculate_suction_pressure(
             static_head=self.wet_well_level,
             flow=flow,
@@ -303,13 +448,12 @@ class PumpSimulation:
         discharge_pressure = self.physics.calculate_discharge_pressure(suction_pressure, head)
 
         # Efficiency (affected by mode)
-        pump_efficiency = self.physics.estimate_efficiency(flow, self.current_rpm) * efficiency_factor
+        pump_efficiency = curve_efficiency * efficiency_factor
         motor_efficiency = self.design_specs.get('MotorEfficiency', 95.0)
 
-        # Power consumption
-        power = self.physics.calculate_electrical_power(
-            flow, head, pump_efficiency, motor_efficiency
-        )
+        # Power consumption (wear lowers the efficiency the shaft power was tabulated at)
+        shaft_power = curve_shaft_power / efficiency_factor if pump_efficiency > 0 else 0.0
+        power = shaft_power / (motor_efficiency / 100.0) if motor_efficiency > 0 else 0.0
         # Add minimum VFD losses when running
         if self.is_running and power < 5.0:
             power = 5.0
@@ -317,7 +461,7 @@ class PumpSimulation:
         # Electrical values
         load_fraction = power / self.design_specs.get('DesignPower', 150) if self.is_running else 0
         power_factor = self.physics.estimate_power_factor(load_fraction)
-        voltage = rated_voltage * (0.98 + random.uniform(-0.02, 0.02))  # ±2%
+        voltage = rated_voltage * (0.98 + self.noise.uniform(-0.02, 0.02))  # ±2%
         current = self.physics.calculate_motor_current(power, voltage, power_factor)
         frequency = self.physics.calculate_vfd_frequency(self.current_rpm)
 
@@ -342,7 +486,7 @@ class PumpSimulation:
             base_vibration,
             wear_factor=(vibration_factor - 1.0)
         )
-        bearing_temp_nde = bearing_temp_de - random.uniform(2, 5)  # NDE slightly cooler
+        bearing_temp_nde = bearing_temp_de - self.noise.uniform(2, 5)  # NDE slightly cooler
 
         # Seal temperature
         seal_temp = self.physics.calculate_seal_temp(
@@ -357,7 +501,7 @@ class PumpSimulation:
         def vibration_with_axis_variation(base: float, axis: str) -> float:
             """Add axis-specific variation to vibration."""
             factors = {'H': 1.0, 'V': 0.9, 'A': 0.7}
-            return base * factors.get(axis, 1.0) * (1.0 + random.uniform(-0.1, 0.1))
+            return base * factors.get(axis, 1.0) * (1.0 + self.noise.uniform(-0.1, 0.1))
 
         # Build values dictionary
         values = {
@@ -381,7 +525,7 @@ class PumpSimulation:
             'BearingTemp_DE': bearing_temp_de,
             'BearingTemp_NDE': bearing_temp_nde,
             'SealChamberTemp': seal_temp,
-            'AmbientTemp': self.ambient_temp + random.uniform(-0.5, 0.5),
+            'AmbientTemp': self.ambient_temp + self.noise.uniform(-0.5, 0.5),
 
             # Vibration
             'Vibration_DE_H': vibration_with_axis_variation(base_vibration, 'H'),
@@ -403,119 +547,45 @@ class PumpSimulation:
             'LocalRemote': not self.is_local_mode,
 
             # Wet well (for InfluentPumpType)
-            'WetWellLevel': self.wet_well_level + math.sin(self.runtime_hours * 0.1) * 0.5,
+            'WetWellLevel': (self.wet_well_level if self.wet_well_coupled
+                             else self.wet_well_level + math.sin(self.runtime_hours * 0.1) * 0.5),
         }
 
         return values
 
-    async def _write_values(self, values: Dict[str, Any]) -> None:
-        """Write calculated values to OPC-UA nodes with current timestamp."""
-        now = datetime.utcnow()
-
-        written_count = 0
-        missing_nodes = []
-        for var_name, value in values.items():
-            if var_name not in self.nodes:
-                missing_nodes.append(var_name)
-                continue
-            written_count += 1
-
-            try:
-                # Clamp to EURange if defined
-                if var_name in self.eu_ranges:
-                    low, high = self.eu_ranges[var_name]
-                    if isinstance(value, (int, float)):
-                        value = max(low, min(high, value))
-
-                # Determine variant type and create DataValue with timestamp
-                if isinstance(value, bool):
-                    variant = ua.Variant(value, ua.VariantType.Boolean)
-                elif isinstance(value, int):
-                    variant = ua.Variant(value, ua.VariantType.UInt32)
-                else:
-                    variant = ua.Variant(float(value), ua.VariantType.Double)
-
-                # Create DataValue with current source timestamp
-                data_value = ua.DataValue(
-                    Value=variant,
-                    StatusCode_=ua.StatusCode(ua.StatusCodes.Good),
-                    SourceTimestamp=now,
-                    ServerTimestamp=now
-                )
-
-                # Write using write_attribute for full DataValue support
-                await self.nodes[var_name].write_attribute(
-                    ua.AttributeIds.Value,
-                    data_value
-                )
-
-            except Exception as e:
-                _logger.debug(f"Could not write {var_name}: {e}")
-
-        if written_count == 0:
+    async def _write_values(self, values: Dict[str, Any], timestamp: Optional[datetime] = None) -> None:
+        """Write calculated values to OPC-UA nodes with the tick timestamp."""
+        if self.write_plan is None or not len(self.write_plan):
             _logger.warning(f"Pump {self.name}: No values written! Available nodes: {list(self.nodes.keys())[:10]}")
-        elif missing_nodes:
-            _logger.debug(f"Pump {self.name}: Missing nodes for: {missing_nodes[:5]}... (wrote {written_count})")
+            return
 
-        # Log successful write occasionally (every ~10 seconds assuming 1s tick)
-        if hasattr(self, '_write_log_counter'):
-            self._write_log_counter += 1
-        else:
-            self._write_log_counter = 0
+        write_values = self.write_plan.build(values, timestamp or datetime.utcnow())
+        failed = await bulk_write(self.write_plan.session, write_values)
+        self.log_write(len(write_values) - failed, values)
 
-        if self._write_log_counter % 10 == 0:
+    def log_write(self, written_count: int, values: Dict[str, Any]) -> None:
+        """Log successful writes occasionally (every ~10 seconds assuming 1s tick)."""
+        self._write_log_counter += 1
+        if self._write_log_counter % 10 == 1:
             _logger.info(f"Pump {self.name}: Wrote {written_count} values (FlowRate={values.get('FlowRate', 0):.1f}, RPM={values.get('RPM', 0):.0f})")
 
     # =========================================================================
     # CONTROL METHODS
     # =========================================================================
 
-    async def start(self) -> None:
-        """Start the pump."""
-        if not self.is_faulted:
-            self.is_running = True
-            self.target_rpm = self.design_specs.get('MaxRPM', 1180) * 0.95
-            self.start_count += 1
-            # Immediately write status to OPC-UA nodes
-            await self._write_status_values()
-
-    async def stop(self) -> None:
-        """Stop the pump."""
+    def start(self) -> bool:
+        """Start the pump (status is written with the next tick)."""
+        if self.is_faulted:
+            return False
+        self.is_running = True
+        self.target_rpm = self.design_specs.get('MaxRPM', 1180) * 0.95
+        self.start_count += 1
+        return True
+
+    def stop(self) -> None:
+        """Stop the pump (status is written with the next tick)."""
         self.is_running = False
         self.target_rpm = 0.0
-        # Immediately write status to OPC-UA nodes
-        await self._write_status_values()
-
-    async def _write_status_values(self) -> None:
-        """Write discrete status values to OPC-UA nodes immediately."""
-        from datetime import datetime
-        now = datetime.utcnow()
-
-        status_values = {
-            'RunCommand': self.is_running,
-            'RunFeedback': self.is_running and self.current_rpm > 100,
-            'FaultStatus': self.is_faulted,
-            'ReadyStatus': not self.is_faulted and not self.is_local_mode,
-            'LocalRemote': not self.is_local_mode,
-        }
-
-        for var_name, value in status_values.items():
-            if var_name not in self.nodes:
-                continue
-            try:
-                variant = ua.Variant(value, ua.VariantType.Boolean)
-                data_value = ua.DataValue(
-                    Value=variant,
-                    SourceTimestamp=now,
-                    ServerTimestamp=now,
-                    StatusCode=ua.StatusCode(ua.StatusCodes.Good)
-                )
-                await self.nodes[var_name].write_attribute(
-                    ua.AttributeIds.Value,
-                    data_value
-                )
-            except Exception as e:
-                _logger.debug(f"Could not write status {var_name}: {e}")
 
     def set_speed(self, rpm: float) -> bool:
         """Set target speed."""
@@ -541,16 +611,33 @@ class PumpSimulation:
         """Set wet well level (for InfluentPumpType)."""
         self.wet_well_level = max(0.0, min(10.0, level))
 
-    def get_state(self) -> Dict[str, Any]:
-        """Get current pump state for WebSocket broadcasting."""
-        # Calculate current values (same as _calculate_values but returns state dict)
-        values = self._calculate_values()
+    def _static_values(self) -> Dict[str, Any]:
+        """Noise-free values of a pump that has not been ticked yet."""
+        return {
+            'RPM': self.current_rpm,
+            'AmbientTemp': self.ambient_temp,
+            'RuntimeHours': self.runtime_hours,
+            'StartCount': self.start_count,
+            'WetWellLevel': self.wet_well_level,
+        }
+
+    def get_state(self, values: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """Get pump state dict for WebSocket/REST from already calculated values.
+
+        Uses the values from the most recent tick unless given explicitly.
+        The run and fault flags come from the values too, so a state built
+        after the tick still describes that tick. Before the first tick the
+        state is static (counters and setpoints, zero process values) so that
+        no noise is drawn outside a tick.
+        """
+        if values is None:
+            values = self.last_values if self.last_values is not None else self._static_values()
 
         return {
             "id": self.asset_id,
             "name": self.name,
-            "is_running": self.is_running,
-            "is_faulted": self.is_faulted,
+            "is_running": values.get('RunCommand', self.is_running),
+            "is_faulted": values.get('FaultStatus', self.is_faulted),
             "flow_rate": values.get('FlowRate', 0),
             "suction_pressure": values.get('SuctionPressure', 0),
             "discharge_pressure": values.get('DischargePressure', 0),
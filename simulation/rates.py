@@ -0,0 +1,76 @@
+"""Multi-rate sampling on the engine tick grid.
+
+Variables declare a sampling interval in types.yaml (samplingInterval, in
+ms, like the OPC UA MinimumSamplingInterval attribute). The engine keeps a
+single tick grid at its base interval; a sampling interval of N grid
+periods is due on every Nth grid slot (rounded, at least every slot), so
+intervals shorter than the base tick simply sample on every tick. The
+divisors are derived from the configured base interval, not from each
+tick's dt, and due-ness is tested against the scheduler's slot index, so a
+tick that follows skipped slots neither shortens the divisors nor shifts
+the sampling phase.
+
+On each tick the engine
+
+- steps a chamber only when its fastest interval is due, over the time
+  accumulated since its previous step, and
+- writes a pump or chamber variable only when its own interval is due.
+
+Pump state (RPM ramp, runtime) and physics still advance every tick, since
+RPM, flow and electrical values are sampled at the base rate and all pump
+data points come out of one physics pass.
+"""
+
+import logging
+from typing import Dict, Any, Iterable, Optional
+
+_logger = logging.getLogger('simulation.rates')
+
+
+class RateSchedule:
+    """Decides which sampling intervals are due on each engine tick."""
+
+    def __init__(self):
+        self.intervals: set = set()
+        self.divisors: Dict[float, int] = {}  # interval (ms) -> grid slots per sample
+        self.due: Dict[float, bool] = {}      # interval (ms) -> due on the current tick
+        self.base: Optional[float] = None     # grid period in seconds
+        self.slot = -1                        # grid slot of the current tick
+
+    def register(self, intervals: Iterable[float]) -> None:
+        """Add sampling intervals (ms) used by a newly added asset."""
+        new = set(intervals) - self.intervals
+        if new:
+            self.intervals |= new
+            self._compute_divisors()
+
+    def set_base(self, base: float) -> None:
+        """Set the grid period (seconds) the divisors are derived from."""
+        if base > 0 and base != self.base:
+            self.base = base
+            self._compute_divisors()
+
+    def _compute_divisors(self) -> None:
+        base_ms = (self.base or 0.0) * 1000.0
+        self.divisors = {
+            interval: max(1, int(round(interval / base_ms))) if base_ms > 0 else 1
+            for interval in self.intervals
+        }
+
+    def update(self, slot: int) -> Dict[float, bool]:
+        """Work out the due intervals for a tick.
+
+        Args:
+            slot: Index of the tick's slot on the grid (skipped slots count,
+                so samples stay in phase with wall time after a catch-up)
+        """
+        self.slot = slot
+        self.due = {interval: slot % divisor == 0 for interval, divisor in self.divisors.items()}
+        return self.due
+
+    def is_due(self, interval: Optional[float]) -> bool:
+        """Whether an interval (None = every tick) is due on the current tick."""
+        return interval is None or self.due.get(interval, True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {f"{interval:g}ms": divisor for interval, divisor in sorted(self.divisors.items())}
@@ -0,0 +1,340 @@
+"""Deterministic record and replay of engine runs.
+
+Instead of recording sensor values, the recorder logs only what can change
+the engine's trajectory: the noise seed, the simulated start time and tick,
+the design specs and sampling intervals of every asset, the chamber values
+held until their next due step, the station system curves and solver
+warm starts, the wet-well couplings, and each external change to pump
+state, chamber setpoints, levels and inflows, mode parameters, tick
+length or tick grid (period and skipped slots, which set the sampling
+phase), stamped with the index of the tick it took effect on. Changes are detected at tick boundaries by
+comparing against the state the previous tick left behind, so commands are
+captured whether they arrived via OPC-UA methods, REST, or direct attribute
+writes.
+
+Replaying a recording rebuilds the same assets in a headless engine, applies
+the logged changes at the same tick indices and steps as fast as the CPU
+allows, reproducing the original value stream exactly.
+
+File layout (little-endian):
+    magic, uint32 header length, JSON header
+    records: uint32 tick, uint8 type, payload
+        DT:      float64 seconds
+        GRID:    float64 grid period seconds, uint32 slot (when the period
+                 changes or slots were skipped)
+        PUMP:    uint16 slot, uint8 field, float64 value
+        CHAMBER: uint16 slot, uint8 field, float64 value
+        MODE:    uint16 length, JSON ModeParameters.to_dict()
+        END:     (no payload; tick = total ticks)
+"""
+
+import json
+import logging
+import random
+import struct
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Callable, Awaitable, BinaryIO, Tuple
+
+from config.loader import ReportingDef
+
+from .chamber import ChamberSimulation
+from .hydraulics import SystemCurve
+from .modes import ModeParameters
+from .pump import PumpSimulation
+from .snapshot import EngineSnapshot
+
+_logger = logging.getLogger('simulation.recording')
+
+MAGIC = b'PSREC\x01'
+
+REC_DT = 1
+REC_PUMP = 2
+REC_CHAMBER = 3
+REC_MODE = 4
+REC_END = 5
+REC_GRID = 6
+
+_RECORD = struct.Struct('<IB')
+_DT = struct.Struct('<d')
+_FIELD = struct.Struct('<HBd')
+_LENGTH = struct.Struct('<H')
+_GRID = struct.Struct('<dI')
+_HEADER_LENGTH = struct.Struct('<I')
+
+# Externally settable state that determines each asset's trajectory
+PUMP_FIELDS = (
+    'is_running', 'is_faulted', 'is_local_mode', 'target_rpm', 'current_rpm',
+    'runtime_hours', 'start_count', 'ambient_temp', 'wet_well_level', 'rpm_ramp_rate'
+)
+CHAMBER_FIELDS = ('level_setpoint', 'tick_count', 'inflow', 'level', 'elapsed')
+
+_FIELD_TYPES = {'is_running': bool, 'is_faulted': bool, 'is_local_mode': bool,
+                'start_count': int, 'tick_count': int}
+
+
+class EngineRecorder:
+    """Writes the trajectory-changing inputs of an engine run to a binary log."""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.ticks = 0
+        self.records = 0
+        self._pumps: List[PumpSimulation] = []
+        self._chambers: List[ChamberSimulation] = []
+        self._pump_state: List[Tuple[Any, ...]] = []
+        self._chamber_state: List[Tuple[Any, ...]] = []
+        self._mode_state: Optional[Dict[str, Any]] = None
+        self._dt: Optional[float] = None
+        self._grid: Optional[Tuple[float, int]] = None  # (period, slot) of the previous tick
+        self._started = False
+
+    @classmethod
+    def open(cls, path: str) -> 'EngineRecorder':
+        return cls(open(path, 'wb'))
+
+    def _write_header(self, engine: Any) -> None:
+        self._pumps = list(engine.pumps.values())
+        self._chambers = list(engine.chambers.values())
+        header = {
+            'seed': engine.seed,
+            'start': engine.clock.now.isoformat(),
+            'tick': engine.tick_count,
+            'utc_offset': engine.clock.utc_offset.total_seconds(),
+            'pumps': [{'id': p.asset_id, 'name': p.name, 'design_specs': p.design_specs}
+                      for p in self._pumps],
+            'chambers': [{'id': c.asset_id, 'name': c.name, 'level': c.level, 'temperature': c.temperature,
+                          'area': c.area, 'pending_dt': c.pending_dt,
+                          'sampling_intervals': c.reporting.sampling_intervals}
+                         for c in self._chambers],
+            'stations': engine.hydraulics.get_stations(),
+            'wet_wells': engine.wet_wells.get_wells(),
+        }
+        data = json.dumps(header).encode('utf-8')
+        self.stream.write(MAGIC)
+        self.stream.write(_HEADER_LENGTH.pack(len(data)))
+        self.stream.write(data)
+        # Everything differs from the empty baseline, so the first capture logs the full initial state
+        self._pump_state = [(None,) * len(PUMP_FIELDS) for _ in self._pumps]
+        self._chamber_state = [(None,) * len(CHAMBER_FIELDS) for _ in self._chambers]
+        self._started = True
+
+    def _write(self, record_type: int, payload: bytes) -> None:
+        self.stream.write(_RECORD.pack(self.ticks, record_type))
+        self.stream.write(payload)
+        self.records += 1
+
+    def capture(self, engine: Any, dt: float, slot: int) -> None:
+        """Log every change made since the previous tick. Called at the start of a tick."""
+        if not self._started:
+            self._write_header(engine)
+
+        if dt != self._dt:
+            self._write(REC_DT, _DT.pack(dt))
+            self._dt = dt
+
+        base = engine.rates.base or 0.0
+        if self._grid is None or self._grid != (base, slot - 1):
+            self._write(REC_GRID, _GRID.pack(base, slot))
+        self._grid = (base, slot)
+
+        mode_state = engine.mode_params.to_dict()
+        if mode_state != self._mode_state:
+            data = json.dumps(mode_state).encode('utf-8')
+            self._write(REC_MODE, _LENGTH.pack(len(data)) + data)
+
+        for slot, pump in enumerate(self._pumps):
+            previous = self._pump_state[slot]
+            for index, name in enumerate(PUMP_FIELDS):
+                value = getattr(pump, name)
+                if value != previous[index]:
+                    self._write(REC_PUMP, _FIELD.pack(slot, index, float(value)))
+
+        for slot, chamber in enumerate(self._chambers):
+            previous = self._chamber_state[slot]
+            for index, name in enumerate(CHAMBER_FIELDS):
+                value = getattr(chamber, name)
+                if value != previous[index]:
+                    self._write(REC_CHAMBER, _FIELD.pack(slot, index, float(value)))
+
+    def settle(self, engine: Any) -> None:
+        """Remember the state the tick left behind. Called at the end of a tick."""
+        self._pump_state = [tuple(getattr(p, name) for name in PUMP_FIELDS) for p in self._pumps]
+        self._chamber_state = [tuple(getattr(c, name) for name in CHAMBER_FIELDS) for c in self._chambers]
+        self._mode_state = engine.mode_params.to_dict()
+        self.ticks += 1
+
+    def close(self) -> None:
+        """Write the end marker and close the stream."""
+        if self.stream.closed:
+            return
+        if self._started:
+            self._write(REC_END, b'')
+        self.stream.close()
+        _logger.info(f"Recording closed: {self.ticks} ticks, {self.records} records")
+
+
+@dataclass
+class Recording:
+    """A parsed recording."""
+    seed: Optional[int]
+    start: datetime
+    utc_offset: timedelta
+    pumps: List[Dict[str, Any]]
+    chambers: List[Dict[str, Any]]
+    ticks: int
+    events: Dict[int, List[Tuple[int, Any]]] = field(default_factory=dict)  # tick -> [(type, payload)]
+    start_tick: int = 0  # engine tick count when recording started (multi-rate phase)
+    stations: List[Dict[str, Any]] = field(default_factory=list)
+    wet_wells: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: str) -> 'Recording':
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if not data.startswith(MAGIC):
+            raise ValueError(f"{path} is not an engine recording")
+        pos = len(MAGIC)
+        (length,) = _HEADER_LENGTH.unpack_from(data, pos)
+        pos += _HEADER_LENGTH.size
+        header = json.loads(data[pos:pos + length].decode('utf-8'))
+        pos += length
+
+        events: Dict[int, List[Tuple[int, Any]]] = {}
+        ticks = None
+        last_tick = 0
+        while pos + _RECORD.size <= len(data):
+            tick, record_type = _RECORD.unpack_from(data, pos)
+            pos += _RECORD.size
+            if record_type == REC_END:
+                ticks = tick
+                break
+            if record_type == REC_DT:
+                (payload,) = _DT.unpack_from(data, pos)
+                pos += _DT.size
+            elif record_type == REC_GRID:
+                payload = _GRID.unpack_from(data, pos)
+                pos += _GRID.size
+            elif record_type in (REC_PUMP, REC_CHAMBER):
+                payload = _FIELD.unpack_from(data, pos)
+                pos += _FIELD.size
+            elif record_type == REC_MODE:
+                (length,) = _LENGTH.unpack_from(data, pos)
+                pos += _LENGTH.size
+                payload = json.loads(data[pos:pos + length].decode('utf-8'))
+                pos += length
+            else:
+                raise ValueError(f"Unknown record type {record_type} at offset {pos}")
+            events.setdefault(tick, []).append((record_type, payload))
+            last_tick = tick
+
+        if ticks is None:
+            _logger.warning(f"Recording {path} has no end marker; replaying up to tick {last_tick + 1}")
+            ticks = last_tick + 1
+
+        return cls(
+            seed=header['seed'],
+            start=datetime.fromisoformat(header['start']),
+            utc_offset=timedelta(seconds=header['utc_offset']),
+            pumps=header['pumps'],
+            chambers=header['chambers'],
+            ticks=ticks,
+            events=events,
+            start_tick=header.get('tick', 0),
+            stations=header.get('stations', []),
+            wet_wells=header.get('wet_wells', []),
+        )
+
+    def build_engine(self, fleet_mode: bool = False) -> Any:
+        """Create a headless engine with the recorded assets and seed."""
+        from .engine import SimulationEngine
+
+        mode_params = ModeParameters()
+        engine = SimulationEngine(mode_params, fleet_mode=fleet_mode, seed=self.seed)
+        engine.clock.utc_offset = self.utc_offset
+        for spec in self.pumps:
+            engine.add_pump(PumpSimulation(spec['id'], spec['name'], None, spec['design_specs'],
+                                           None, mode_params))
+        for spec in self.chambers:
+            chamber = ChamberSimulation(spec['id'], spec['name'], None, None, mode_params)
+            chamber.reporting = ReportingDef(sampling_intervals=spec.get('sampling_intervals', {}))
+            # Values held until the chamber's first due step
+            chamber.level = spec.get('level', chamber.level)
+            chamber.temperature = spec.get('temperature', chamber.temperature)
+            chamber.pending_dt = spec.get('pending_dt', 0.0)
+            engine.add_chamber(chamber)
+        for spec in self.stations:
+            engine.add_station(spec['id'], spec['pumps'], SystemCurve(**spec['curve']))
+        areas = {spec['id']: spec.get('area') for spec in self.chambers}
+        for spec in self.wet_wells:
+            engine.add_wet_well(spec['id'], spec['pumps'], areas.get(spec['id']))
+        heads = [spec['head'] for spec in self.stations]
+        if heads and None not in heads:
+            engine.hydraulics.warm_start(heads)
+        engine.tick_count = self.start_tick
+        engine.rates.slot = self.start_tick - 1  # recordings without grid records
+        return engine
+
+
+def _apply(engine: Any, pumps: List[PumpSimulation], chambers: List[ChamberSimulation],
+           record_type: int, payload: Any) -> None:
+    if record_type == REC_PUMP:
+        slot, index, value = payload
+        name = PUMP_FIELDS[index]
+        setattr(pumps[slot], name, _FIELD_TYPES.get(name, float)(value))
+    elif record_type == REC_CHAMBER:
+        slot, index, value = payload
+        name = CHAMBER_FIELDS[index]
+        setattr(chambers[slot], name, _FIELD_TYPES.get(name, float)(value))
+    elif record_type == REC_MODE:
+        # Update in place: pumps, chambers and the fleet share this object
+        recorded = ModeParameters.from_dict(payload)
+        for f in fields(recorded):
+            setattr(engine.mode_params, f.name, getattr(recorded, f.name))
+
+
+async def replay(path: str, fleet_mode: bool = False,
+                 on_snapshot: Optional[Callable[[EngineSnapshot], Awaitable[None]]] = None) -> Any:
+    """Re-run a recording headless and return the engine in its final state.
+
+    Args:
+        path: Recording file written by EngineRecorder
+        fleet_mode: Evaluate pumps with the vectorized fleet engine
+        on_snapshot: Awaited with each tick's EngineSnapshot
+    """
+    recording = Recording.load(path)
+    engine = recording.build_engine(fleet_mode)
+    pumps = list(engine.pumps.values())
+    chambers = list(engine.chambers.values())
+
+    _logger.info(f"Replaying {recording.ticks} ticks of {len(pumps)} pumps and {len(chambers)} chambers "
+                 f"from {recording.start.isoformat()}")
+
+    engine.clock.reset(recording.start)
+    engine.is_running = True
+    dt = 0.0
+    try:
+        for tick in range(recording.ticks):
+            slot = None
+            for record_type, payload in recording.events.get(tick, ()):
+                if record_type == REC_DT:
+                    dt = payload
+                elif record_type == REC_GRID:
+                    base, slot = payload
+                    engine.rates.set_base(base)
+                else:
+                    _apply(engine, pumps, chambers, record_type, payload)
+            await engine._tick_all(dt, slot=slot)
+            if on_snapshot:
+                await on_snapshot(engine.snapshot)
+    finally:
+        engine.is_running = False
+
+    _logger.info(f"Replay finished at {engine.clock.now.isoformat()}")
+    return engine
+
+
+def new_seed() -> int:
+    """Pick a random seed for a recording of an unseeded engine."""
+    return random.SystemRandom().randrange(2 ** 32)
@@ -0,0 +1,226 @@
+"""Scripted scenarios on simulated time.
+
+A ScenarioScheduler holds timed engine actions ("trigger a BEARING failure
+on IPS_PMP_002 at +36h", "switch to AGED at day 3", "ramp the wet-well
+inflow to storm flow over 4 hours") in a heap ordered by simulated seconds
+since the engine clock's start. Each tick the engine only compares the
+earliest event with the tick's end time, so an idle queue costs O(1) per
+tick and each event costs O(log n) to schedule and to fire, however many
+thousands are queued for a multi-month accelerated run.
+
+Events fire at the start of the first tick whose end time reaches them,
+before the recorder captures that tick's inputs, so a recorded scenario
+run replays exactly without the scenario.
+
+Scenario files are JSON:
+
+    {"events": [
+        {"at": "36h", "action": "failure", "asset": "IPS_PMP_002", "failure": "BEARING"},
+        {"at": "3d", "action": "mode", "mode": "AGED", "years": 5},
+        {"at": "2d6h", "action": "inflow_ramp", "chamber": "IPS_WW_001", "to": 9000, "over": "4h"}
+    ]}
+
+Offsets ("at", "over") are seconds or durations such as "1d12h30m".
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Union
+
+from .modes import SimulationMode, FailureType
+
+_logger = logging.getLogger('simulation.scenario')
+
+_DURATION = re.compile(r'(\d+(?:\.\d+)?)\s*([dhms])')
+_UNIT_SECONDS = {'d': 86400.0, 'h': 3600.0, 'm': 60.0, 's': 1.0}
+
+# Inflow changes per inflow_ramp unless the event gives "steps"
+DEFAULT_RAMP_STEPS = 20
+
+
+def parse_offset(value: Union[str, float, int]) -> float:
+    """Convert seconds or a duration like "1d12h" or "+90m" to seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = value.strip().lstrip('+').lower()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parts = _DURATION.findall(text)
+    if not parts or _DURATION.sub('', text).strip():
+        raise ValueError(f"Invalid scenario offset: {value!r}")
+    return sum(float(amount) * _UNIT_SECONDS[unit] for amount, unit in parts)
+
+
+@dataclass(order=True)
+class ScenarioEvent:
+    """One timed action (ordered by time, then by scheduling order)."""
+    at: float  # simulated seconds since the engine clock's start
+    seq: int
+    action: str = field(compare=False)
+    params: Dict[str, Any] = field(compare=False, default_factory=dict)
+
+
+def _failure(engine: Any, asset: str, failure: str) -> None:
+    if not engine.trigger_failure(asset, FailureType[failure.upper()]):
+        raise KeyError(f"unknown pump {asset}")
+
+
+def _mode(engine: Any, mode: str, years: Optional[float] = None) -> None:
+    mode = SimulationMode[mode.upper()]
+    if mode == SimulationMode.AGED and years is not None:
+        engine.apply_aging(float(years))
+    else:
+        engine.set_mode(mode)
+
+
+def _reset(engine: Any) -> None:
+    engine.reset_simulation()
+
+
+def _pump(engine: Any, asset: str) -> Any:
+    pump = engine.get_pump(asset)
+    if pump is None:
+        raise KeyError(f"unknown pump {asset}")
+    return pump
+
+
+def _chamber(engine: Any, chamber: str) -> Any:
+    sim = engine.get_chamber(chamber)
+    if sim is None:
+        raise KeyError(f"unknown chamber {chamber}")
+    return sim
+
+
+def _start(engine: Any, asset: str) -> None:
+    _pump(engine, asset)._do_start_pump()
+
+
+def _stop(engine: Any, asset: str) -> None:
+    _pump(engine, asset)._do_stop_pump()
+
+
+def _speed(engine: Any, asset: str, rpm: float) -> None:
+    _pump(engine, asset)._do_set_speed(float(rpm))
+
+
+def _inflow(engine: Any, chamber: str, inflow: float) -> None:
+    _chamber(engine, chamber).inflow = float(inflow)
+
+
+def _setpoint(engine: Any, chamber: str, level: float) -> None:
+    _chamber(engine, chamber).set_level_setpoint(float(level))
+
+
+# Action name -> handler(engine, **params)
+ACTIONS: Dict[str, Callable[..., None]] = {
+    'failure': _failure,
+    'mode': _mode,
+    'reset': _reset,
+    'start': _start,
+    'stop': _stop,
+    'speed': _speed,
+    'inflow': _inflow,
+    'setpoint': _setpoint,
+}
+
+
+class ScenarioScheduler:
+    """Heap of timed engine actions, fired as simulated time reaches them."""
+
+    def __init__(self):
+        self._queue: List[ScenarioEvent] = []
+        self._seq = itertools.count()
+        self.fired = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def next_time(self) -> Optional[float]:
+        """Simulated seconds of the earliest pending event (None = queue empty)."""
+        return self._queue[0].at if self._queue else None
+
+    def schedule(self, at: Union[str, float], action: str, **params: Any) -> ScenarioEvent:
+        """Queue an action at a simulated offset from the clock's start.
+
+        Args:
+            at: Seconds or duration string ("36h", "3d")
+            action: Name in ACTIONS, or inflow_ramp
+            **params: Keyword arguments of the action
+        """
+        if action not in ACTIONS and action != 'inflow_ramp':
+            raise ValueError(f"Unknown scenario action: {action}")
+        event = ScenarioEvent(parse_offset(at), next(self._seq), action, params)
+        heapq.heappush(self._queue, event)
+        return event
+
+    def schedule_at(self, when: datetime, clock_start: datetime, action: str, **params: Any) -> ScenarioEvent:
+        """Queue an action at an absolute simulated UTC time."""
+        return self.schedule((when - clock_start).total_seconds(), action, **params)
+
+    def load(self, path: str) -> int:
+        """Queue every event of a JSON scenario file and return the count."""
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        count = 0
+        for item in config.get('events', []):
+            item = dict(item)
+            self.schedule(item.pop('at'), item.pop('action'), **item)
+            count += 1
+        _logger.info(f"Loaded {count} scenario events from {path}")
+        return count
+
+    def clear(self) -> None:
+        self._queue.clear()
+
+    def run_due(self, engine: Any, until: float) -> int:
+        """Fire every event at or before until (simulated seconds since the clock's start).
+
+        Returns:
+            Number of events fired
+        """
+        queue = self._queue
+        count = 0
+        while queue and queue[0].at <= until:
+            event = heapq.heappop(queue)
+            try:
+                if event.action == 'inflow_ramp':
+                    self._expand_ramp(engine, event)
+                else:
+                    ACTIONS[event.action](engine, **event.params)
+                self.fired += 1
+                _logger.info(f"Scenario event at {event.at:.0f}s: {event.action} {event.params}")
+            except Exception as e:
+                self.failed += 1
+                _logger.warning(f"Scenario event {event.action} {event.params} failed: {e}")
+            count += 1
+        return count
+
+    def _expand_ramp(self, engine: Any, event: ScenarioEvent) -> None:
+        """Replace a ramp with evenly spaced inflow steps from the current inflow."""
+        params = event.params
+        chamber = params['chamber']
+        start = _chamber(engine, chamber).inflow
+        target = float(params['to'])
+        duration = parse_offset(params.get('over', 0))
+        steps = max(1, int(params.get('steps', DEFAULT_RAMP_STEPS))) if duration > 0 else 1
+        for step in range(1, steps + 1):
+            fraction = step / steps
+            self.schedule(event.at + duration * fraction, 'inflow',
+                          chamber=chamber, inflow=start + (target - start) * fraction)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'pending': len(self._queue),
+            'next_at': self.next_time,
+            'fired': self.fired,
+            'failed': self.failed,
+        }
@@ -0,0 +1,169 @@
+"""Drift-free tick scheduler.
+
+Ticks are scheduled on absolute deadlines of a monotonic clock
+(anchor + k * interval) rather than sleeping for a fixed interval after the
+work is done, so the tick period does not stretch by the cost of each tick
+and samples stay on a fixed grid. Lateness and missed deadlines are counted
+per tick, and a catch-up policy decides what happens after an overrun:
+
+- SKIP:  drop the missed grid slots and resume on the next future deadline.
+- BURST: run the missed ticks back-to-back (up to max_burst), then skip.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_logger = logging.getLogger('simulation.scheduler')
+
+
+class CatchUpPolicy(Enum):
+    """What to do with deadlines missed because a tick overran."""
+    SKIP = 'skip'
+    BURST = 'burst'
+
+
+@dataclass
+class SchedulerStats:
+    """Lateness and overrun accounting."""
+    ticks: int = 0
+    missed_deadlines: int = 0   # grid slots that could not start on time
+    skipped_ticks: int = 0      # missed slots dropped by the SKIP policy
+    overruns: int = 0           # ticks whose work took longer than the interval
+    last_lateness_ms: float = 0.0
+    max_lateness_ms: float = 0.0
+    total_lateness_ms: float = 0.0
+    last_tick_duration_ms: float = 0.0
+    max_tick_duration_ms: float = 0.0
+
+    @property
+    def mean_lateness_ms(self) -> float:
+        return self.total_lateness_ms / self.ticks if self.ticks else 0.0
+
+
+class TickScheduler:
+    """Schedules ticks on absolute deadlines of a monotonic clock."""
+
+    def __init__(self, interval: float, policy: CatchUpPolicy = CatchUpPolicy.SKIP,
+                 max_burst: int = 10, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            interval: Tick period in seconds
+            policy: Catch-up policy after an overrun
+            max_burst: Maximum overdue ticks run back-to-back under BURST
+            clock: Monotonic time source in seconds
+        """
+        self.interval = interval
+        self.policy = policy
+        self.max_burst = max_burst
+        self.clock = clock
+        self.stats = SchedulerStats()
+
+        self._anchor: Optional[float] = None       # monotonic time of slot 0
+        self._anchor_wall: Optional[datetime] = None  # UTC wall time of slot 0
+        self._index = 0                            # next slot to run
+        self.slot = -1                             # slot of the tick returned by the last wait()
+        self._last_deadline: Optional[float] = None  # deadline of the last slot that ran
+        self._burst = 0
+        self._tick_started = 0.0
+
+    def start(self) -> None:
+        """Anchor the grid at the current time."""
+        self._anchor = self.clock()
+        self._anchor_wall = datetime.utcnow()
+        self._index = 0
+        self._last_deadline = None
+        self._burst = 0
+
+    def set_interval(self, interval: float) -> None:
+        """Change the period, re-anchoring at the next deadline so the grid stays continuous."""
+        if self._anchor is not None:
+            self._anchor = self._deadline(self._index)
+            self._anchor_wall = self._wall_time(self._index)
+            self._index = 0
+        self.interval = interval
+
+    def set_policy(self, policy: CatchUpPolicy) -> None:
+        self.policy = policy
+
+    def _deadline(self, index: int) -> float:
+        return self._anchor + index * self.interval
+
+    def _wall_time(self, index: int) -> datetime:
+        return self._anchor_wall + timedelta(seconds=index * self.interval)
+
+    async def wait(self) -> Tuple[float, datetime]:
+        """Sleep until the next deadline.
+
+        Returns:
+            (dt, timestamp): simulated seconds since the previous tick (a whole
+            number of grid periods) and the UTC grid time of this tick.
+        """
+        if self._anchor is None:
+            self.start()
+
+        index = self._index
+        now = self.clock()
+        deadline = self._deadline(index)
+        if now < deadline:
+            await asyncio.sleep(deadline - now)
+            now = self.clock()
+            self._burst = 0
+
+        lateness = max(0.0, now - deadline)
+        missed = int(lateness // self.interval) if self.interval > 0 else 0
+        if missed > 0:
+            if self.policy == CatchUpPolicy.BURST and self._burst < self.max_burst:
+                # Run this overdue slot now; later slots are handled on the next calls
+                self._burst += 1
+                self.stats.missed_deadlines += 1
+            else:
+                # Drop the slots we can no longer honour and run the current one
+                index += missed
+                self.stats.missed_deadlines += missed
+                self.stats.skipped_ticks += missed
+                self._burst = 0
+                lateness = max(0.0, now - self._deadline(index))
+                _logger.debug(f"Scheduler skipped {missed} tick(s)")
+
+        deadline = self._deadline(index)
+        dt = 0.0 if self._last_deadline is None else deadline - self._last_deadline
+        self._last_deadline = deadline
+        self._index = index + 1
+        self.slot = index
+        self._tick_started = now
+
+        lateness_ms = lateness * 1000.0
+        self.stats.ticks += 1
+        self.stats.last_lateness_ms = lateness_ms
+        self.stats.total_lateness_ms += lateness_ms
+        self.stats.max_lateness_ms = max(self.stats.max_lateness_ms, lateness_ms)
+
+        return dt, self._wall_time(index)
+
+    def complete(self) -> bool:
+        """Record the duration of the tick that started at the last wait().
+
+        Returns:
+            Whether the tick overran its interval
+        """
+        duration = self.clock() - self._tick_started
+        duration_ms = duration * 1000.0
+        self.stats.last_tick_duration_ms = duration_ms
+        self.stats.max_tick_duration_ms = max(self.stats.max_tick_duration_ms, duration_ms)
+        if duration > self.interval:
+            self.stats.overruns += 1
+            return True
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        stats = asdict(self.stats)
+        stats['mean_lateness_ms'] = self.stats.mean_lateness_ms
+        stats['policy'] = self.policy.value
+        stats['interval_ms'] = self.interval * 1000.0
+        return stats
@@ -0,0 +1,364 @@
+"""Multi-process sharded simulation.
+
+Splits the pumps and chambers into contiguous shards, each evaluated by a
+worker process running its own FleetSimulation. The pumps' control inputs
+and integrated state live in a shared memory state block: once the pool has
+started, the PumpSimulation state attributes read and write their row in it
+(see pump.SlotField), so OPC-UA methods, REST endpoints and
+reset_simulation() act on the pump objects exactly as in single-process
+mode and nothing is copied per pump per tick. Each worker loads its rows
+into its fleet arrays, advances them, stores the integrated state back and
+writes the calculated values to a shared memory output block; nothing but
+the tick message crosses the pipes.
+
+Chamber state stays on the ChamberSimulation objects and is copied into a
+control block per tick. Pumps take their state back when the workers stop,
+so a worker can be restarted at any time without losing anything.
+"""
+
+import atexit
+import logging
+import math
+import multiprocessing as mp
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .chamber import ChamberSimulation
+from .clock import SimulationClock
+from .fleet import FleetSimulation
+from .modes import ModeParameters
+from .pump import PumpSimulation
+from .snapshot import PumpColumns
+
+_logger = logging.getLogger('simulation.shards')
+
+# Shared memory layout (one float64 row per asset)
+PUMP_CONTROLS = [
+    'target_rpm', 'is_running', 'is_faulted', 'is_local_mode', 'start_count',
+    'ambient_temp', 'wet_well_level', 'rpm_ramp_rate', 'station_flow', 'station_flow_slope',
+    'wet_well_coupled'
+]
+PUMP_INTEGRATED = ['current_rpm', 'runtime_hours', 'target_flow_ratio']  # written back by the workers
+PUMP_STATE = PUMP_CONTROLS + PUMP_INTEGRATED
+PUMP_FIELD = {name: j for j, name in enumerate(PUMP_STATE)}
+PUMP_COLUMNS = PumpSimulation.ANALOG_VARIABLES + PumpSimulation.DISCRETE_VARIABLES
+CHAMBER_CONTROLS = ['level_setpoint', 'tick_count', 'elapsed']
+CHAMBER_STEP = len(CHAMBER_CONTROLS)  # extra control column: step length (0 = not due)
+CHAMBER_COLUMNS = ['Level', 'Temperature']
+
+_BOOL_COLUMNS = set(PumpSimulation.DISCRETE_VARIABLES)
+_INT_COLUMNS = {'StartCount'}
+
+
+def _control_value(value: Any) -> float:
+    """Encode a state attribute as float64 (None = NaN)."""
+    return math.nan if value is None else float(value)
+
+
+def _optional_float(value: float) -> Optional[float]:
+    """Decode an optional state attribute (NaN = None)."""
+    return None if math.isnan(value) else value
+
+
+_CONTROL_TYPES = {'is_running': bool, 'is_faulted': bool, 'is_local_mode': bool, 'start_count': int,
+                  'station_flow': _optional_float, 'wet_well_coupled': bool}
+
+
+def _attach(name: str, shape: Tuple[int, int]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _shard_worker(conn: Any, blocks: Dict[str, Tuple[str, Tuple[int, int]]],
+                  pump_specs: List[Tuple[str, str, Dict[str, Any]]], pump_range: Tuple[int, int],
+                  chamber_specs: List[Tuple[str, str]], chamber_range: Tuple[int, int],
+                  utc_offset: timedelta, seed: Optional[int]) -> None:
+    """Worker process loop: evaluate one shard per tick message."""
+    handles = {}
+    views = {}
+    for key, (name, shape) in blocks.items():
+        handles[key], views[key] = _attach(name, shape)
+
+    p_lo, p_hi = pump_range
+    c_lo, c_hi = chamber_range
+    pump_state = views['pump_state'][p_lo:p_hi]
+    pump_out = views['pump_out'][p_lo:p_hi]
+    chamber_ctrl = views['chamber_ctrl'][c_lo:c_hi]
+    chamber_out = views['chamber_out'][c_lo:c_hi]
+
+    mode_params = ModeParameters()
+    clock = SimulationClock(utc_offset=utc_offset)
+    fleet = FleetSimulation(mode_params, clock)
+    pumps = [PumpSimulation(asset_id, name, None, specs, None, mode_params)
+             for asset_id, name, specs in pump_specs]
+    for pump in pumps:
+        pump.seed_noise(seed)
+        fleet.add_pump(pump)
+    chambers = [ChamberSimulation(asset_id, name, None, None, mode_params)
+                for asset_id, name in chamber_specs]
+    for chamber in chambers:
+        chamber.seed_noise(seed)
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break  # main process went away
+            if message[0] == 'stop':
+                break
+            _, dt, now, mode_params = message
+            try:
+                clock.now = now
+                fleet.mode_params = mode_params
+
+                if pumps:
+                    fleet.load_state(PUMP_STATE, pump_state)
+                    columns = fleet.advance(dt)
+                    fleet.store_state(PUMP_INTEGRATED, pump_state[:, len(PUMP_CONTROLS):])
+                    for j, name in enumerate(PUMP_COLUMNS):
+                        pump_out[:, j] = columns[name]
+
+                for i, (chamber, (setpoint, tick_count, elapsed, step_dt)) in enumerate(zip(chambers, chamber_ctrl.tolist())):
+                    if step_dt <= 0:
+                        continue
+                    chamber.mode_params = mode_params
+                    chamber.level_setpoint = setpoint
+                    chamber.tick_count = int(tick_count)
+                    chamber.elapsed = elapsed
+                    values = chamber.step(step_dt)
+                    chamber_out[i] = [values[name] for name in CHAMBER_COLUMNS]
+
+                conn.send(('ok', None))
+            except Exception as e:
+                conn.send(('error', repr(e)))
+    finally:
+        del pump_state, pump_out, chamber_ctrl, chamber_out, views
+        for shm in handles.values():
+            shm.close()
+
+
+class ShardPool:
+    """Evaluates pumps and chambers in worker processes over shared memory."""
+
+    def __init__(self, workers: int, clock: SimulationClock, seed: Optional[int] = None):
+        """
+        Args:
+            workers: Number of worker processes
+            clock: Engine clock (the workers follow its time and local offset)
+            seed: Engine noise seed for the workers' asset streams
+        """
+        self.workers = max(1, workers)
+        self.clock = clock
+        self.seed = seed
+        self.pumps: List[PumpSimulation] = []
+        self.chambers: List[ChamberSimulation] = []
+        self.asset_ids: List[str] = []
+        self._slots: Dict[str, int] = {}
+
+        self._context = mp.get_context('spawn')
+        self._processes: List[Any] = []
+        self._conns: List[Any] = []
+        self._blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self._views: Dict[str, np.ndarray] = {}
+        self._dirty = True
+        # Changes whenever the slots of the pumps may change (see pump.SlotField)
+        self.layout = 0
+        atexit.register(self.close)
+
+    def set_seed(self, seed: Optional[int]) -> None:
+        """Reseed the workers' noise streams (workers restart on next tick)."""
+        self.seed = seed
+        self._dirty = True
+
+    def add_pump(self, pump: PumpSimulation) -> None:
+        """Add a pump. Workers are restarted with the new layout on next tick."""
+        for p in self.pumps:
+            if p.asset_id == pump.asset_id:
+                p.detach_state()
+        self.pumps = [p for p in self.pumps if p.asset_id != pump.asset_id] + [pump]
+        self._dirty = True
+        self.layout += 1
+
+    def add_chamber(self, chamber: ChamberSimulation) -> None:
+        """Add a chamber. Workers are restarted with the new layout on next tick."""
+        self.chambers = [c for c in self.chambers if c.asset_id != chamber.asset_id] + [chamber]
+        self._dirty = True
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    def start(self) -> None:
+        """Allocate shared memory and spawn the workers for the current layout."""
+        self.close()
+
+        n_pumps = len(self.pumps)
+        n_chambers = len(self.chambers)
+        shapes = {
+            'pump_state': (n_pumps, len(PUMP_STATE)),
+            'pump_out': (n_pumps, len(PUMP_COLUMNS)),
+            'chamber_ctrl': (n_chambers, len(CHAMBER_CONTROLS) + 1),
+            'chamber_out': (n_chambers, len(CHAMBER_COLUMNS)),
+        }
+        for key, shape in shapes.items():
+            size = max(1, shape[0] * shape[1]) * 8
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            self._blocks[key] = shm
+            self._views[key] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        blocks = {key: (shm.name, shapes[key]) for key, shm in self._blocks.items()}
+
+        # Take over the pumps' state
+        pump_state = self._views['pump_state']
+        for j, name in enumerate(PUMP_STATE):
+            pump_state[:, j] = [_control_value(getattr(p, name)) for p in self.pumps]
+        for slot, pump in enumerate(self.pumps):
+            pump.state_store = self
+            pump.state_slot = slot
+        self.asset_ids = [p.asset_id for p in self.pumps]
+        self._slots = {asset_id: slot for slot, asset_id in enumerate(self.asset_ids)}
+        self.layout += 1
+
+        workers = min(self.workers, max(1, n_pumps + n_chambers))
+        pump_bounds = np.linspace(0, n_pumps, workers + 1).astype(int)
+        chamber_bounds = np.linspace(0, n_chambers, workers + 1).astype(int)
+
+        for w in range(workers):
+            p_lo, p_hi = int(pump_bounds[w]), int(pump_bounds[w + 1])
+            c_lo, c_hi = int(chamber_bounds[w]), int(chamber_bounds[w + 1])
+            pump_specs = [(p.asset_id, p.name, p.design_specs) for p in self.pumps[p_lo:p_hi]]
+            chamber_specs = [(c.asset_id, c.name) for c in self.chambers[c_lo:c_hi]]
+
+            parent_conn, child_conn = self._context.Pipe()
+            process = self._context.Process(
+                target=_shard_worker,
+                args=(child_conn, blocks, pump_specs, (p_lo, p_hi),
+                      chamber_specs, (c_lo, c_hi), self.clock.utc_offset, self.seed),
+                name=f'sim-shard-{w}',
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._processes.append(process)
+            self._conns.append(parent_conn)
+
+        self._dirty = False
+        _logger.info(f"Started {workers} shard workers for {n_pumps} pumps and {n_chambers} chambers")
+
+    def close(self) -> None:
+        """Stop the workers, hand the pumps their state back and release shared memory."""
+        for conn in self._conns:
+            try:
+                conn.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._processes = []
+        self._conns = []
+
+        for pump in self.pumps:
+            if pump.state_store is self:
+                pump.detach_state()
+        self._views = {}
+        for shm in self._blocks.values():
+            shm.close()
+            shm.unlink()
+        self._blocks = {}
+        self._dirty = True
+        self.layout += 1
+
+    # =========================================================================
+    # SIMULATION TICK
+    # =========================================================================
+
+    def tick(self, dt: float, now: datetime, mode_params: ModeParameters,
+             chamber_steps: Optional[Dict[str, float]] = None
+             ) -> Tuple[Mapping[str, Mapping[str, Any]], Dict[str, Dict[str, float]]]:
+        """Evaluate one tick in all workers (blocking).
+
+        Args:
+            dt: Tick length in seconds
+            now: Simulated time of the tick
+            mode_params: Current simulation mode parameters
+            chamber_steps: Step length per due chamber (None = step every chamber by dt)
+
+        Returns:
+            (pump_values, chamber_values) keyed by asset_id; pump values are
+            handed over column-wise (PumpColumns). Values of the stepped
+            chambers are written back to the main-process objects.
+        """
+        if not self.pumps and not self.chambers:
+            return {}, {}
+        if self._dirty:
+            self.start()
+
+        if chamber_steps is None:
+            chamber_steps = {c.asset_id: dt for c in self.chambers}
+        self._write_controls(chamber_steps)
+
+        for conn in self._conns:
+            conn.send(('tick', dt, now, mode_params))
+        errors = []
+        for conn in self._conns:
+            status, detail = conn.recv()
+            if status != 'ok':
+                errors.append(detail)
+        if errors:
+            raise RuntimeError(f"Shard worker error: {errors[0]}")
+
+        return self._read_pumps(), self._read_chambers(chamber_steps)
+
+    def read_slot(self, name: str, slot: int) -> Any:
+        """Read one pump's state field (see pump.SlotField)."""
+        value = self._views['pump_state'][slot, PUMP_FIELD[name]].item()
+        return _CONTROL_TYPES.get(name, float)(value)
+
+    def write_slot(self, name: str, slot: int, value: Any) -> None:
+        """Write one pump's state field (see pump.SlotField)."""
+        self._views['pump_state'][slot, PUMP_FIELD[name]] = _control_value(value)
+
+    def state_column(self, name: str) -> np.ndarray:
+        """Shared memory column of one state field of every pump, indexed by slot (writable)."""
+        return self._views['pump_state'][:, PUMP_FIELD[name]]
+
+    def _write_controls(self, chamber_steps: Dict[str, float]) -> None:
+        chamber_ctrl = self._views['chamber_ctrl']
+        for j, attr in enumerate(CHAMBER_CONTROLS):
+            chamber_ctrl[:, j] = [float(getattr(c, attr)) for c in self.chambers]
+        chamber_ctrl[:, CHAMBER_STEP] = [chamber_steps.get(c.asset_id, 0.0) for c in self.chambers]
+
+    def _read_pumps(self) -> Mapping[str, Mapping[str, Any]]:
+        if not self.pumps:
+            return {}
+        pump_out = self._views['pump_out']
+        columns = {}
+        for j, name in enumerate(PUMP_COLUMNS):
+            column = pump_out[:, j]
+            if name in _BOOL_COLUMNS:
+                column = column.astype(bool)
+            elif name in _INT_COLUMNS:
+                column = column.astype(np.int64)
+            columns[name] = column.tolist()
+        return PumpColumns(self.asset_ids, columns, self._slots)
+
+    def _read_chambers(self, chamber_steps: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+        chamber_out = self._views['chamber_out'].tolist()
+        values_by_chamber = {}
+        for chamber, (level, temperature) in zip(self.chambers, chamber_out):
+            if chamber.asset_id not in chamber_steps:
+                continue
+            chamber.tick_count += 1
+            chamber.elapsed += chamber_steps[chamber.asset_id]
+            if not chamber.coupled:
+                chamber.level = level
+            chamber.temperature = temperature
+            values_by_chamber[chamber.asset_id] = chamber.get_values()
+        return values_by_chamber
@@ -0,0 +1,117 @@
+"""Load shedding when the engine falls behind.
+
+When a tick overruns its interval (or starts more than an interval late),
+the LoadShedder raises its level by one; after recover_after consecutive
+on-time ticks it lowers it by one again. Level N activates the first N
+actions of the configured order, so output is degraded in priority order
+and the least important channels go first:
+
+- websocket_pubsub: skip the WebSocket pubsub_update frames
+- mqtt:             publish MQTT telemetry on every Nth tick only
+- chambers:         step chambers on every Nth due step only (their
+                    elapsed time accumulates, so no simulated time is lost;
+                    never while the engine is recording, since a replay
+                    could not reproduce the skipped steps)
+- opcua:            write the address space on every Nth tick only
+
+The default order leaves OPC-UA writes out entirely, so OPC-UA timestamps
+keep up with real time at the expense of dashboard smoothness. Every shed
+frame, publish, step or write is counted.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence
+
+_logger = logging.getLogger('simulation.shedding')
+
+
+class ShedAction(Enum):
+    """Output the engine can degrade under overrun."""
+    WEBSOCKET_PUBSUB = 'websocket_pubsub'
+    MQTT = 'mqtt'
+    CHAMBERS = 'chambers'
+    OPCUA = 'opcua'
+
+
+DEFAULT_ORDER = (ShedAction.WEBSOCKET_PUBSUB, ShedAction.MQTT, ShedAction.CHAMBERS)
+
+
+@dataclass
+class ShedPolicy:
+    """Order and strength of load shedding."""
+    order: List[ShedAction] = field(default_factory=lambda: list(DEFAULT_ORDER))
+    decimation: int = 4        # keep 1 of every N ticks/steps for decimated actions
+    recover_after: int = 10    # on-time ticks before the level is lowered again
+
+    @classmethod
+    def parse_order(cls, text: str) -> List[ShedAction]:
+        """Parse a comma-separated action list such as "websocket_pubsub,mqtt,chambers"."""
+        return [ShedAction(name.strip().lower()) for name in text.split(',') if name.strip()]
+
+
+class LoadShedder:
+    """Tracks overruns and decides which output to shed."""
+
+    def __init__(self, policy: Optional[ShedPolicy] = None):
+        self.policy = policy or ShedPolicy()
+        self.level = 0
+        self.escalations = 0
+        self.shed: Dict[ShedAction, int] = {action: 0 for action in ShedAction}
+        self._on_time = 0
+        self._counters: Dict[Any, int] = {}
+
+    @property
+    def active(self) -> List[ShedAction]:
+        return self.policy.order[:self.level]
+
+    def set_order(self, order: Sequence[ShedAction]) -> None:
+        """Change the shedding order (clamping the current level)."""
+        self.policy.order = list(order)
+        self.level = min(self.level, len(self.policy.order))
+
+    def update(self, overran: bool) -> None:
+        """Raise the level after an overrun, lower it after recover_after on-time ticks."""
+        if overran:
+            self._on_time = 0
+            if self.level < len(self.policy.order):
+                self.level += 1
+                self.escalations += 1
+                _logger.warning(f"Engine behind schedule, shedding {self.policy.order[self.level - 1].value}")
+        elif self.level > 0:
+            self._on_time += 1
+            if self._on_time >= self.policy.recover_after:
+                self._on_time = 0
+                self.level -= 1
+                _logger.info(f"Engine caught up, restoring {self.policy.order[self.level].value}")
+
+    def is_active(self, action: ShedAction) -> bool:
+        return action in self.policy.order[:self.level]
+
+    def skip(self, action: ShedAction, key: Any = None) -> bool:
+        """Whether to drop this occurrence of an output, counting it if so.
+
+        WEBSOCKET_PUBSUB drops every occurrence while active; the other
+        actions keep one of every policy.decimation occurrences per key.
+        """
+        if not self.is_active(action):
+            return False
+        if action != ShedAction.WEBSOCKET_PUBSUB:
+            counter_key = (action, key)
+            count = self._counters.get(counter_key, 0)
+            self._counters[counter_key] = count + 1
+            if count % max(1, self.policy.decimation) == 0:
+                return False
+        self.shed[action] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get shedding statistics."""
+        return {
+            'level': self.level,
+            'order': [action.value for action in self.policy.order],
+            'active': [action.value for action in self.active],
+            'escalations': self.escalations,
+            'shed': {action.value: count for action, count in self.shed.items()},
+        }
@@ -0,0 +1,132 @@
+"""Per-tick engine snapshot.
+
+The engine calculates every pump's values exactly once per tick and freezes
+them in an EngineSnapshot. The OPC-UA writer, WebSocket broadcast, MQTT
+publisher and REST endpoints all read the same snapshot, so every channel
+reports identical numbers for a given tick. The snapshot also carries the
+sampling intervals due on its tick and the chambers stepped in it, so it
+can be written after the engine has moved on to the next one (see
+pipeline.py).
+
+Batched ticks (fleet and shard modes) hand their values over column-wise
+(PumpColumns): each pump's row is a view created on access, so no dict is
+built per pump, and column-wise consumers such as the Parquet export take
+the columns as they are. Pump state dicts are built from the values the
+first time a channel asks for them (LazyStates).
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Any, Callable, FrozenSet, Iterator, List, Mapping, Sequence
+
+
+@dataclass(frozen=True)
+class EngineSnapshot:
+    """Immutable result of one simulation tick."""
+    tick: int
+    timestamp: datetime  # UTC, used as OPC-UA SourceTimestamp
+    mode: str
+    pumps: Mapping[str, Mapping[str, Any]]        # asset_id -> OPC-UA variable values
+    pump_states: Mapping[str, Mapping[str, Any]]  # asset_id -> state dict (API/WebSocket/MQTT)
+    chambers: Mapping[str, Mapping[str, Any]]     # asset_id -> chamber values
+    failure_type: str = "NONE"
+    failure_progression: float = 0.0  # % (0-100)
+    due: Mapping[float, bool] = field(default_factory=dict)  # sampling intervals (ms) due this tick
+    chambers_stepped: FrozenSet[str] = frozenset()  # chambers stepped (and so written) this tick
+
+    @property
+    def iso_timestamp(self) -> str:
+        return self.timestamp.isoformat()
+
+    def get_pump_state(self, asset_id: str) -> Dict[str, Any]:
+        """Get a mutable copy of one pump's state dict."""
+        state = self.pump_states.get(asset_id)
+        return dict(state) if state is not None else {}
+
+    def get_all_pump_states(self) -> Dict[str, Dict[str, Any]]:
+        """Get mutable copies of all pump state dicts."""
+        return {pump_id: dict(state) for pump_id, state in self.pump_states.items()}
+
+
+class ColumnRow(Mapping):
+    """Read-only values of one pump, viewed across a tick's value columns."""
+
+    __slots__ = ('_columns', '_slot')
+
+    def __init__(self, columns: Mapping[str, Sequence[Any]], slot: int):
+        self._columns = columns
+        self._slot = slot
+
+    def __getitem__(self, name: str) -> Any:
+        return self._columns[name][self._slot]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+
+class PumpColumns(Mapping):
+    """One tick's pump values column-wise (variable -> list indexed by slot).
+
+    Reads as asset_id -> values like a dict of dicts; the rows are ColumnRow
+    views. The columns must not be modified once handed over.
+    """
+
+    def __init__(self, asset_ids: Sequence[str], columns: Dict[str, List[Any]], slots: Mapping[str, int]):
+        """
+        Args:
+            asset_ids: Pump asset ids in slot order
+            columns: Variable name -> one value per slot
+            slots: Asset id -> slot (not modified afterwards)
+        """
+        self.asset_ids = asset_ids
+        self.columns = MappingProxyType(columns)
+        self._slots = slots
+
+    def __getitem__(self, asset_id: str) -> ColumnRow:
+        return ColumnRow(self.columns, self._slots[asset_id])
+
+    def __contains__(self, asset_id: object) -> bool:
+        return asset_id in self._slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.asset_ids)
+
+    def __len__(self) -> int:
+        return len(self.asset_ids)
+
+
+class LazyStates(Mapping):
+    """asset_id -> state dict, each built from the tick's values on first access."""
+
+    def __init__(self, pumps: Mapping[str, Mapping[str, Any]], build: Callable[[str], Dict[str, Any]]):
+        self._pumps = pumps
+        self._build = build
+        self._states: Dict[str, Mapping[str, Any]] = {}
+
+    def __getitem__(self, asset_id: str) -> Mapping[str, Any]:
+        state = self._states.get(asset_id)
+        if state is None:
+            if asset_id not in self._pumps:
+                raise KeyError(asset_id)
+            state = self._states[asset_id] = MappingProxyType(self._build(asset_id))
+        return state
+
+    def __contains__(self, asset_id: object) -> bool:
+        return asset_id in self._pumps
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pumps)
+
+    def __len__(self) -> int:
+        return len(self._pumps)
+
+
+def freeze(mapping: Mapping[str, Mapping[str, Any]]) -> Mapping[str, Mapping[str, Any]]:
+    """Wrap a dict of dicts in read-only mapping proxies (PumpColumns already are read-only)."""
+    if isinstance(mapping, PumpColumns):
+        return mapping
+    return MappingProxyType({key: MappingProxyType(dict(value)) for key, value in mapping.items()})
@@ -0,0 +1,201 @@
+"""Wet-well mass balance.
+
+Wet wells coupled to their station's pumps hold a real volume: every tick
+the level of all of them advances in one array step from
+
+    A * dh/dt = Q_in(t) - Q_out(h)
+
+where Q_in is the chamber's inflow scaled by the diurnal profile and Q_out
+the summed FlowRate of the pumps drawing from it. The new level is fed
+back to the pumps' wet_well_level, which sets their suction pressure and,
+with station hydraulics, the static head they pump against.
+
+The step is linearized backward Euler in the level:
+
+    h' = h + dt * (Q_in - Q_out(h)) / (A + dt * dQ_out/dh)
+
+with dQ_out/dh taken from the station solve (pump.station_flow_slope, zero
+without station hydraulics, where outflow does not depend on the level).
+Outflow rises with level, so the denominator only grows with dt and the
+step stays stable at any tick length; accelerated runs need no substeps.
+Levels are clamped to the chamber's range, and the volume that would
+have spilled over the top or been pumped below the bottom is counted.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+import numpy as np
+
+from .chamber import ChamberSimulation
+from .clock import SimulationClock
+from .modes import ModeParameters, get_diurnal_multiplier
+from .pump import PumpSimulation
+
+_logger = logging.getLogger('simulation.wetwell')
+
+# Default plan area: the design inflow raises the level by 1 m in this many minutes
+DEFAULT_FILL_MINUTES = 10.0
+
+
+class WetWellBalance:
+    """Integrates the level of every coupled wet well in one vectorized step."""
+
+    def __init__(self, mode_params: ModeParameters, clock: Optional[SimulationClock] = None):
+        self.mode_params = mode_params
+        self.clock = clock
+        self.wells: List[ChamberSimulation] = []
+        self.pumps: List[PumpSimulation] = []
+        self._pump_well: List[int] = []
+        self._dirty = True
+
+        # Volume (m³) that overflowed the top or was demanded below the bottom, per well
+        self.overflow = np.zeros(0)
+        self.shortfall = np.zeros(0)
+
+    def __len__(self) -> int:
+        return len(self.wells)
+
+    def add_well(self, chamber: ChamberSimulation, pumps: List[PumpSimulation],
+                 area: Optional[float] = None, inflow: Optional[float] = None) -> None:
+        """Couple a chamber to the pumps drawing from it.
+
+        Args:
+            chamber: Wet well chamber
+            pumps: Pumps drawing from the wet well
+            area: Plan area in m² (default: sized from the inflow, DEFAULT_FILL_MINUTES)
+            inflow: Inflow in m³/h at a diurnal multiplier of 1.0 (default:
+                design flow of the largest pump)
+        """
+        if any(well is chamber for well in self.wells):
+            raise ValueError(f"Wet well {chamber.asset_id} already coupled")
+        if inflow is None:
+            inflow = max((p.physics.design.flow for p in pumps), default=0.0)
+        if area is None:
+            area = max(inflow, 1.0) * DEFAULT_FILL_MINUTES / 60.0
+        if area <= 0:
+            raise ValueError(f"Wet well {chamber.asset_id} needs a positive area")
+
+        chamber.coupled = True
+        chamber.area = float(area)
+        chamber.inflow = float(inflow)
+        index = len(self.wells)
+        self.wells.append(chamber)
+        for pump in pumps:
+            pump.wet_well_coupled = True
+            pump.wet_well_level = chamber.level
+            self.pumps.append(pump)
+            self._pump_well.append(index)
+        self._dirty = True
+        _logger.info(f"Wet well {chamber.name}: {len(pumps)} pumps, {area:.1f} m², inflow {inflow:.0f} m³/h")
+
+    def _rebuild(self) -> None:
+        """(Re)allocate the pump-to-well mapping and counters."""
+        n_wells = len(self.wells)
+        self.well_index = np.array(self._pump_well, dtype=np.intp)
+        overflow = np.zeros(n_wells)
+        overflow[:len(self.overflow)] = self.overflow[:n_wells]
+        shortfall = np.zeros(n_wells)
+        shortfall[:len(self.shortfall)] = self.shortfall[:n_wells]
+        self.overflow, self.shortfall = overflow, shortfall
+        self._dirty = False
+
+    # =========================================================================
+    # SIMULATION TICK
+    # =========================================================================
+
+    def step(self, dt: float, pump_values: Dict[str, Dict[str, Any]]) -> None:
+        """Advance every wet well by one tick.
+
+        Args:
+            dt: Tick length in seconds (simulated time is dt * time_acceleration)
+            pump_values: This tick's values by pump asset_id
+        """
+        if not self.wells:
+            return
+        if self._dirty:
+            self._rebuild()
+
+        wells = self.wells
+        n_wells = len(wells)
+        pumps = self.pumps
+        n_pumps = len(pumps)
+        hours = dt * self.mode_params.time_acceleration / 3600.0
+
+        # Chamber state is re-read every tick so set_level() and inflow changes take effect
+        level = np.fromiter((w.level for w in wells), dtype=np.float64, count=n_wells)
+        area = np.fromiter((w.area for w in wells), dtype=np.float64, count=n_wells)
+        low = np.fromiter((w.level_min for w in wells), dtype=np.float64, count=n_wells)
+        high = np.fromiter((w.level_max for w in wells), dtype=np.float64, count=n_wells)
+        hour = self.clock.hour if self.clock is not None else datetime.now().hour
+        inflow = np.fromiter((w.inflow for w in wells), dtype=np.float64, count=n_wells) * get_diurnal_multiplier(hour)
+
+        flow = np.fromiter((pump_values.get(p.asset_id, {}).get('FlowRate', 0.0) for p in pumps),
+                           dtype=np.float64, count=n_pumps)
+        slope = np.fromiter((p.station_flow_slope for p in pumps), dtype=np.float64, count=n_pumps)
+        outflow = np.bincount(self.well_index, weights=flow, minlength=n_wells)
+        outflow_slope = np.maximum(np.bincount(self.well_index, weights=slope, minlength=n_wells), 0.0)
+
+        # Linearized backward Euler (see module docstring)
+        new_level = level + hours * (inflow - outflow) / (area + hours * outflow_slope)
+
+        self.overflow += np.maximum(new_level - high, 0.0) * area
+        self.shortfall += np.maximum(low - new_level, 0.0) * area
+        new_level = np.clip(new_level, low, high)
+
+        levels = new_level.tolist()
+        for well, well_level in zip(wells, levels):
+            well.level = well_level
+        for pump, well in zip(pumps, self._pump_well):
+            pump.wet_well_level = levels[well]
+
+    # =========================================================================
+    # STATUS
+    # =========================================================================
+
+    def get_state(self) -> Dict[str, Dict[str, float]]:
+        """Level, inflow setting and spilled/short volumes of each wet well."""
+        if self._dirty:
+            self._rebuild()
+        return {
+            well.asset_id: {'level': well.level, 'inflow': well.inflow,
+                            'overflow': overflow, 'shortfall': shortfall}
+            for well, overflow, shortfall in zip(self.wells, self.overflow.tolist(), self.shortfall.tolist())
+        }
+
+    def get_wells(self) -> List[Dict[str, Any]]:
+        """Coupling of each wet well (for recordings)."""
+        return [
+            {'id': well.asset_id, 'pumps': [p.asset_id for p, w in zip(self.pumps, self._pump_well) if w == index]}
+            for index, well in enumerate(self.wells)
+        ]
+
+
+def group_wet_wells(asset_defs: Iterable[Any]) -> Dict[str, Tuple[List[str], Dict[str, float]]]:
+    """Pair simulated chambers with the simulated pumps in the same parent folder.
+
+    A folder's wet well is its chamber with a wetWell entry in assets.json
+    (Area in m², Inflow in m³/h), or its first simulated chamber.
+
+    Returns:
+        chamber_id -> (pump asset ids, wetWell entry or {} for defaults)
+    """
+    pumps_by_parent: Dict[str, List[str]] = {}
+    chambers_by_parent: Dict[str, List[Any]] = {}
+    for asset_def in asset_defs:
+        if not asset_def.simulate:
+            continue
+        if asset_def.asset_type in ('PumpType', 'InfluentPumpType'):
+            pumps_by_parent.setdefault(asset_def.parent, []).append(asset_def.id)
+        elif asset_def.asset_type == 'ChamberType':
+            chambers_by_parent.setdefault(asset_def.parent, []).append(asset_def)
+
+    wells = {}
+    for parent, pump_ids in pumps_by_parent.items():
+        chambers = chambers_by_parent.get(parent)
+        if not chambers:
+            continue
+        chamber = next((c for c in chambers if c.wet_well), chambers[0])
+        wells[chamber.id] = (pump_ids, chamber.wet_well)
+    return wells
@@ -0,0 +1,222 @@
+"""Precompiled OPC-UA write plans.
+
+A WritePlan is compiled once when a simulation binds to its nodes: node ids,
+variant types and EURange clamp bounds are resolved up front, so each tick
+only has to wrap values in DataValues. The resulting WriteValues from many
+assets can be pushed to the address space in a single bulk write.
+
+Variables with a sampling interval (from types.yaml) are only written on
+ticks where the engine's RateSchedule finds that interval due.
+
+Variables with a deadband (from types.yaml) are reported by exception: a
+value within the band of the last value written is not written again, so
+monitored items only notify when something actually changed, until the
+plan's max_interval has passed since the variable's last write and it is
+refreshed anyway. ReadWrite variables never get a deadband (see
+ConfigLoader.get_reporting): the simulated value has to overwrite a client's
+write on the next sample.
+
+Plans are normally compiled from the binding manifest AssetBuilder emits
+while it creates an asset's nodes (path -> NodeBinding with the node, its
+variant type, EURange and the value written at build time), so binding a
+simulation needs no address-space reads at all.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from asyncua import ua
+
+from config.loader import ReportingDef
+
+_logger = logging.getLogger('simulation.write_plan')
+
+_GOOD = ua.StatusCode(ua.StatusCodes.Good)
+
+# Python conversion applied before wrapping a value in a Variant
+_CONVERTERS = {
+    ua.VariantType.Boolean: bool,
+    ua.VariantType.Double: float,
+    ua.VariantType.Float: float,
+    ua.VariantType.UInt32: int,
+    ua.VariantType.UInt16: int,
+    ua.VariantType.Int32: int,
+    ua.VariantType.Int16: int,
+}
+
+
+@dataclass(frozen=True)
+class WriteTarget:
+    """One pre-resolved variable in a write plan."""
+    name: str
+    nodeid: ua.NodeId
+    variant_type: ua.VariantType
+    low: Optional[float] = None
+    high: Optional[float] = None
+    deadband: Optional[float] = None  # absolute band width (None = write every sample)
+    sampling_interval: Optional[float] = None  # ms (None = every tick)
+
+
+@dataclass
+class NodeBinding:
+    """One node created by AssetBuilder, as a simulation binds to it."""
+    node: Any
+    node_class: ua.NodeClass = ua.NodeClass.Variable
+    variant_type: Optional[ua.VariantType] = None  # None for objects and methods
+    eu_range: Optional[Tuple[float, float]] = None
+    value: Any = None  # value written when the asset was built
+
+    @property
+    def nodeid(self) -> ua.NodeId:
+        return self.node.nodeid
+
+
+class WritePlan:
+    """Pre-resolved node ids, variant types, clamp bounds and deadbands for one asset."""
+
+    def __init__(self, session: Any, targets: List[WriteTarget], max_interval: Optional[float] = None):
+        """
+        Args:
+            session: Address space session to write through
+            targets: Variables in the plan
+            max_interval: Seconds after which a deadband-suppressed value is
+                written anyway (None = suppress until it leaves the band)
+        """
+        self.session = session
+        self.targets = targets
+        self.max_interval = timedelta(seconds=max_interval) if max_interval else None
+        self._compiled = [
+            (t.name, t.nodeid, t.variant_type, _CONVERTERS.get(t.variant_type, float), t.low, t.high,
+             t.deadband, t.sampling_interval)
+            for t in targets
+        ]
+        # Last value written per target and when (deadband reference)
+        self._last_value: List[Any] = [None] * len(targets)
+        self._last_time: List[Optional[datetime]] = [None] * len(targets)
+        self.written = 0
+        self.suppressed = 0
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    @property
+    def names(self) -> List[str]:
+        return [t.name for t in self.targets]
+
+    @classmethod
+    async def compile(cls, nodes: Dict[str, Any], names: Iterable[str],
+                      eu_ranges: Dict[str, Tuple[float, float]],
+                      reporting: Optional[ReportingDef] = None) -> 'WritePlan':
+        """Resolve the variables in names against bound nodes.
+
+        Reads each node's DataType once so ticks never have to guess the
+        variant type from the Python value. Percent deadbands are converted
+        to absolute bands over the node's EURange.
+        """
+        reporting = reporting or ReportingDef()
+        deadbands = reporting.deadbands
+        targets = []
+        session = None
+        for name in names:
+            node = nodes.get(name)
+            if node is None:
+                continue
+            try:
+                variant_type = await node.read_data_type_as_variant_type()
+            except Exception as e:
+                _logger.debug(f"Could not read data type of {name}: {e}")
+                continue
+            low, high = eu_ranges.get(name, (None, None))
+            band = None
+            if name in deadbands:
+                band = deadbands[name].resolve(eu_ranges.get(name))
+                if band is None:
+                    _logger.debug(f"Percent deadband of {name} ignored: no EURange")
+            targets.append(WriteTarget(name, node.nodeid, variant_type, low, high, band,
+                                       reporting.sampling_intervals.get(name)))
+            session = node.session
+        return cls(session, targets, reporting.max_interval)
+
+    @classmethod
+    def from_bindings(cls, bindings: Dict[str, NodeBinding], names: Iterable[str],
+                      reporting: Optional[ReportingDef] = None) -> 'WritePlan':
+        """Build a plan from a binding manifest without reading the address space."""
+        reporting = reporting or ReportingDef()
+        deadbands = reporting.deadbands
+        targets = []
+        session = None
+        for name in names:
+            binding = bindings.get(name)
+            if binding is None or binding.variant_type is None:
+                continue
+            low, high = binding.eu_range or (None, None)
+            band = None
+            if name in deadbands:
+                band = deadbands[name].resolve(binding.eu_range)
+                if band is None:
+                    _logger.debug(f"Percent deadband of {name} ignored: no EURange")
+            targets.append(WriteTarget(name, binding.nodeid, binding.variant_type, low, high, band,
+                                       reporting.sampling_intervals.get(name)))
+            session = binding.node.session
+        return cls(session, targets, reporting.max_interval)
+
+    def build(self, values: Dict[str, Any], timestamp: datetime,
+              due: Optional[Dict[float, bool]] = None) -> List[ua.WriteValue]:
+        """Build WriteValues for every planned variable present in values and outside its deadband.
+
+        Args:
+            values: Variable values by name
+            timestamp: Source and server timestamp of the values
+            due: Sampling intervals due this tick (None = sample every variable)
+        """
+        write_values = []
+        last_value = self._last_value
+        last_time = self._last_time
+        max_interval = self.max_interval
+        for index, (name, nodeid, variant_type, convert, low, high, deadband,
+                    sampling_interval) in enumerate(self._compiled):
+            if due is not None and sampling_interval is not None and not due.get(sampling_interval, True):
+                continue
+            value = values.get(name)
+            if value is None:
+                continue
+            if low is not None:
+                value = max(low, min(high, value))
+            value = convert(value)
+            if deadband is not None:
+                previous = last_value[index]
+                if (previous is not None and abs(value - previous) <= deadband
+                        and (max_interval is None or timestamp - last_time[index] < max_interval)):
+                    self.suppressed += 1
+                    continue
+                last_value[index] = value
+                last_time[index] = timestamp
+            write_values.append(ua.WriteValue(
+                NodeId_=nodeid,
+                AttributeId=ua.AttributeIds.Value,
+                Value=ua.DataValue(
+                    Value=ua.Variant(value, variant_type),
+                    StatusCode_=_GOOD,
+                    SourceTimestamp=timestamp,
+                    ServerTimestamp=timestamp
+                )
+            ))
+        self.written += len(write_values)
+        return write_values
+
+
+async def bulk_write(session: Any, write_values: List[ua.WriteValue]) -> int:
+    """Write many values to the address space with a single service call.
+
+    Returns the number of values that were rejected.
+    """
+    if not write_values:
+        return 0
+    params = ua.WriteParameters(NodesToWrite=write_values)
+    results = await session.write(params)
+    failed = sum(1 for status in results if not status.is_good())
+    if failed:
+        _logger.debug(f"Bulk write rejected {failed} of {len(write_values)} values")
+    return failed